@@ -110,6 +110,9 @@ def unregister():
 
         bpy.utils.unregister_class(preferences.CppPreferences)
 
+        engine.size_scanner.clear()
+        engine.binding.close_source_index()
+
         _module_registered = False
 
     # handlers
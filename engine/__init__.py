@@ -1,3 +1,16 @@
-from . _engine import *
+try:
+    from . _engine import *
+    is_native = True
+except ImportError:
+    # Native module is built only for Windows, use portable implementation elsewhere
+    from . _pyengine import *
+    is_native = False
+
+from . import projection
+from . import calibration
+from . import decimation
+from . import image_sizes
+from . import binding
 
 shaders = ShaderCache()
+size_scanner = image_sizes.ImageSizeScanner()
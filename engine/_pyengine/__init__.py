@@ -0,0 +1,21 @@
+# Portable implementation of the native '_engine' module API.
+# Used on platforms where the native module is not available.
+from .environment import Environment
+from .shaders import ShaderCache
+from .images import (
+    TEMP_DATA_NAME,
+    SUPPORTED_IMAGE_EXTENSIONS,
+    updateImageSeqStaticSize,
+    updateImageSeqPreviews,
+)
+from ..binding import bind_camera_images as bindCameraImages
+
+__all__ = (
+    "Environment",
+    "ShaderCache",
+    "TEMP_DATA_NAME",
+    "SUPPORTED_IMAGE_EXTENSIONS",
+    "updateImageSeqStaticSize",
+    "updateImageSeqPreviews",
+    "bindCameraImages",
+)
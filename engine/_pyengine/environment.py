@@ -0,0 +1,121 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .. import projection
+
+import bpy
+
+
+class Environment:
+    """
+    Projection context of a single mesh object. Computes projector matrix and writes
+    projected (and distorted according to camera calibration) coordinates into the given UV layer.
+    """
+    __slots__ = (
+        "ob",
+        "uv_layer",
+        "thread_count",
+        "projector_MVP",
+        "vertices_co",
+        "loops_vertex_index",
+        "loops_uv",
+    )
+
+    def __init__(self, ob: bpy.types.Object, uv_layer: bpy.types.MeshUVLoopLayer):
+        if not (ob and uv_layer):
+            raise TypeError("Environment invalid constructor arguments")
+        if ob.type != 'MESH':
+            raise TypeError(f"Object type must be mesh, not {ob.type}")
+        if ob.mode != 'TEXTURE_PAINT':
+            raise ValueError(f"Object must be in texture paint mode, not {ob.mode}")
+
+        self.ob = ob
+        self.uv_layer = uv_layer
+        self.thread_count = os.cpu_count() or 1
+        self.projector_MVP = np.identity(4, dtype=np.float32)
+
+        mesh = ob.data
+        self.vertices_co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", self.vertices_co)
+        self.vertices_co.shape = (-1, 3)
+
+        self.loops_vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", self.loops_vertex_index)
+
+        self.loops_uv = np.empty((len(mesh.loops), 2), dtype=np.float32)
+
+    def _calc_vertices_uv(self, matrix, calibration, start, end):
+        points = self.vertices_co[start:end]
+        xy, w = projection.project_points(points, matrix)
+        # Vertices behind projector are moved outside of image
+        xy[w <= 0.0] = -1.0
+        return projection.undistorted_uv(xy, **calibration)
+
+    def setProjector(self, camera: bpy.types.Object, debug_info: bool = False):
+        """
+        Projection warp UV layer data.
+        @param camera: camera object to be used as projector.
+        @return: int, 0 mean success.
+        """
+        dt = time.perf_counter()
+
+        camera_data = camera.data
+        image = camera_data.cpp.image
+        if not (image and image.cpp.valid):
+            return 1
+        width, height = image.cpp.static_size
+        cpp = camera_data.cpp
+
+        try:
+            view_matrix = np.array(camera.matrix_world.inverted(), dtype=np.float32)
+        except ValueError:
+            print("Can't create ModelViewProjectionMatrix")
+            return 1
+        self.projector_MVP = projection.projector_matrix(camera_data.lens, width, height) @ view_matrix
+
+        model_matrix = np.array(self.ob.matrix_world, dtype=np.float32)
+        matrix = self.projector_MVP @ model_matrix
+
+        calibration = dict(
+            width=width,
+            height=height,
+            lens=camera_data.lens,
+            principal_point_x=cpp.principal_point_x,
+            principal_point_y=cpp.principal_point_y,
+            skew=cpp.skew,
+            aspect_ratio=cpp.aspect_ratio,
+            lens_model=projection.LENS_MODELS.index(cpp.camera_lens_model),
+            k1=cpp.k1, k2=cpp.k2, k3=cpp.k3, k4=cpp.k4,
+            t1=cpp.t1, t2=cpp.t2,
+        )
+
+        # Numpy releases GIL for large array operations, so split vertices into ranges
+        vertices_count = len(self.vertices_co)
+        chunk_count = max(min(self.thread_count, vertices_count // 65536), 1)
+        bounds = np.linspace(0, vertices_count, chunk_count + 1, dtype=np.int64)
+        if chunk_count > 1:
+            with ThreadPoolExecutor(max_workers=chunk_count) as executor:
+                parts = list(executor.map(
+                    lambda i: self._calc_vertices_uv(matrix, calibration, bounds[i], bounds[i + 1]),
+                    range(chunk_count)
+                ))
+            vertices_uv = np.concatenate(parts)
+        else:
+            vertices_uv = self._calc_vertices_uv(matrix, calibration, 0, vertices_count)
+
+        np.take(vertices_uv, self.loops_vertex_index, axis=0, out=self.loops_uv)
+
+        calc_time = time.perf_counter() - dt
+
+        self.uv_layer.data.foreach_set("uv", np.reshape(self.loops_uv, -1))
+        self.ob.data.update_tag()
+
+        if debug_info:
+            total = time.perf_counter() - dt
+            print(f"Camera Projection Painter: Set Projector in {total:.6f} sec:\n"
+                  f"\tCalculation stage:               {calc_time:.6f}\n"
+                  f"\t'foreach_set' 'update_tag' call: {total - calc_time:.6f}")
+        return 0
@@ -0,0 +1,204 @@
+import hashlib
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .. import imageheader
+from .. import image_sizes
+from .. import binding
+
+import bpy
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+TEMP_DATA_NAME = "cpp_data"
+SUPPORTED_IMAGE_EXTENSIONS = imageheader.SUPPORTED_IMAGE_EXTENSIONS
+
+
+def get_image_filepath(image: bpy.types.Image):
+    return bpy.path.abspath(image.filepath, library=image.library)
+
+
+def updateImageSeqStaticSize(image_seq, skip_already_set: bool = True):
+    """
+    Read image header for every image in given sequence and update image.cpp.static_size to current value.
+    @param image_seq: bpy.types.Image sequence.
+    @param skip_already_set: skip images with already set cpp.static_size parameter.
+    @return: int, zero means success.
+    """
+    for image in image_seq:
+        if skip_already_set and image.cpp.static_size[0]:
+            continue
+        size = image_sizes.read_image_size(image)
+        if tuple(image.cpp.static_size) != tuple(size):
+            image.cpp.static_size = size
+    return 0
+
+
+def _fit_size(width: int, height: int, max_size: int):
+    if width >= height:
+        return max_size, max(int(max_size * height / width), 1)
+    return max(int(max_size * width / height), 1), max_size
+
+
+def _resample(pixels, width: int, height: int):
+    """Nearest neighbour resample of (h, w, 4) array"""
+    rows = (np.arange(height) * (pixels.shape[0] / height)).astype(np.int32)
+    cols = (np.arange(width) * (pixels.shape[1] / width)).astype(np.int32)
+    return pixels[rows[:, None], cols]
+
+
+def _pack_pixels(pixels):
+    """Pack (h, w, 4) uint8 array into flat int32 array as expected by bpy.types.ImagePreview"""
+    return np.ascontiguousarray(pixels, dtype=np.uint8).view(np.int32).reshape(-1)
+
+
+def _decode_thumbnail(source, max_size: int):
+    """
+    Decode image file (path or in-memory data) into (h, w, 4) uint8 array with bottom to top rows order.
+    Can be called from any thread.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        with PILImage.open(source) as pil_image:
+            # Jpeg images can be decoded directly at reduced scale
+            pil_image.draft('RGB', (max_size, max_size))
+            pil_image = pil_image.convert('RGBA')
+            pil_image.thumbnail((max_size, max_size))
+            pixels = np.asarray(pil_image, dtype=np.uint8)
+    except (OSError, ValueError):
+        return None
+    return pixels[::-1]
+
+
+def _read_blender_pixels(image: bpy.types.Image):
+    """Fallback to Blender image decoding, must be called from main thread"""
+    width, height = image.size
+    if not (width and height):
+        return None
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    pixels = np.clip(pixels * 255.0, 0.0, 255.0).astype(np.uint8)
+    return pixels.reshape(height, width, 4)
+
+
+def _set_preview(image: bpy.types.Image, pixels):
+    preview = image.preview
+    height, width = pixels.shape[:2]
+
+    prev_w, prev_h = _fit_size(width, height, bpy.app.render_preview_size)
+    prev_pixels = _pack_pixels(_resample(pixels, prev_w, prev_h))
+    preview.image_size = prev_w, prev_h
+    preview.image_pixels.foreach_set(prev_pixels)
+
+    icon_w, icon_h = _fit_size(width, height, bpy.app.render_icon_size)
+    preview.icon_size = icon_w, icon_h
+    preview.icon_pixels.foreach_set(_pack_pixels(_resample(pixels, icon_w, icon_h)))
+
+    return prev_pixels
+
+
+def _get_preview_hash(pixels):
+    return hashlib.blake2b(pixels).hexdigest()
+
+
+def _get_current_preview_hash(image: bpy.types.Image):
+    """
+    Hash of the existing image preview, same as for packed pixels returned by _set_preview()
+    @return: str or None if image has no preview
+    """
+    width, height = image.preview.image_size
+    if not (width and height):
+        return None
+    pixels = np.empty(width * height, dtype=np.int32)
+    image.preview.image_pixels.foreach_get(pixels)
+    return _get_preview_hash(pixels)
+
+
+def updateImageSeqPreviews(image_seq, skip_already_set: bool = True, get_pixel_arrays: bool = False):
+    """
+    Update icon and preview for each image in sequence. Existing previews of files which were not modified
+    are kept if they match preview hash stored in the source index.
+    @param image_seq: bpy.types.Image sequence.
+    @param skip_already_set: skip images with already generated preview.
+    @param get_pixel_arrays: if True, numpy int32 pixel arrays will be returned.
+    @return: list of numpy int32 pixel arrays when get_pixel_arrays True, otherwise empty list.
+    """
+    dt = time.perf_counter()
+
+    disk_count = 0
+    packed_count = 0
+    skipped_count = 0
+
+    sources = []
+    for image in image_seq:
+        if image.source != 'FILE' or (skip_already_set and image.preview.image_size[0]):
+            skipped_count += 1
+            continue
+        if image.packed_file:
+            sources.append((image, image.packed_file.data))
+            packed_count += 1
+        else:
+            fp = get_image_filepath(image)
+            if not os.path.isfile(fp):
+                skipped_count += 1
+                continue
+            sources.append((image, fp))
+            disk_count += 1
+
+    # Existing previews of unchanged files are kept if they match hashes stored by the previous update
+    index = binding.get_source_index()
+    if not (skip_already_set or get_pixel_arrays):
+        stored_hashes = index.get_preview_hashes(source for _image, source in sources if isinstance(source, str))
+        kept = {
+            image for image, source in sources
+            if isinstance(source, str) and source in stored_hashes
+            and _get_current_preview_hash(image) == stored_hashes[source]
+        }
+        if kept:
+            sources = [(image, source) for image, source in sources if image not in kept]
+            disk_count -= len(kept)
+            skipped_count += len(kept)
+
+    max_size = bpy.app.render_preview_size
+    if PILImage is not None:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            decoded = list(executor.map(lambda item: _decode_thumbnail(item[1], max_size), sources))
+    else:
+        decoded = [None] * len(sources)
+
+    image_paint = bpy.context.scene.tool_settings.image_paint
+    skip_buff_free = (image_paint.canvas, image_paint.clone_image)
+
+    ret = []
+    preview_hashes = []
+    for (image, source), pixels in zip(sources, decoded):
+        if pixels is None:
+            was_loaded = image.has_data
+            pixels = _read_blender_pixels(image)
+            if (not was_loaded) and (image not in skip_buff_free):
+                image.buffers_free()
+        if pixels is None:
+            skipped_count += 1
+            continue
+        prev_pixels = _set_preview(image, pixels)
+        if isinstance(source, str):
+            preview_hashes.append((source, _get_preview_hash(prev_pixels)))
+        if get_pixel_arrays:
+            ret.append(prev_pixels)
+    index.set_preview_hashes(preview_hashes)
+
+    print(f"Camera Projection Painter: Icons and previews of images updated in {time.perf_counter() - dt:.6f} sec:\n"
+          f"\tUsed files from disk: {disk_count}\n"
+          f"\tUsed packed files:    {packed_count}\n"
+          f"\tFiles skipped:        {skipped_count}\n"
+          f"Options: skip_already_set: {skip_already_set}, get_pixel_arrays: {get_pixel_arrays}")
+    return ret
+
@@ -0,0 +1,114 @@
+import os
+
+import gpu
+
+# Same as the library generated by the native module
+UNDISTORTED_UV_LIB = """
+// uniforms
+uniform int UND_lens_distortion_model;
+uniform float UND_image_width, UND_image_height, UND_lens, UND_principal_point_x, UND_principal_point_y,
+    UND_skew, UND_aspect_ratio, UND_k1, UND_k2, UND_k3, UND_k4, UND_t1, UND_t2;
+
+vec2 undistorted_uv(vec2 UND_uv) {
+    float u = UND_uv.x, v = UND_uv.y, u_ptr, v_ptr;
+    float k1 = 0.0f, k2 = 0.0f, k3 = 0.0f, k4 = 0.0f, t1 = 0.0f, t2 = 0.0f;
+    if (UND_lens_distortion_model != 0) {
+        k1 = UND_k1;
+    }
+    if (UND_lens_distortion_model > 1) {
+        k2 = UND_k2;
+        k3 = UND_k3;
+        if (UND_lens_distortion_model == 3 || UND_lens_distortion_model == 5) {
+            k4 = UND_k4;
+        }
+        if (UND_lens_distortion_model == 4 || UND_lens_distortion_model == 5) {
+            t1 = UND_t1;
+            t2 = UND_t2;
+        }
+    }
+    float scaleToPixel = max(UND_image_width, UND_image_height);
+    float focalLength = UND_lens * scaleToPixel / 36.0f;
+    float principalPointU = UND_principal_point_x * scaleToPixel + UND_image_width / 2;
+    float principalPointV = UND_principal_point_y * scaleToPixel + UND_image_height / 2;
+    float camera_skew = UND_skew * scaleToPixel;
+    float cx, cy, x2, y2, xy2, r2, l, dcx = 0.0f, dcy = 0.0f, tx, ty, kr2;
+    cx = u * UND_image_width / focalLength;
+    cy = -v * UND_image_height / focalLength;
+    if (UND_lens_distortion_model == 0) {
+        dcx = cx;
+        dcy = cy;
+    }
+    else if (UND_lens_distortion_model == 1) {
+        kr2 = 1.0f + k1 * (cx * cx + cy * cy);
+        dcx = cx / kr2;
+        dcy = cy / kr2;
+    }
+    else {
+        x2 = cx * cx;
+        y2 = cy * cy;
+        xy2 = 2 * cx * cy;
+        r2 = x2 + y2;
+        l = 1.0f + (((k4 * r2 + k3) * r2 + k2) * r2 + k1) * r2;
+        tx = (t1 * (r2 + 2.0f * x2) + t2 * xy2);
+        ty = (t2 * (r2 + 2.0f * y2) + t1 * xy2);
+        dcx = (cx * l + tx);
+        dcy = (cy * l + ty);
+    }
+    u_ptr = (focalLength * dcx + camera_skew * dcy + principalPointU) / UND_image_width;
+    v_ptr = 1.0f - ((focalLength * UND_aspect_ratio * dcy + principalPointV) / UND_image_height);
+    return vec2(u_ptr, v_ptr);
+}
+"""
+
+SHADERS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "shaders")
+
+
+def _read(filepath):
+    with open(filepath, "r") as file:
+        return file.read()
+
+
+class ShaderCache:
+    """
+    Compiles shaders from the engine 'shaders' directory on first request.
+    Each shader consists of '<name>_vert.glsl', '<name>_frag.glsl' and optional '<name>_geom.glsl' files,
+    all '*_lib.glsl' files and 'undistorted_uv' library are used as library code.
+    """
+    __slots__ = ("cache", "libcode")
+
+    def __init__(self):
+        if not os.path.isdir(SHADERS_DIR):
+            raise FileNotFoundError("Missing shaders directory")
+        self.cache = {}
+        self.libcode = None
+
+    def _get_libcode(self):
+        if self.libcode is None:
+            libs = sorted(n for n in os.listdir(SHADERS_DIR) if n.endswith("_lib.glsl"))
+            self.libcode = "\n".join(_read(os.path.join(SHADERS_DIR, n)) for n in libs) + UNDISTORTED_UV_LIB
+        return self.libcode
+
+    def getShader(self, name: str):
+        """
+        Returns the generated shader by name
+        @return: gpu.types.GPUShader
+        """
+        shader = self.cache.get(name, None)
+        if shader is not None:
+            return shader
+
+        vertexcode = _read(os.path.join(SHADERS_DIR, f"{name}_vert.glsl"))
+        fragcode = _read(os.path.join(SHADERS_DIR, f"{name}_frag.glsl"))
+        geocode = None
+        geom_fp = os.path.join(SHADERS_DIR, f"{name}_geom.glsl")
+        if os.path.isfile(geom_fp):
+            geocode = _read(geom_fp)
+
+        shader = gpu.types.GPUShader(
+            vertexcode=vertexcode,
+            fragcode=fragcode,
+            geocode=geocode,
+            libcode=self._get_libcode()
+        )
+        self.cache[name] = shader
+        return shader
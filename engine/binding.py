@@ -0,0 +1,104 @@
+import os
+import time
+
+from . import source_index
+from . import image_sizes
+
+import bpy
+
+_source_index = None
+
+
+def get_source_index():
+    """
+    Source images index stored in Blender user data files directory
+    @return: source_index.SourceIndex
+    """
+    global _source_index
+    if _source_index is None:
+        directory = bpy.utils.user_resource('DATAFILES', path="camera_projection_painter", create=True)
+        _source_index = source_index.SourceIndex(os.path.join(directory, "source_index.sqlite"))
+    return _source_index
+
+
+def close_source_index():
+    global _source_index
+    if _source_index is not None:
+        _source_index.close()
+        _source_index = None
+
+
+def _get_image_filepath(image: bpy.types.Image):
+    return bpy.path.abspath(image.filepath, library=image.library)
+
+
+def bind_camera_images(camera_seq, source_dir: str, search_blend: bool, rename: bool):
+    """
+    Bind images by matching filename or Blender datablock name (or datablock filepath if exists).
+    Files in source directory are looked up through persistent index, so only new or modified files
+    are read from disk.
+    @return: int, number of binded cameras
+    """
+    dt = time.perf_counter()
+    name_key = source_index.name_key
+
+    by_name = {}
+    by_filepath = {}
+    if search_blend:
+        for image in bpy.data.images:
+            by_name.setdefault(name_key(image.name), image)
+            if image.filepath:
+                by_filepath.setdefault(name_key(os.path.basename(_get_image_filepath(image))), image)
+
+    index = None
+    in_directory = {}
+    source_dir = bpy.path.abspath(source_dir)
+    if source_dir and os.path.isdir(source_dir):
+        index = get_source_index()
+        index.refresh(source_dir)
+        in_directory = index.get_entries(source_dir)
+
+    found_by_name = []
+    found_by_filepath = []
+    found_in_directory = 0
+
+    for camera_ob in camera_seq:
+        key = name_key(camera_ob.name)
+        image = by_name.get(key, None)
+        if image is not None:
+            found_by_name.append(image.name)
+        else:
+            image = by_filepath.get(key, None)
+            if image is not None:
+                found_by_filepath.append(image.name)
+            else:
+                entry = in_directory.get(key, None)
+                if entry is None or not index.validate(entry):
+                    continue
+                image = bpy.data.images.load(filepath=entry.filepath, check_existing=True)
+                if not image.cpp.static_size[0]:
+                    image.cpp.static_size = entry.width, entry.height
+                found_in_directory += 1
+
+        if not image.cpp.static_size[0]:
+            image.cpp.static_size = image_sizes.read_image_size(image)
+
+        if rename and image.filepath:
+            filename = os.path.basename(_get_image_filepath(image))
+            image.name = filename
+            camera_ob.name = filename
+
+        camera_ob.data.cpp.image = image
+
+    binded = len(found_by_name) + len(found_by_filepath) + found_in_directory
+
+    if binded:
+        print(f"Camera Projection Painter: Binded {binded} images in {time.perf_counter() - dt:.6f} sec:\n"
+              f"\tFound among the images in the current file by name: {len(found_by_name)} {found_by_name}\n"
+              f"\tFound among images in the current file by file path {len(found_by_filepath)} {found_by_filepath}\n"
+              f"\tFound among files in source directory:              {found_in_directory}")
+        if index is not None:
+            print(f"\tSource directory index refreshed: {index.refreshed}, files read: {index.read}")
+    else:
+        print("Camera Projection Painter: No match found for any camera")
+    return binded
@@ -0,0 +1,199 @@
+# Camera calibration *.csv parser. Does not depend on Blender.
+import csv
+
+import numpy as np
+
+from . import projection
+
+# In Reality Capture exported *.csv first line always starts with commented line camera #name.
+# Full calibration parameters list is:
+#     ['#name', 'x', 'y', 'alt', 'heading', 'pitch', 'roll', 'f', 'px', 'py', 'k1', 'k2', 'k3', 'k4', 't1', 't2']
+NAME_COLUMN = "#name"
+INTRINSICS_COLUMNS = ("f", "px", "py", "k1", "k2", "k3", "k4", "t1", "t2")
+POSE_COLUMNS = ("x", "y", "alt", "heading", "pitch", "roll")
+
+
+class CalibrationTable:
+    """
+    Parsed calibration file. Camera names are stored in a list, all numeric values as float64 column arrays
+    """
+    __slots__ = ("names", "columns", "skipped")
+
+    def __init__(self, names, columns, skipped):
+        self.names = names
+        self.columns = columns
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+
+def _parse_rows_fallback(lines, usecols):
+    """Row by row parsing, rows with invalid values are skipped"""
+    valid = []
+    values = []
+    for i, line in enumerate(lines):
+        fields = line.split(",")
+        try:
+            values.append([float(fields[col]) for col in usecols])
+        except ValueError:
+            continue
+        valid.append(i)
+    return valid, np.array(values, dtype=np.float64).reshape(-1, len(usecols))
+
+
+def _parse_quoted_row(line, fields_count, name_col, usecols):
+    """
+    Quoted fields may contain separators, such rows are parsed by csv module
+    @return: tuple (name, values) or None if row is invalid
+    """
+    fields = next(csv.reader((line,)))
+    if len(fields) != fields_count:
+        return None
+    try:
+        return fields[name_col].strip(), [float(fields[col]) for col in usecols]
+    except ValueError:
+        return None
+
+
+def read_calibration_lines(lines, columns=INTRINSICS_COLUMNS):
+    """
+    Parse calibration file lines (including header line). Rows without quoted fields
+    are parsed by a single vectorized call.
+    @param columns: required numeric columns
+    @return: CalibrationTable or None if file is not supported
+    """
+    lines = iter(lines)
+    header = next(lines, "").strip()
+    header_fields = [n.strip() for n in next(csv.reader((header,)), [])]
+    if not header_fields or header_fields[0] != NAME_COLUMN:
+        return None
+    if any(n not in header_fields for n in columns):
+        return None
+
+    fields_count = len(header_fields)
+    separators_count = fields_count - 1
+    name_col = header_fields.index(NAME_COLUMN)
+    usecols = [header_fields.index(n) for n in columns]
+
+    # Rows with different number of fields than header are skipped
+    data_lines = []
+    data_positions = []
+    quoted_rows = []
+    quoted_positions = []
+    skipped = 0
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        position = len(data_lines) + len(quoted_rows)
+        if '"' in line:
+            row = _parse_quoted_row(line, fields_count, name_col, usecols)
+            if row is None:
+                skipped += 1
+                continue
+            quoted_rows.append(row)
+            quoted_positions.append(position)
+            continue
+        if line.count(",") != separators_count:
+            skipped += 1
+            continue
+        data_lines.append(line)
+        data_positions.append(position)
+
+    if data_lines:
+        try:
+            values = np.loadtxt(data_lines, delimiter=",", usecols=usecols, dtype=np.float64, ndmin=2)
+            valid = range(len(data_lines))
+        except ValueError:
+            valid, values = _parse_rows_fallback(data_lines, usecols)
+            skipped += len(data_lines) - len(valid)
+        names = [data_lines[i].split(",", name_col + 1)[name_col].strip() for i in valid]
+    else:
+        valid = ()
+        values = np.empty((0, len(columns)), dtype=np.float64)
+        names = []
+
+    if quoted_rows:
+        # Restore rows order of the file
+        positions = [data_positions[i] for i in valid] + quoted_positions
+        order = np.argsort(positions, kind='stable')
+        names += [name for name, _values in quoted_rows]
+        names = [names[i] for i in order.tolist()]
+        quoted_values = np.array([row_values for _name, row_values in quoted_rows], dtype=np.float64)
+        values = np.concatenate((values, quoted_values))[order]
+
+    table_columns = {n: np.ascontiguousarray(values[:, i]) for i, n in enumerate(columns)}
+    return CalibrationTable(names, table_columns, skipped)
+
+
+def read_calibration_csv(filepath: str, columns=INTRINSICS_COLUMNS):
+    """
+    Read calibration *.csv file in a single pass into column arrays.
+    @return: CalibrationTable or None if file is not supported
+    """
+    with open(filepath, "r") as file:
+        return read_calibration_lines(file, columns)
+
+
+def get_lens_models(table: CalibrationTable):
+    """
+    Lens distortion model for each row as index in projection.LENS_MODELS,
+    -1 for rows without radial coefficients k2, k3 (model should be left unchanged)
+    @return: numpy.ndarray int32
+    """
+    k2 = table["k2"] != 0.0
+    k3 = table["k3"] != 0.0
+    k4 = table["k4"] != 0.0
+    tangential = (table["t1"] != 0.0) | (table["t2"] != 0.0)
+
+    models = np.full(len(table), -1, dtype=np.int32)
+    radial = k2 | k3
+    models[radial] = projection.LENS_MODELS.index('brown3')
+    models[radial & k4] = projection.LENS_MODELS.index('brown4')
+    models[radial & tangential] = projection.LENS_MODELS.index('brown3t2')
+    models[radial & tangential & k4] = projection.LENS_MODELS.index('brown4t2')
+    return models
+
+
+def get_pose_matrices(table: CalibrationTable):
+    """
+    Camera world matrices from position (x, y, alt) and orientation (heading, pitch, roll) in degrees.
+    Position is expected in a projected (cartesian) coordinate system. Zero orientation is a camera looking
+    straight down with image top to the north (+Y). Heading is clockwise from north, pitch tilts camera
+    towards the horizon, roll rotates camera around its view axis:
+        R = Rz(-heading) @ Rx(pitch) @ Rz(roll)
+    @return: numpy.ndarray (N, 4, 4) float64
+    """
+    heading = np.radians(table["heading"])
+    pitch = np.radians(table["pitch"])
+    roll = np.radians(table["roll"])
+
+    ch, sh = np.cos(heading), -np.sin(heading)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cr, sr = np.cos(roll), np.sin(roll)
+
+    ret = np.zeros((len(table), 4, 4), dtype=np.float64)
+    # Rz(-heading) @ Rx(pitch)
+    ret[:, 0, 0] = ch
+    ret[:, 0, 1] = -sh * cp
+    ret[:, 0, 2] = sh * sp
+    ret[:, 1, 0] = sh
+    ret[:, 1, 1] = ch * cp
+    ret[:, 1, 2] = -ch * sp
+    ret[:, 2, 1] = sp
+    ret[:, 2, 2] = cp
+    # @ Rz(roll)
+    col_0 = ret[:, :3, 0] * cr[:, None] + ret[:, :3, 1] * sr[:, None]
+    col_1 = ret[:, :3, 1] * cr[:, None] - ret[:, :3, 0] * sr[:, None]
+    ret[:, :3, 0] = col_0
+    ret[:, :3, 1] = col_1
+
+    ret[:, 0, 3] = table["x"]
+    ret[:, 1, 3] = table["y"]
+    ret[:, 2, 3] = table["alt"]
+    ret[:, 3, 3] = 1.0
+    return ret
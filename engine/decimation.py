@@ -0,0 +1,80 @@
+# Vertex clustering mesh decimation. Does not depend on Blender.
+import numpy as np
+
+
+def get_cell_size(positions, resolution: int):
+    """
+    Size of the clustering grid cell, so that the largest dimension of the bounding box is divided
+    into the given number of cells
+    @param positions: numpy.ndarray (N, 3)
+    @return: float
+    """
+    if not len(positions):
+        return 1.0
+    extent = float(np.max(positions.max(axis=0) - positions.min(axis=0)))
+    if extent <= 0.0:
+        return 1.0
+    return extent / max(resolution, 1)
+
+
+def cluster_vertices(positions, cell_size: float):
+    """
+    Assign every vertex to the cell of a regular grid
+    @param positions: numpy.ndarray (N, 3)
+    @return: tuple (numpy.ndarray (N,) int32 cluster index of each vertex, int number of clusters)
+    """
+    if not len(positions):
+        return np.empty(0, dtype=np.int32), 0
+    cells = np.floor((positions - positions.min(axis=0)) / cell_size).astype(np.int64)
+    dims = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    unique_keys, clusters = np.unique(keys, return_inverse=True)
+    return np.reshape(clusters, -1).astype(np.int32), len(unique_keys)
+
+
+def average_clusters(values, clusters, count: int, normalize: bool = False):
+    """
+    Average of the vertex attribute values in each cluster
+    @param values: numpy.ndarray (N, 3)
+    @param normalize: normalize resulting vectors (used for normals)
+    @return: numpy.ndarray (count, 3) float32
+    """
+    ret = np.empty((count, 3), dtype=np.float32)
+    for axis in range(3):
+        ret[:, axis] = np.bincount(clusters, weights=values[:, axis], minlength=count)
+    if normalize:
+        length = np.linalg.norm(ret, axis=1)
+        np.divide(ret, length[:, None], out=ret, where=length[:, None] > 0.0)
+    else:
+        weights = np.bincount(clusters, minlength=count)
+        ret /= np.maximum(weights, 1)[:, None]
+    return ret
+
+
+def cluster_triangles(triangles, clusters):
+    """
+    Triangles with vertex indices replaced by cluster indices. Triangles which collapse into a line or a point
+    are removed
+    @param triangles: numpy.ndarray (M, 3) of vertex indices
+    @return: numpy.ndarray (K, 3) int32
+    """
+    ret = clusters[triangles]
+    valid = (ret[:, 0] != ret[:, 1]) & (ret[:, 1] != ret[:, 2]) & (ret[:, 2] != ret[:, 0])
+    return np.ascontiguousarray(ret[valid], dtype=np.int32)
+
+
+def decimate(positions, normals, triangles, resolution: int):
+    """
+    Decimate triangle mesh by vertex clustering. All vertices inside of the grid cell are merged
+    into their average position
+    @param resolution: number of grid cells along the largest dimension of the mesh bounding box
+    @return: tuple (positions (K, 3) float32, normals (K, 3) float32, triangles (L, 3) int32,
+        clusters (N,) int32 cluster index of each source vertex)
+    """
+    clusters, count = cluster_vertices(positions, get_cell_size(positions, resolution))
+    return (
+        average_clusters(positions, clusters, count),
+        average_clusters(normals, clusters, count, normalize=True),
+        cluster_triangles(triangles, clusters),
+        clusters
+    )
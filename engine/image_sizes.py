@@ -0,0 +1,196 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import imageheader
+
+import bpy
+
+
+def _read_file_header(filepath: str, headers: dict):
+    """Runs in worker thread. Only 'stat' call is made if file was already read"""
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return 0, 0
+    key = (filepath, stat.st_mtime_ns, stat.st_size)
+    size = headers.get(key, None)
+    if size is None:
+        size = imageheader.read_file_size(filepath)
+        headers[key] = size
+    return size
+
+
+def read_image_size(image: bpy.types.Image):
+    """
+    Image width and height read from file header, packed file data or generated image parameters
+    @return: tuple (width, height)
+    """
+    if image.source == 'GENERATED':
+        return tuple(image.size)
+    elif image.source == 'FILE':
+        ext = os.path.splitext(image.filepath)[-1]
+        if image.packed_file:
+            return imageheader.read_buffer_size(image.packed_file.data, ext)
+        return imageheader.read_file_size(bpy.path.abspath(image.filepath, library=image.library))
+    return 0, 0
+
+
+class ImageSizeScanner:
+    """
+    Keeps image.cpp.static_size up to date.
+    Image headers are read on a thread pool and cached by (filepath, mtime, file size).
+    Rescans are driven by invalidation: until the number of images changes or some images
+    are marked as dirty by handlers, only the number of images is checked. Names of the images
+    are compared when the number changes or an image which was not seen before is invalidated
+    (image added and another removed between two updates).
+    """
+    __slots__ = (
+        "headers",
+        "filepaths",
+        "dirty_images",
+        "check_filepaths",
+        "check_names",
+        "known_count",
+        "known_names",
+        "executor",
+        "scanned",
+        "skipped",
+    )
+
+    def __init__(self):
+        self.headers = {}
+        self.filepaths = {}
+        self.dirty_images = set()
+        self.check_filepaths = False
+        self.check_names = False
+        self.known_count = -1
+        self.known_names = None
+        self.executor = None
+        self.scanned = 0
+        self.skipped = 0
+
+    def clear(self):
+        self.headers.clear()
+        self.filepaths.clear()
+        self.dirty_images.clear()
+        self.check_filepaths = False
+        self.check_names = False
+        self.known_count = -1
+        self.known_names = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def invalidate(self, image: bpy.types.Image = None):
+        """
+        Mark image as requiring rescan. If image is not given, all images which filepath
+        was changed since the last scan would be rescanned
+        """
+        if image is None:
+            self.check_filepaths = True
+        else:
+            self.dirty_images.add(image)
+            if image not in self.filepaths:
+                self.check_names = True
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 1) * 4),
+                thread_name_prefix="cpp_image_size"
+            )
+        return self.executor
+
+    def _is_scan_required(self, image):
+        if not image.cpp.static_size[0]:
+            return True
+        if image in self.dirty_images:
+            return True
+        if self.check_filepaths and self.filepaths.get(image, None) != image.filepath:
+            return True
+        return False
+
+    def _prune(self, image_seq):
+        """
+        Remove cached file paths and headers of removed images
+        """
+        images = set(image_seq)
+        for image in [image for image in self.filepaths.keys() if image not in images]:
+            del self.filepaths[image]
+        self.dirty_images.intersection_update(images)
+
+        used = set()
+        for image in images:
+            if image.source == 'FILE' and not image.packed_file:
+                used.add(bpy.path.abspath(image.filepath, library=image.library))
+        for key in [key for key in self.headers.keys() if key[0] not in used]:
+            del self.headers[key]
+
+    def update(self, image_seq, skip_already_set: bool = True):
+        """
+        Update image.cpp.static_size for images in the sequence.
+        @param image_seq: bpy.types.Image sequence, usually bpy.data.images
+        @param skip_already_set: skip images with already set static size, unless they are invalidated.
+        @return: int, number of images with updated size
+        """
+        names_changed = False
+        images_count = len(image_seq)
+        if images_count != self.known_count or self.check_names:
+            keys = getattr(image_seq, "keys", None)
+            names = frozenset(keys() if keys is not None else (image.name for image in image_seq))
+            known_names = self.known_names
+            if known_names is not None and not names.issuperset(known_names):
+                self._prune(image_seq)
+            names_changed = names != known_names
+            self.known_names = names
+            self.known_count = images_count
+            self.check_names = False
+
+        if skip_already_set and not names_changed and not self.check_filepaths:
+            if not self.dirty_images:
+                self.skipped += 1
+                return 0
+            # Only invalidated images are processed
+            image_seq = []
+            for image in self.dirty_images:
+                try:
+                    getattr(image, "name")
+                except ReferenceError:
+                    continue
+                image_seq.append(image)
+        self.scanned += 1
+
+        sizes = {}
+        file_images = {}
+
+        for image in image_seq:
+            if skip_already_set and not self._is_scan_required(image):
+                # Image is known, so its invalidation does not require names comparison
+                self.filepaths.setdefault(image, image.filepath)
+                continue
+            self.filepaths[image] = image.filepath
+            if image.source == 'FILE' and not image.packed_file:
+                fp = bpy.path.abspath(image.filepath, library=image.library)
+                file_images.setdefault(fp, []).append(image)
+            else:
+                sizes[image] = read_image_size(image)
+
+        self.dirty_images.clear()
+        self.check_filepaths = False
+
+        if file_images:
+            filepaths = list(file_images.keys())
+            if len(filepaths) == 1:
+                results = [_read_file_header(filepaths[0], self.headers)]
+            else:
+                results = self._get_executor().map(lambda fp: _read_file_header(fp, self.headers), filepaths)
+            for fp, size in zip(filepaths, results):
+                for image in file_images[fp]:
+                    sizes[image] = size
+
+        updated = 0
+        for image, size in sizes.items():
+            if tuple(image.cpp.static_size) != tuple(size):
+                image.cpp.static_size = size
+                updated += 1
+        return updated
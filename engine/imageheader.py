@@ -0,0 +1,168 @@
+# The module reads image dimensions from file headers only, without decoding pixels.
+# It does not depend on Blender and can be used from any thread.
+import io
+import os
+import struct
+
+SUPPORTED_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".tga", ".bmp")
+
+_PNG_MAGIC = b"\x89PNG\r\n\x1a\n"
+_JPEG_MAGIC = b"\xff\xd8"
+_BMP_MAGIC = b"BM"
+_TIFF_MAGIC = (b"II*\x00", b"MM\x00*")
+
+# JPEG start of frame markers (baseline, progressive, lossless, arithmetic)
+_JPEG_SOF_MARKERS = frozenset((
+    0xC0, 0xC1, 0xC2, 0xC3,
+    0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB,
+    0xCD, 0xCE, 0xCF
+))
+
+# TIFF field types and tags
+_TIFF_SHORT = 3
+_TIFF_LONG = 4
+_TIFF_IMAGE_WIDTH = 256
+_TIFF_IMAGE_LENGTH = 257
+
+
+def _read_png(stream):
+    stream.seek(8)
+    chunk = stream.read(16)
+    if len(chunk) < 16 or chunk[4:8] != b"IHDR":
+        return 0, 0
+    return struct.unpack(">II", chunk[8:16])
+
+
+def _read_jpeg(stream):
+    stream.seek(2)
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            return 0, 0
+        if byte != b"\xff":
+            continue
+        marker = stream.read(1)
+        # Skip fill bytes
+        while marker == b"\xff":
+            marker = stream.read(1)
+        if not marker:
+            return 0, 0
+        marker = marker[0]
+        # Markers without payload
+        if marker == 0xD8 or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue
+        if marker == 0xD9 or marker == 0xDA:
+            # End of image or start of scan before any frame header
+            return 0, 0
+        segment_length = stream.read(2)
+        if len(segment_length) < 2:
+            return 0, 0
+        segment_length = struct.unpack(">H", segment_length)[0]
+        if marker in _JPEG_SOF_MARKERS:
+            data = stream.read(5)
+            if len(data) < 5:
+                return 0, 0
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        stream.seek(segment_length - 2, os.SEEK_CUR)
+
+
+def _read_tiff(stream):
+    stream.seek(0)
+    header = stream.read(8)
+    if len(header) < 8:
+        return 0, 0
+    bo = "<" if header[:2] == b"II" else ">"
+    ifd_offset = struct.unpack(bo + "I", header[4:8])[0]
+    stream.seek(ifd_offset)
+    count = stream.read(2)
+    if len(count) < 2:
+        return 0, 0
+    count = struct.unpack(bo + "H", count)[0]
+    entries = stream.read(count * 12)
+    width = height = 0
+    for i in range(len(entries) // 12):
+        tag, field_type = struct.unpack(bo + "HH", entries[i * 12: i * 12 + 4])
+        if tag not in (_TIFF_IMAGE_WIDTH, _TIFF_IMAGE_LENGTH):
+            continue
+        value_data = entries[i * 12 + 8: i * 12 + 12]
+        if field_type == _TIFF_SHORT:
+            value = struct.unpack(bo + "H", value_data[:2])[0]
+        elif field_type == _TIFF_LONG:
+            value = struct.unpack(bo + "I", value_data)[0]
+        else:
+            continue
+        if tag == _TIFF_IMAGE_WIDTH:
+            width = value
+        else:
+            height = value
+    if width and height:
+        return width, height
+    return 0, 0
+
+
+def _read_bmp(stream):
+    stream.seek(14)
+    data = stream.read(12)
+    if len(data) < 12:
+        return 0, 0
+    header_size = struct.unpack("<I", data[:4])[0]
+    if header_size == 12:
+        # OS/2 BITMAPCOREHEADER
+        width, height = struct.unpack("<HH", data[4:8])
+    else:
+        width, height = struct.unpack("<ii", data[4:12])
+    return abs(width), abs(height)
+
+
+def _read_tga(stream):
+    stream.seek(0)
+    data = stream.read(18)
+    if len(data) < 18:
+        return 0, 0
+    return struct.unpack("<HH", data[12:16])
+
+
+def read_stream_size(stream, ext: str = ""):
+    """
+    Read image width and height from a binary stream that supports seeking.
+    @return: tuple (width, height), (0, 0) if format is not supported or header is corrupted
+    """
+    magic = stream.read(8)
+    try:
+        if magic.startswith(_PNG_MAGIC):
+            return _read_png(stream)
+        elif magic.startswith(_JPEG_MAGIC):
+            return _read_jpeg(stream)
+        elif magic[:4] in _TIFF_MAGIC:
+            return _read_tiff(stream)
+        elif magic.startswith(_BMP_MAGIC):
+            return _read_bmp(stream)
+        elif ext.lower() == ".tga":
+            # Targa files does not have a magic number
+            return _read_tga(stream)
+    except struct.error:
+        pass
+    return 0, 0
+
+
+def read_file_size(filepath: str):
+    """
+    Read image width and height from file on disk.
+    @return: tuple (width, height), (0, 0) if file is missing or not supported
+    """
+    ext = os.path.splitext(filepath)[-1]
+    try:
+        with open(filepath, "rb") as stream:
+            return read_stream_size(stream, ext)
+    except OSError:
+        return 0, 0
+
+
+def read_buffer_size(data: bytes, ext: str = ""):
+    """
+    Read image width and height from in-memory file data (for example, packed file data).
+    @return: tuple (width, height), (0, 0) if format is not supported
+    """
+    return read_stream_size(io.BytesIO(data), ext)
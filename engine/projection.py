@@ -0,0 +1,94 @@
+# Vectorized projector math. Mirrors the 'undistorted_uv' shader library and does not depend on Blender.
+import numpy as np
+
+# Order matches extend_bpy_types.camera.camera_lens_model_items
+LENS_MODELS = ('perspective', 'division', 'brown3', 'brown4', 'brown3t2', 'brown4t2')
+
+# Film width in millimeters the calibration values are expressed against
+SENSOR_WIDTH = 36.0
+
+CLIP_START = 0.1
+CLIP_END = 1000.0
+
+
+def projector_matrix(lens: float, width: int, height: int):
+    """
+    Projection matrix of a camera which maps image rectangle into [-0.5, 0.5] range
+    after perspective division. Principal point, skew, aspect ratio and distortion are applied
+    later by undistorted_uv().
+    @return: numpy.ndarray 4x4 float32
+    """
+    focal_length = lens * max(width, height) / SENSOR_WIDTH
+    fn = CLIP_END - CLIP_START
+    return np.array((
+        (focal_length / width, 0.0, 0.0, 0.0),
+        (0.0, focal_length / height, 0.0, 0.0),
+        (0.0, 0.0, -(CLIP_END + CLIP_START) / fn, -2.0 * CLIP_END * CLIP_START / fn),
+        (0.0, 0.0, -1.0, 0.0)
+    ), dtype=np.float32)
+
+
+def undistorted_uv(uv, width: int, height: int, lens: float,
+                   principal_point_x=0.0, principal_point_y=0.0, skew=0.0, aspect_ratio=1.0,
+                   lens_model=0, k1=0.0, k2=0.0, k3=0.0, k4=0.0, t1=0.0, t2=0.0):
+    """
+    Map projector-space coordinates (centered at zero) into image texture coordinates.
+    @param uv: numpy.ndarray of shape (N, 2)
+    @param lens_model: index in LENS_MODELS
+    @return: numpy.ndarray of shape (N, 2), same dtype as input
+    """
+    if lens_model == 0:
+        k1 = 0.0
+    if lens_model < 2:
+        k2 = k3 = 0.0
+    if lens_model not in (3, 5):
+        k4 = 0.0
+    if lens_model not in (4, 5):
+        t1 = t2 = 0.0
+
+    scale_to_pixel = max(width, height)
+    focal_length = lens * scale_to_pixel / SENSOR_WIDTH
+    principal_point_u = principal_point_x * scale_to_pixel + width / 2
+    principal_point_v = principal_point_y * scale_to_pixel + height / 2
+    camera_skew = skew * scale_to_pixel
+
+    cx = uv[:, 0] * (width / focal_length)
+    cy = uv[:, 1] * (-height / focal_length)
+
+    if lens_model == 0:
+        dcx = cx
+        dcy = cy
+    elif lens_model == 1:
+        kr2 = 1.0 + k1 * (cx * cx + cy * cy)
+        dcx = cx / kr2
+        dcy = cy / kr2
+    else:
+        x2 = cx * cx
+        y2 = cy * cy
+        xy2 = 2.0 * cx * cy
+        r2 = x2 + y2
+        lr = 1.0 + (((k4 * r2 + k3) * r2 + k2) * r2 + k1) * r2
+        tx = t1 * (r2 + 2.0 * x2) + t2 * xy2
+        ty = t2 * (r2 + 2.0 * y2) + t1 * xy2
+        dcx = cx * lr + tx
+        dcy = cy * lr + ty
+
+    res = np.empty_like(uv)
+    res[:, 0] = (focal_length * dcx + camera_skew * dcy + principal_point_u) / width
+    res[:, 1] = 1.0 - ((focal_length * aspect_ratio * dcy + principal_point_v) / height)
+    return res
+
+
+def project_points(points, matrix):
+    """
+    Transform points by 4x4 matrix and perform perspective division.
+    @param points: numpy.ndarray of shape (N, 3)
+    @return: tuple of projected xy coordinates of shape (N, 2) and w component of shape (N,)
+    """
+    xy = points @ matrix[:2, :3].T
+    xy += matrix[:2, 3]
+    w = points @ matrix[3, :3]
+    w += matrix[3, 3]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xy /= w[:, None]
+    return xy, w
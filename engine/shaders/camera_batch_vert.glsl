@@ -0,0 +1,12 @@
+uniform mat4 ModelViewProjectionMatrix;
+
+in vec3 pos;
+in vec4 color;
+
+out vec4 col_interp;
+
+void main()
+{
+    col_interp = color;
+    gl_Position = ModelViewProjectionMatrix * vec4(pos, 1.0);
+}
@@ -0,0 +1,19 @@
+uniform sampler2DArray previews;
+uniform vec4 image_space_color;
+
+in vec2 uvInterp;
+in vec2 uvScaleInterp;
+flat in float layerInterp;
+out vec4 fragColor;
+
+void main()
+{
+    if (!inside_rect(uvInterp, vec2(0.0), vec2(1.0))) {
+        fragColor = image_space_color;
+        return;
+    }
+    fragColor = blender_srgb_to_framebuffer_space(texture(previews, vec3(uvInterp * uvScaleInterp, layerInterp)));
+    if (fragColor.a < 0.95f){
+        fragColor = image_space_color;
+    }
+}
\ No newline at end of file
@@ -0,0 +1,19 @@
+uniform mat4 ModelViewProjectionMatrix;
+
+in vec3 pos;
+in vec2 uv;
+in vec2 uv_scale;
+in float layer;
+
+out vec2 uvInterp;
+out vec2 uvScaleInterp;
+flat out float layerInterp;
+
+void main()
+{
+    uvInterp = uv;
+    uvScaleInterp = uv_scale;
+    layerInterp = layer;
+
+    gl_Position = ModelViewProjectionMatrix * vec4(pos, 1.0);
+}
@@ -0,0 +1,236 @@
+# Persistent index of image files in source directories.
+# Does not depend on Blender, database file location is given by caller.
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from . import imageheader
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    directory TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    stem TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    preview_hash TEXT,
+    PRIMARY KEY (directory, filename)
+);
+CREATE INDEX IF NOT EXISTS files_stem ON files (directory, stem);
+"""
+
+
+def name_key(name: str):
+    """
+    Image or camera name without supported image extension.
+    Names like 'IMG_0001.JPG', 'IMG_0001.jpg' and 'IMG_0001' have the same key
+    """
+    stem, ext = os.path.splitext(name)
+    if ext.lower() in imageheader.SUPPORTED_IMAGE_EXTENSIONS:
+        return stem
+    return name
+
+
+class IndexEntry:
+    __slots__ = ("filepath", "mtime_ns", "size", "width", "height")
+
+    def __init__(self, filepath, mtime_ns, size, width, height):
+        self.filepath = filepath
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.width = width
+        self.height = height
+
+
+def _read_entry(directory: str, filename: str):
+    """Runs in worker thread"""
+    filepath = os.path.join(directory, filename)
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return None
+    width, height = imageheader.read_file_size(filepath)
+    return IndexEntry(filepath, stat.st_mtime_ns, stat.st_size, width, height)
+
+
+class SourceIndex:
+    """
+    SQLite index of supported image files in source directories: file name stems, extensions,
+    dimensions, modification times and preview hashes. Directory listing is skipped entirely
+    while directory modification time is the same as at the previous refresh.
+    """
+    __slots__ = ("connection", "refreshed", "read")
+
+    def __init__(self, db_filepath: str):
+        self.connection = sqlite3.connect(db_filepath)
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self.connection.executescript("DROP TABLE IF EXISTS directories; DROP TABLE IF EXISTS files;")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(_SCHEMA)
+        # Statistics of the last refresh
+        self.refreshed = False
+        self.read = 0
+
+    def close(self):
+        self.connection.close()
+
+    def refresh(self, directory: str):
+        """
+        Update index of the directory. Only new and modified files headers are read.
+        @return: bool, True if directory content was listed
+        """
+        self.refreshed = False
+        self.read = 0
+
+        directory = os.path.normpath(directory)
+        try:
+            dir_mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return False
+
+        con = self.connection
+        row = con.execute("SELECT mtime_ns FROM directories WHERE path = ?", (directory,)).fetchone()
+        if row and row[0] == dir_mtime_ns:
+            return False
+
+        known = {
+            filename: (mtime_ns, size) for filename, mtime_ns, size in con.execute(
+                "SELECT filename, mtime_ns, size FROM files WHERE directory = ?", (directory,))
+        }
+
+        changed = []
+        existing = set()
+        for entry in os.scandir(directory):
+            ext = os.path.splitext(entry.name)[-1]
+            if ext.lower() not in imageheader.SUPPORTED_IMAGE_EXTENSIONS:
+                continue
+            try:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            existing.add(entry.name)
+            if known.get(entry.name, None) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(entry.name)
+
+        removed = [(directory, filename) for filename in known.keys() if filename not in existing]
+
+        entries = []
+        if changed:
+            with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                entries = list(executor.map(lambda filename: _read_entry(directory, filename), changed))
+
+        with con:
+            con.executemany("DELETE FROM files WHERE directory = ? AND filename = ?", removed)
+            con.executemany(
+                "INSERT OR REPLACE INTO files "
+                "(directory, filename, stem, ext, mtime_ns, size, width, height, preview_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)",
+                (
+                    (directory, filename, os.path.splitext(filename)[0], os.path.splitext(filename)[-1],
+                     entry.mtime_ns, entry.size, entry.width, entry.height)
+                    for filename, entry in zip(changed, entries) if entry is not None
+                )
+            )
+            con.execute("INSERT OR REPLACE INTO directories (path, mtime_ns) VALUES (?, ?)",
+                        (directory, dir_mtime_ns))
+
+        self.refreshed = True
+        self.read = len(changed)
+        return True
+
+    def get_entries(self, directory: str):
+        """
+        Index entries of the directory by name key (see name_key())
+        @return: dict
+        """
+        directory = os.path.normpath(directory)
+        ret = {}
+        for filename, mtime_ns, size, width, height in self.connection.execute(
+                "SELECT filename, mtime_ns, size, width, height FROM files WHERE directory = ? ORDER BY filename",
+                (directory,)):
+            ret.setdefault(
+                name_key(filename),
+                IndexEntry(os.path.join(directory, filename), mtime_ns, size, width, height)
+            )
+        return ret
+
+    def validate(self, entry: IndexEntry):
+        """
+        Check that file was not modified since indexing, update entry otherwise.
+        Is used for files which are going to be used, because in-place modification of a file
+        does not change directory modification time.
+        @return: bool, False if file no longer exists
+        """
+        try:
+            stat = os.stat(entry.filepath)
+        except OSError:
+            return False
+        if (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size):
+            return True
+
+        entry.mtime_ns = stat.st_mtime_ns
+        entry.size = stat.st_size
+        entry.width, entry.height = imageheader.read_file_size(entry.filepath)
+
+        directory, filename = os.path.split(entry.filepath)
+        with self.connection:
+            self.connection.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, width = ?, height = ?, preview_hash = NULL "
+                "WHERE directory = ? AND filename = ?",
+                (entry.mtime_ns, entry.size, entry.width, entry.height, directory, filename)
+            )
+        return True
+
+    def get_preview_hashes(self, filepaths):
+        """
+        Preview hashes of indexed files which were not modified since indexing
+        @param filepaths: iterable of file paths
+        @return: dict {filepath: preview hash}, files without stored hash are omitted
+        """
+        by_directory = {}
+        for filepath in filepaths:
+            directory, filename = os.path.split(os.path.normpath(filepath))
+            by_directory.setdefault(directory, {})[filename] = filepath
+
+        ret = {}
+        for directory, filenames in by_directory.items():
+            for filename, mtime_ns, size, preview_hash in self.connection.execute(
+                    "SELECT filename, mtime_ns, size, preview_hash FROM files "
+                    "WHERE directory = ? AND preview_hash IS NOT NULL", (directory,)):
+                filepath = filenames.get(filename, None)
+                if filepath is None:
+                    continue
+                try:
+                    stat = os.stat(filepath)
+                except OSError:
+                    continue
+                if (stat.st_mtime_ns, stat.st_size) == (mtime_ns, size):
+                    ret[filepath] = preview_hash
+        return ret
+
+    def set_preview_hashes(self, items):
+        """
+        Store preview hashes of indexed files in a single transaction
+        @param items: iterable of (filepath, preview hash)
+        """
+        rows = []
+        for filepath, preview_hash in items:
+            directory, filename = os.path.split(os.path.normpath(filepath))
+            rows.append((preview_hash, directory, filename))
+        if not rows:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE files SET preview_hash = ? WHERE directory = ? AND filename = ?", rows)
@@ -35,6 +35,60 @@ camera_lens_model_items = [
 ]
 
 
+# Uniforms used by each lens model in addition to image size, lens, principal point, skew and aspect ratio
+_lens_model_uniforms = {
+    'perspective': (),
+    'division': ("k1",),
+    'brown3': ("k1", "k2", "k3"),
+    'brown4': ("k1", "k2", "k3", "k4"),
+    'brown3t2': ("k1", "k2", "k3", "t1", "t2"),
+    'brown4t2': ("k1", "k2", "k3", "k4", "t1", "t2"),
+}
+
+
+class CalibrationUniforms:
+    """
+    Calibration shader uniforms of a camera. Values are cached until camera data or binded image
+    is updated (see handlers.depsgraph_update_post_handler)
+    """
+    __slots__ = ("image", "lens_model", "values")
+
+    cache = {}
+
+    def __init__(self, camera_properties, image):
+        self.image = image
+
+        width, height = image.cpp.static_size
+        self.values = [
+            ("UND_image_width", float(width)),
+            ("UND_image_height", float(height)),
+            ("UND_lens", camera_properties.id_data.lens),
+        ]
+        lens_model = camera_properties.camera_lens_model
+        self.lens_model = [item[0] for item in camera_lens_model_items].index(lens_model)
+        names = ("principal_point_x", "principal_point_y", "skew", "aspect_ratio") + _lens_model_uniforms[lens_model]
+        for name in names:
+            self.values.append((f"UND_{name}", getattr(camera_properties, name)))
+
+    @classmethod
+    def get(cls, camera_properties, image):
+        camera = camera_properties.id_data
+        ret = cls.cache.get(camera, None)
+        if ret is None or ret.image != image:
+            ret = cls.cache[camera] = cls(camera_properties, image)
+        return ret
+
+    @classmethod
+    def invalidate(cls, camera=None):
+        """
+        @param camera: bpy.types.Camera, if not given all cameras are invalidated
+        """
+        if camera is None:
+            cls.cache.clear()
+        else:
+            cls.cache.pop(camera, None)
+
+
 class CameraProperties(PropertyGroup):
     """
     Serves for storing the properties associated with the data of each individual camera,
@@ -180,33 +234,7 @@ class CameraProperties(PropertyGroup):
     def set_shader_calibration(self, shader):
         image = self.image
         if image and image.cpp.valid:
-            width, height = image.cpp.static_size
-            shader.uniform_float("UND_image_width", width)
-            shader.uniform_float("UND_image_height", height)
-            shader.uniform_float("UND_lens", self.id_data.lens)
-
-            uniforms_seq = ["principal_point_x", "principal_point_y", "skew", "aspect_ratio"]
-
-            for i, item in enumerate(camera_lens_model_items):
-                if self.camera_lens_model == item[0]:
-                    shader.uniform_int("UND_lens_distortion_model", i)
-
-            if self.camera_lens_model == 'division':
-                uniforms_seq.extend(["k1"])
-
-            elif self.camera_lens_model == 'brown3':
-                uniforms_seq.extend(["k1", "k2", "k3"])
-
-            elif self.camera_lens_model == 'brown4':
-                uniforms_seq.extend(["k1", "k2", "k3", "k4"])
-
-            elif self.camera_lens_model == 'brown3t2':
-                uniforms_seq.extend(["k1", "k2", "k3", "t1", "t2"])
-
-            elif self.camera_lens_model == 'brown4t2':
-                uniforms_seq.extend(["k1", "k2", "k3", "k4", "t1", "t2"])
-
-            for uname in uniforms_seq:
-                value = getattr(self, uname)
-                if isinstance(value, float):
-                    shader.uniform_float(f"UND_{uname}", value)
+            uniforms = CalibrationUniforms.get(self, image)
+            shader.uniform_int("UND_lens_distortion_model", uniforms.lens_model)
+            for name, value in uniforms.values:
+                shader.uniform_float(name, value)
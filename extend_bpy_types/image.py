@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import numpy as np
 
 import bpy
@@ -18,19 +20,175 @@ class EvalItemData:
         self.preview_bindcode = 0
 
 
+def get_image_memory_size(image):
+    """
+    Estimated memory used by loaded image: RGBA texture in GPU memory and image buffer with
+    image channels in main memory, both are float if image is float
+    @return: int, size in bytes
+    """
+    width, height = image.cpp.static_size
+    if not (width and height):
+        width, height = image.size
+    bytes_per_channel = 4 if image.is_float else 1
+    return width * height * bytes_per_channel * (4 + image.channels)
+
+
+def get_gpu_cache_budget(context):
+    """
+    @return: int, memory budget of loaded images in bytes
+    """
+    return context.scene.cpp.gpu_cache_size * 1024 * 1024
+
+
 class ImageCache:
     __slots__ = ()
 
     cache = {}
-    gl_load_order = []
+
+    # Images loaded by gl_load with their estimated memory size, least recently used first
+    gl_loaded = OrderedDict()
+    gl_loaded_size = 0
+    gl_generation = 0
+    gl_hits = 0
+    gl_misses = 0
+    gl_evictions = 0
+    # Memory used by images decoded outside of Blender (see image_loader), counted against the same budget
+    gl_loader_size = 0
 
     icon_flat_arr = np.zeros(0, dtype=np.int32)
     prev_flat_arr = np.zeros(0, dtype=np.int32)
 
+    # Image previews packed into pages of 2D texture arrays, one layer per image
+    PREVIEW_PAGE_LAYERS = 256
+    preview_tile_size = 0
+    preview_pages = []
+    preview_page_layers = []
+    preview_layers = {}
+
     @classmethod
     def clear(cls):
         cls.cache.clear()
-        cls.gl_load_order.clear()
+        cls.gl_loaded.clear()
+        cls.gl_loaded_size = 0
+        cls.gl_generation += 1
+        cls.clear_preview_pages()
+
+    @classmethod
+    def gl_add(cls, image, budget: int):
+        """
+        Add loaded image as the most recently used and free least recently used images until
+        the memory budget is met. The added image itself is never freed
+        """
+        size = get_image_memory_size(image)
+        cls.gl_loaded[image] = size
+        cls.gl_loaded_size += size
+        cls.gl_generation += 1
+        cls.gl_fit(budget, keep=(image,))
+
+    @classmethod
+    def gl_fit(cls, budget: int, keep=()):
+        """
+        Free least recently used images until the memory budget is met, must be called outside of
+        draw callbacks
+        @param keep: images which are not freed
+        """
+        for image in list(cls.gl_loaded):
+            if cls.gl_loaded_size + cls.gl_loader_size <= budget:
+                return
+            if image in keep:
+                continue
+            cls.gl_loaded_size -= cls.gl_loaded.pop(image)
+            cls.gl_generation += 1
+            cls.gl_evictions += 1
+            try:
+                image.gl_free()
+                image.buffers_free()
+            except ReferenceError:
+                pass
+
+    @classmethod
+    def gl_remove(cls, image):
+        size = cls.gl_loaded.pop(image, None)
+        if size is not None:
+            cls.gl_loaded_size -= size
+            cls.gl_generation += 1
+
+    @classmethod
+    def clear_preview_pages(cls):
+        if cls.preview_pages:
+            bgl.glDeleteTextures(len(cls.preview_pages), bgl.Buffer(bgl.GL_INT, len(cls.preview_pages),
+                                                                    cls.preview_pages))
+        cls.preview_pages.clear()
+        cls.preview_page_layers.clear()
+        cls.preview_layers.clear()
+
+    @classmethod
+    def _new_preview_page(cls):
+        tile_size = cls.preview_tile_size
+        id_buff = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, id_buff)
+        bindcode = id_buff.to_list()[0]
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D_ARRAY, bindcode)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D_ARRAY, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D_ARRAY, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D_ARRAY, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D_ARRAY, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+        # Storage is only allocated (no host data), layers are uploaded one by one in get_preview_layer()
+        bgl.glTexImage3D(
+            bgl.GL_TEXTURE_2D_ARRAY, 0, bgl.GL_RGBA8,
+            tile_size, tile_size, cls.PREVIEW_PAGE_LAYERS,
+            0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE,
+            None
+        )
+        cls.preview_pages.append(bindcode)
+        cls.preview_page_layers.append(0)
+
+    @classmethod
+    def get_preview_layer(cls, image):
+        """
+        Upload image preview into preview texture array if it was not uploaded yet
+        @return: tuple (page bindcode, layer, preview width, preview height) or None if preview is not generated
+        """
+        ret = cls.preview_layers.get(image, None)
+        if ret is not None:
+            return ret
+
+        preview = image.preview
+        width, height = preview.image_size
+        if not (width and height):
+            return None
+
+        tile_size = bpy.app.render_preview_size
+        if tile_size != cls.preview_tile_size:
+            cls.clear_preview_pages()
+            cls.preview_tile_size = tile_size
+        if width > tile_size or height > tile_size:
+            return None
+
+        cls.prev_flat_arr = np.resize(cls.prev_flat_arr, width * height)
+        preview.image_pixels.foreach_get(cls.prev_flat_arr)
+        if not np.any(cls.prev_flat_arr):
+            return None
+
+        if not cls.preview_pages or cls.preview_page_layers[-1] == cls.PREVIEW_PAGE_LAYERS:
+            cls._new_preview_page()
+        bindcode = cls.preview_pages[-1]
+        layer = cls.preview_page_layers[-1]
+        cls.preview_page_layers[-1] += 1
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D_ARRAY, bindcode)
+        bgl.glTexSubImage3D(
+            bgl.GL_TEXTURE_2D_ARRAY, 0, 0, 0, layer,
+            width, height, 1,
+            bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE,
+            bgl.Buffer(bgl.GL_INT, len(cls.prev_flat_arr), cls.prev_flat_arr)
+        )
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D_ARRAY, 0)
+
+        ret = bindcode, layer, width, height
+        cls.preview_layers[image] = ret
+        return ret
 
 
 class ImageProperties(bpy.types.PropertyGroup):
@@ -51,30 +209,27 @@ class ImageProperties(bpy.types.PropertyGroup):
 
     def gl_load(self, context):
         """
-        Images cached with max_loaded_images limit
-        @return: int
+        Images cached within gpu_cache_size memory budget, least recently used images are freed first
+        @return: int, zero means success
         """
         image = self.id_data
         try:
             getattr(image, "name")
         except ReferenceError:
-            del ImageCache.cache[image]
+            ImageCache.cache.pop(image, None)
+            ImageCache.gl_remove(image)
             return 0
 
-        gll = image.gl_load()
+        if image in ImageCache.gl_loaded and image.bindcode:
+            ImageCache.gl_loaded.move_to_end(image)
+            ImageCache.gl_hits += 1
+            return 0
 
+        ImageCache.gl_misses += 1
+        ImageCache.gl_remove(image)
+        gll = image.gl_load()
         if not gll:
-            if image in ImageCache.gl_load_order:
-                ImageCache.gl_load_order.remove(image)
-            ImageCache.gl_load_order.insert(0, image)
-            if len(ImageCache.gl_load_order) > context.scene.cpp.max_loaded_images:
-                last_image = ImageCache.gl_load_order[-1]
-                last_image.gl_free()
-                last_image.buffers_free()
-                ImageCache.gl_load_order.remove(last_image)
-            return 0
-        elif image in ImageCache.gl_load_order:
-            ImageCache.gl_load_order.remove(image)
+            ImageCache.gl_add(image, get_gpu_cache_budget(context))
         return gll
 
     @property
@@ -103,14 +258,14 @@ class ImageProperties(bpy.types.PropertyGroup):
             ImageCache.icon_flat_arr = np.resize(ImageCache.icon_flat_arr, len(image.preview.icon_pixels))
             image.preview.icon_pixels.foreach_get(ImageCache.icon_flat_arr)
             item.has_icon_generated = np.any(ImageCache.icon_flat_arr)
-            if image.has_data and (image not in ImageCache.gl_load_order) and (image not in skip_buff_free):
+            if image.has_data and (image not in ImageCache.gl_loaded) and (image not in skip_buff_free):
                 image.buffers_free()
 
         if (not item.has_prev_generated) and len(image.preview.image_pixels):
             ImageCache.prev_flat_arr = np.resize(ImageCache.prev_flat_arr, len(image.preview.image_pixels))
             image.preview.image_pixels.foreach_get(ImageCache.prev_flat_arr)
             item.has_prev_generated = np.any(ImageCache.prev_flat_arr)
-            if image.has_data and (image not in ImageCache.gl_load_order) and (image not in skip_buff_free):
+            if image.has_data and (image not in ImageCache.gl_loaded) and (image not in skip_buff_free):
                 image.buffers_free()
 
         if (not item.preview_bindcode) and item.has_prev_generated:
@@ -230,11 +230,12 @@ class SceneProperties(PropertyGroup):
         description="Automatically set radius considering actual performance"
     )
 
-    max_loaded_images: IntProperty(
-        name="Max Loaded Images",
-        default=5,
-        min=2,
-        soft_max=10,
-        description="The number of images simultaneously loaded into memory.\n"
-                    "If this limit is exceeded, the first of the loaded images is freed from memory"
+    gpu_cache_size: IntProperty(
+        name="GPU Cache Size",
+        default=2048,
+        min=64,
+        soft_max=16384,
+        subtype='UNSIGNED',
+        description="Memory budget in megabytes for images loaded into memory.\n"
+                    "If this limit is exceeded, the least recently used images are freed from memory"
     )
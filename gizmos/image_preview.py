@@ -1,10 +1,12 @@
 from .. import engine
 from .. import __package__ as addon_pkg
 from .. import poll
+from .. import image_loader
 
 if "bpy" in locals():  # In case of module reloading
     import importlib
     importlib.reload(poll)
+    importlib.reload(image_loader)
 
 import bpy
 import gpu
@@ -133,15 +135,16 @@ class CPP_GT_current_image_preview(bpy.types.Gizmo):
                         size = self.pixel_size
 
                     if possible:
-                        if image.cpp.gl_load(context):
-                            raise Exception()
+                        image_bindcode = image_loader.ImageLoader.get_draw_bindcode(context, image)
+                        if not image_bindcode:
+                            return
 
                         bgl.glEnable(bgl.GL_BLEND)
                         bgl.glBlendFunc(bgl.GL_SRC_ALPHA, bgl.GL_ONE_MINUS_SRC_ALPHA)
                         bgl.glDisable(bgl.GL_POLYGON_SMOOTH)
 
                         bgl.glActiveTexture(bgl.GL_TEXTURE0)
-                        bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.bindcode)
+                        bgl.glBindTexture(bgl.GL_TEXTURE_2D, image_bindcode)
                         bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_BORDER)
                         bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
 
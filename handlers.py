@@ -1,4 +1,7 @@
 from . import operators
+from . import engine
+from . import extend_bpy_types
+from . import warnings
 
 if "bpy" in locals():
     import importlib
@@ -35,6 +38,10 @@ def load_post_handler(dummy=None):
 
     wm.cpp.running = False
     wm.cpp.suspended = False
+
+    engine.size_scanner.clear()
+    subscribe_msgbus()
+
     bpy.ops.cpp.listener('INVOKE_DEFAULT')
 
 
@@ -64,6 +71,102 @@ def depsgraph_update_pre_handler(scene=None):
                 camera.cpp_bind_history.remove(item_index)
 
 
+@persistent
+def depsgraph_update_post_handler(scene=None, depsgraph=None):
+    if depsgraph is None:
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    cameras_draw = operators.basis.draw.cameras
+    mesh_draw = operators.basis.draw.mesh_preview
+
+    if depsgraph.id_type_updated('IMAGE'):
+        extend_bpy_types.camera.CalibrationUniforms.invalidate()
+        for update in depsgraph.updates:
+            if isinstance(update.id, bpy.types.Image):
+                engine.size_scanner.invalidate(update.id.original)
+                if cameras_draw.CameraDrawState.invalidate(update.id.original):
+                    cameras_draw.CameraBatchCache.invalidate()
+
+    if depsgraph.id_type_updated('CAMERA') or depsgraph.id_type_updated('OBJECT'):
+        for update in depsgraph.updates:
+            id_data = update.id
+            if isinstance(id_data, bpy.types.Object) and update.is_updated_geometry:
+                # Painter writes projected UV of the painted object, mesh itself is unchanged
+                if not mesh_draw.MeshBatchCache.is_uv_update(id_data.original, id_data):
+                    if id_data.original == warnings.BVHCache.ob:
+                        warnings.BVHCache.invalidate()
+                    mesh_draw.MeshBatchCache.tag_update(id_data.original)
+            if isinstance(id_data, bpy.types.Camera):
+                extend_bpy_types.camera.CalibrationUniforms.invalidate(id_data.original)
+            elif not (isinstance(id_data, bpy.types.Object) and id_data.type == 'CAMERA'):
+                continue
+            cameras_draw.CameraDrawState.invalidate(id_data.original)
+            cameras_draw.CameraBatchCache.invalidate()
+            operators.basis.PainterState.invalidate()
+
+    operators.basis.ListenerState.invalidate()
+
+
+# Message bus subscriptions
+_msgbus_owner = object()
+
+
+def _msgbus_image_filepath_callback():
+    engine.size_scanner.invalidate()
+    operators.basis.ListenerState.invalidate()
+
+
+def _msgbus_context_callback():
+    operators.basis.ListenerState.invalidate()
+    operators.basis.PainterState.invalidate()
+
+
+def _msgbus_camera_callback():
+    operators.basis.PainterState.invalidate()
+
+
+_camera_properties_names = (
+    "image",
+    "skew",
+    "aspect_ratio",
+    "principal_point_x",
+    "principal_point_y",
+    "camera_lens_model",
+    "k1",
+    "k2",
+    "k3",
+    "k4",
+    "t1",
+    "t2",
+)
+
+
+_msgbus_subscriptions = (
+    ((bpy.types.Image, "filepath"), _msgbus_image_filepath_callback),
+    ((bpy.types.Scene, "camera"), _msgbus_context_callback),
+    ((bpy.types.Object, "mode"), _msgbus_context_callback),
+    ((bpy.types.ImagePaint, "clone_image"), _msgbus_context_callback),
+    ((bpy.types.ImagePaint, "canvas"), _msgbus_context_callback),
+    ((bpy.types.ImagePaint, "mode"), _msgbus_context_callback),
+    ((bpy.types.ImagePaint, "use_clone_layer"), _msgbus_context_callback),
+    ((bpy.types.Camera, "lens"), _msgbus_camera_callback),
+    *(((extend_bpy_types.camera.CameraProperties, name), _msgbus_camera_callback)
+      for name in _camera_properties_names),
+)
+
+
+def subscribe_msgbus():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for key, callback in _msgbus_subscriptions:
+        bpy.msgbus.subscribe_rna(
+            key=key,
+            owner=_msgbus_owner,
+            args=(),
+            notify=callback,
+            options={'PERSISTENT'}
+        )
+
+
 _handlers = (
     (bpy.app.handlers.render_pre, render_pre_handler),
     (bpy.app.handlers.render_post, render_post_handler),
@@ -71,16 +174,19 @@ _handlers = (
     (bpy.app.handlers.load_post, load_post_handler),
     (bpy.app.handlers.save_pre, save_pre_handler),
     (bpy.app.handlers.save_post, save_post_handler),
-    (bpy.app.handlers.depsgraph_update_pre, depsgraph_update_pre_handler)
+    (bpy.app.handlers.depsgraph_update_pre, depsgraph_update_pre_handler),
+    (bpy.app.handlers.depsgraph_update_post, depsgraph_update_post_handler)
 )
 
 
 def register():
     for handle, func in _handlers:
         handle.append(func)
+    subscribe_msgbus()
 
 
 def unregister():
     for handle, func in _handlers:
         if func in handle:
             handle.remove(func)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
@@ -0,0 +1,349 @@
+import io
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import extend_bpy_types
+
+import bpy
+import bgl
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+# Number of the nearest cameras which images are decoded in advance
+PREFETCH_COUNT = 2
+# Number of decoded images waiting for upload and number of uploaded textures kept by the loader
+# (prefetched images and the requested one). Their memory is also limited by the GPU image cache budget
+MAX_STAGED = PREFETCH_COUNT + 1
+MAX_TEXTURES = PREFETCH_COUNT + 1
+# Decoding threads, requested image is not queued behind prefetched ones
+LOADER_WORKERS = PREFETCH_COUNT + 1
+# Image files which can be decoded outside of Blender
+DECODE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".tga"})
+# Image modes which can be converted into 8-bit RGBA without loss of range
+DECODE_MODES = frozenset({"1", "L", "LA", "P", "RGB", "RGBA", "CMYK", "YCbCr"})
+
+
+def get_image_source(image: bpy.types.Image):
+    """
+    File path or packed file data of the image if it can be decoded outside of Blender
+    @return: str, bytes or None
+    """
+    if PILImage is None or image.source != 'FILE':
+        return None
+    filepath = bpy.path.abspath(image.filepath, library=image.library)
+    if os.path.splitext(filepath)[1].lower() not in DECODE_EXTENSIONS:
+        return None
+    if image.packed_file:
+        return image.packed_file.data
+    if os.path.isfile(filepath):
+        return filepath
+    return None
+
+
+def decode_image(source):
+    """
+    Decode image file (path or in-memory data) into RGBA pixels packed into int32 values
+    with bottom to top rows order, as expected for texture upload. Can be called from any thread.
+    @return: tuple (width, height, numpy.ndarray int32) or None if image can not be decoded
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        with PILImage.open(source) as pil_image:
+            if pil_image.mode not in DECODE_MODES:
+                return None
+            pixels = np.asarray(pil_image.convert('RGBA'), dtype=np.uint8)
+    except (OSError, ValueError):
+        return None
+    height, width = pixels.shape[:2]
+    return width, height, np.ascontiguousarray(pixels[::-1]).view(np.int32).reshape(-1)
+
+
+class ImageLoader:
+    """
+    Images are decoded in background threads and staged, only texture upload is done in the main thread.
+    Images of the cameras nearest to the scene camera are prefetched, so switching to a neighbour camera
+    requires only texture upload. Textures are used for drawing until Blender loads the image itself.
+    Images which can not be decoded here are loaded by Blender from the painter modal, never from
+    draw callbacks. Staged pixels and textures are counted against the GPU image cache budget
+    (see extend_bpy_types.image.ImageCache). Images loaded by Blender are freed first, then least recently
+    added loader data. Data of the images requested for drawing is never dropped, an image which alone
+    exceeds the budget is still shown rather than decoded again
+    """
+    __slots__ = ()
+
+    executor = None
+    pending = {}
+    staged = OrderedDict()
+    textures = OrderedDict()
+    unsupported = set()
+    # Images requested for drawing, most recent last
+    requested = OrderedDict()
+
+    submitted = 0
+    uploads = 0
+    failures = 0
+
+    @classmethod
+    def clear(cls):
+        for future in cls.pending.values():
+            future.cancel()
+        cls.pending.clear()
+        cls.unsupported.clear()
+        cls.requested.clear()
+        for image in list(cls.staged):
+            cls.unstage(image)
+        for image in list(cls.textures):
+            cls.release(image)
+
+    @classmethod
+    def submit(cls, image):
+        """
+        Submit image for decoding if it is not decoded or loaded yet
+        @return: bool, False if image can not be decoded outside of Blender
+        """
+        if image in cls.pending or image in cls.staged or image in cls.textures or image.bindcode:
+            return True
+        source = get_image_source(image)
+        if source is None:
+            return False
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(max_workers=LOADER_WORKERS, thread_name_prefix="cpp_image_loader")
+        cls.pending[image] = cls.executor.submit(decode_image, source)
+        cls.submitted += 1
+        return True
+
+    @classmethod
+    def request(cls, image):
+        """
+        Request image required for drawing. Images which can not be decoded here are left
+        for load_unsupported()
+        """
+        cls.requested[image] = None
+        cls.requested.move_to_end(image)
+        while len(cls.requested) > MAX_TEXTURES:
+            cls.requested.popitem(last=False)
+        if not cls.submit(image):
+            cls.unsupported.add(image)
+
+    @classmethod
+    def is_busy(cls):
+        """
+        @return: bool, True while some of requested images are not decoded or loaded yet
+        """
+        return bool(cls.pending or cls.unsupported)
+
+    @classmethod
+    def load_unsupported(cls, context):
+        """
+        Load requested images which can not be decoded outside of Blender, must be called outside of
+        draw callbacks
+        @return: bool, True if some of images were loaded
+        """
+        if not cls.unsupported:
+            return False
+        ret = False
+        for image in cls.unsupported:
+            try:
+                ret |= not image.cpp.gl_load(context)
+            except ReferenceError:
+                pass
+        cls.unsupported.clear()
+        return ret
+
+    @classmethod
+    def fit(cls, context):
+        """
+        Drop staged images, then textures, until memory of the loaded images fits the budget.
+        Images requested for drawing are not dropped
+        """
+        image_cache = extend_bpy_types.image.ImageCache
+        budget = extend_bpy_types.image.get_gpu_cache_budget(context)
+        for items, drop in ((cls.staged, cls.unstage), (cls.textures, cls.release)):
+            for image in list(items):
+                if image_cache.gl_loaded_size + image_cache.gl_loader_size <= budget:
+                    return
+                if image not in cls.requested:
+                    drop(image)
+
+    @classmethod
+    def limit(cls, items, drop, count: int):
+        """
+        Drop least recently added items which are not requested for drawing, until there are at most count items
+        """
+        for image in list(items):
+            if len(items) <= count:
+                return
+            if image not in cls.requested:
+                drop(image)
+
+    @classmethod
+    def prefetch(cls, context):
+        """
+        Submit images of the cameras nearest to the scene camera, while they fit the memory budget
+        """
+        if PILImage is None:
+            return
+        scene = context.scene
+        camera_ob = scene.camera
+
+        candidates = []
+        for ob in scene.cpp.camera_objects:
+            image = ob.data.cpp.image
+            if ob != camera_ob and image and image.cpp.valid:
+                candidates.append(ob)
+        if not candidates:
+            return
+
+        positions = np.array([ob.matrix_world.translation for ob in candidates], dtype=np.float64)
+        distances = np.linalg.norm(positions - np.array(camera_ob.matrix_world.translation), axis=1)
+        count = min(PREFETCH_COUNT, len(candidates))
+        nearest = np.argpartition(distances, count - 1)[:count]
+        image_cache = extend_bpy_types.image.ImageCache
+        available = (extend_bpy_types.image.get_gpu_cache_budget(context)
+                     - image_cache.gl_loaded_size - image_cache.gl_loader_size)
+        for i in nearest[np.argsort(distances[nearest])].tolist():
+            image = candidates[i].data.cpp.image
+            width, height = image.cpp.static_size
+            # Decoded pixels and texture
+            available -= width * height * 4 * 2
+            if available < 0:
+                break
+            cls.submit(image)
+
+    @classmethod
+    def collect(cls, context):
+        """
+        Move finished decoding results into the staged images, images which failed to decode are left
+        for load_unsupported(). Also releases textures of images which are loaded by Blender meanwhile.
+        Must be called outside of draw callbacks
+        @return: bool, True if some of images were staged
+        """
+        for image in list(cls.requested):
+            if image.bindcode:
+                del cls.requested[image]
+        for image in list(cls.textures):
+            if image.bindcode:
+                cls.release(image)
+
+        ret = False
+        for image, future in list(cls.pending.items()):
+            if not future.done():
+                continue
+            del cls.pending[image]
+            try:
+                result = None if future.cancelled() else future.result()
+            except Exception:
+                # Pillow may refuse huge images (DecompressionBombError) or run out of memory
+                result = None
+            if result is None:
+                cls.failures += 1
+                cls.unsupported.add(image)
+                continue
+            cls.staged[image] = result
+            extend_bpy_types.image.ImageCache.gl_loader_size += result[2].nbytes
+            ret = True
+        if ret:
+            cls.limit(cls.staged, cls.unstage, MAX_STAGED)
+            # Images loaded by Blender are freed before loader data, except the painted ones
+            image_paint = context.scene.tool_settings.image_paint
+            extend_bpy_types.image.ImageCache.gl_fit(
+                extend_bpy_types.image.get_gpu_cache_budget(context),
+                keep=(image_paint.canvas, image_paint.clone_image)
+            )
+            cls.fit(context)
+        return ret
+
+    @classmethod
+    def unstage(cls, image):
+        """
+        Drop decoded pixels
+        @return: tuple (width, height, pixels) or None if image is not staged
+        """
+        staged = cls.staged.pop(image, None)
+        if staged is not None:
+            extend_bpy_types.image.ImageCache.gl_loader_size -= staged[2].nbytes
+        return staged
+
+    @classmethod
+    def upload(cls, context, image, width: int, height: int, pixels):
+        """
+        @return: int, texture bindcode
+        """
+        id_buff = bgl.Buffer(bgl.GL_INT, 1)
+        bgl.glGenTextures(1, id_buff)
+        bindcode = id_buff.to_list()[0]
+
+        # Same format as Blender uses for byte images
+        internal_format = bgl.GL_RGBA8
+        if image.colorspace_settings.name == 'sRGB':
+            internal_format = bgl.GL_SRGB8_ALPHA8
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, internal_format, width, height, 0,
+                         bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, bgl.Buffer(bgl.GL_INT, len(pixels), pixels))
+
+        cls.textures[image] = bindcode, pixels.nbytes
+        extend_bpy_types.image.ImageCache.gl_loader_size += pixels.nbytes
+        cls.limit(cls.textures, cls.release, MAX_TEXTURES)
+        cls.fit(context)
+        cls.uploads += 1
+        return bindcode
+
+    @classmethod
+    def release(cls, image):
+        texture = cls.textures.pop(image, None)
+        if texture is not None:
+            bindcode, size = texture
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [bindcode]))
+            extend_bpy_types.image.ImageCache.gl_loader_size -= size
+
+    @classmethod
+    def get_draw_bindcode(cls, context, image):
+        """
+        Texture for drawing the image without decoding it in the current thread. Until the image is
+        decoded, it is requested and the texture of its low resolution preview is returned
+        @return: int, texture bindcode or zero if there is nothing to draw yet
+        """
+        if image.bindcode:
+            # Already loaded, only updates cache order. Loading and eviction are never done while drawing
+            image_cache = extend_bpy_types.image.ImageCache
+            if image in image_cache.gl_loaded:
+                image_cache.gl_loaded.move_to_end(image)
+            return image.bindcode
+
+        bindcode = cls.get_bindcode(context, image)
+        if bindcode:
+            return bindcode
+
+        cls.request(image)
+        return image.cpp.preview_bindcode
+
+    @classmethod
+    def get_bindcode(cls, context, image):
+        """
+        Texture of the decoded image, uploaded from staged pixels if required. Decoding results are
+        collected by the painter modal
+        @return: int, texture bindcode or zero if image is not decoded or it is already loaded by Blender
+        """
+        if image.bindcode:
+            cls.release(image)
+            return 0
+
+        texture = cls.textures.get(image, None)
+        if texture is not None:
+            cls.textures.move_to_end(image)
+            return texture[0]
+
+        staged = cls.unstage(image)
+        if staged is None:
+            return 0
+        return cls.upload(context, image, *staged)
@@ -1,5 +1,7 @@
 from . import draw
 from ... import poll
+from ... import warnings
+from ... import image_loader
 from ... import extend_bpy_types
 from ... import engine
 from ... import __package__ as addon_pkg
@@ -8,6 +10,8 @@ if "bpy" in locals():
     import importlib
     importlib.reload(draw)
     importlib.reload(poll)
+    importlib.reload(warnings)
+    importlib.reload(image_loader)
     importlib.reload(extend_bpy_types)
     for operator in modal_ops:
         try:
@@ -18,24 +22,52 @@ if "bpy" in locals():
             import traceback
             print(traceback.format_exc())
 
+import time
+
 import bpy
 
 modal_ops = []
-LISTEN_TIME_STEP = 1 / 4
+# Painter timer step while painting
 TIME_STEP = 1 / 60
+# Painter timer step while background work (mesh streaming, distance warning) is pending
+IDLE_TIME_STEP = 1 / 10
+
+# Events which are sent continuously and can not change context by itself
+PASSIVE_EVENTS = frozenset({'NONE', 'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'TIMER', 'TIMER_REPORT', 'TIMERREGION'})
+
+
+class ListenerState:
+    """
+    Shared state of the context listener. Context is checked only after it was invalidated
+    by depsgraph updates, message bus notifications or user input
+    """
+    __slots__ = ()
 
+    poll_required = True
+    polls = 0
+    polls_skipped = 0
 
-class PropertyTracker(object):
-    __slots__ = ("value",)
+    @classmethod
+    def invalidate(cls):
+        cls.poll_required = True
 
-    def __init__(self, value=None):
-        self.value = value
 
-    def __call__(self, value=None):
-        if self.value != value:
-            self.value = value
-            return True
-        return False
+class PainterState:
+    """
+    Shared state of the painter. Changes of the scene camera, its calibration, transform and binded image
+    are reported by message bus notifications and depsgraph updates (see handlers), so properties are
+    not compared on every tick
+    """
+    __slots__ = ()
+
+    data_changed = True
+    projector_changed = True
+    updates = 0
+
+    @classmethod
+    def invalidate(cls):
+        cls.data_changed = True
+        cls.projector_changed = True
 
 
 class CPP_OT_listener(bpy.types.Operator):
@@ -43,34 +75,45 @@ class CPP_OT_listener(bpy.types.Operator):
     bl_label = "Listener"
     bl_options = {'INTERNAL'}
 
-    __slots__ = ("timer", )
+    __slots__ = ()
 
     def invoke(self, context, event):
         if self not in modal_ops:
             modal_ops.append(self)
 
-        engine.updateImageSeqStaticSize(bpy.data.images, False)
+        engine.size_scanner.update(bpy.data.images, skip_already_set=False)
+        ListenerState.invalidate()
 
         wm = context.window_manager
-        self.timer = wm.event_timer_add(time_step=LISTEN_TIME_STEP, window=context.window)
         wm.modal_handler_add(self)
         return {'RUNNING_MODAL'}
 
     def cancel(self, context):
         if self in modal_ops:
             modal_ops.remove(self)
-        context.window_manager.event_timer_remove(self.timer)
 
     def modal(self, context, event):
         wm = context.window_manager
         if wm.cpp.running:
             self.cancel(context)
             return {'FINISHED'}
-        if event.type == 'TIMER' and (not wm.cpp.running) and (poll.full_poll(context)):
+
+        # Any user input may change tool or mode, which are not covered by subscriptions
+        if event.type not in PASSIVE_EVENTS:
+            ListenerState.poll_required = True
+
+        engine.size_scanner.update(bpy.data.images)
+
+        if not ListenerState.poll_required:
+            ListenerState.polls_skipped += 1
+            return {'PASS_THROUGH'}
+
+        ListenerState.poll_required = False
+        ListenerState.polls += 1
+        if poll.full_poll(context):
             wm.cpp.running = True
             wm.cpp.suspended = False
             bpy.ops.cpp.camera_projection_painter('INVOKE_DEFAULT')
-        engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
         return {'PASS_THROUGH'}
 
 
@@ -82,6 +125,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
     __slots__ = (
         "environment",
         "timer",
+        "timer_step",
         "suspended",
         "suspended_mouse",
         "suspended_brush",
@@ -91,15 +135,10 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         "full_draw",
         "draw_handler",
         "draw_handler_cameras",
-        "mesh_batch",
         "axes_batch",
         "camera_batch",
         "image_rect_batch",
-        "brush_texture_bindcode",
 
-        "check_data_updated",
-        "data_updated",
-        "check_brush_curve_updated",
     )
 
     def set_properties_defaults(self):
@@ -107,6 +146,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         self.environment = None
 
         self.timer = None
+        self.timer_step = 0.0
         self.suspended = False
         self.suspended_mouse = False
         self.suspended_brush = False
@@ -116,14 +156,9 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         self.full_draw = False
         self.draw_handler = None
         self.draw_handler_cameras = None
-        self.mesh_batch = None
         self.axes_batch = None
         self.camera_batch = None
         self.image_rect_batch = None
-        self.brush_texture_bindcode = 0
-        self.check_data_updated = PropertyTracker()
-        self.data_updated = PropertyTracker()
-        self.check_brush_curve_updated = PropertyTracker()
 
     @staticmethod
     def ensure_uv_layer(ob):
@@ -147,6 +182,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
 
     def invoke(self, context, event):
         self.set_properties_defaults()
+        PainterState.invalidate()
 
         for camera_object in context.scene.cpp.camera_objects:
             # Hide all camera objects
@@ -172,13 +208,14 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         # Create an environment for the current object
         self.environment = engine.Environment(ob, clone_uv_layer)
 
-        self.mesh_batch = draw.mesh_preview.get_object_batch(context, ob)
+        preferences = context.preferences.addons[addon_pkg].preferences
+        draw.mesh_preview.get_object_chunks(context, ob, preferences.use_preview_lod)
         self.axes_batch = draw.cameras.get_axes_batch()
         self.camera_batch, self.image_rect_batch = draw.cameras.get_camera_batches()
         draw.add_draw_handlers(self, context)
 
         wm = context.window_manager
-        self.timer = wm.event_timer_add(time_step=TIME_STEP, window=context.window)
+        self.update_timer(context, IDLE_TIME_STEP)
         wm.modal_handler_add(self)
 
         # User can press Ctrl+Z after operator start, so flush edits
@@ -189,6 +226,20 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
 
         return {'RUNNING_MODAL'}
 
+    def update_timer(self, context, time_step: float):
+        """
+        Replace event timer if the time step is changed, zero time step removes the timer
+        """
+        if time_step == self.timer_step:
+            return
+        wm = context.window_manager
+        if self.timer is not None:
+            wm.event_timer_remove(self.timer)
+            self.timer = None
+        if time_step:
+            self.timer = wm.event_timer_add(time_step=time_step, window=context.window)
+        self.timer_step = time_step
+
     def cancel(self, context):
         if self in modal_ops:
             modal_ops.remove(self)
@@ -197,8 +248,19 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         wm = context.window_manager
         if self.timer is not None:
             wm.event_timer_remove(self.timer)
+            self.timer = None
 
         extend_bpy_types.image.ImageCache.clear()
+        draw.cameras.CameraBatchCache.clear()
+        draw.cameras.CameraDrawState.clear()
+        draw.mesh_preview.MeshBatchCache.clear()
+        draw.mesh_preview.BrushTextureCache.clear()
+        draw.timings.TimingHistogram.clear()
+        draw.redraw.RedrawRouter.clear()
+        image_loader.ImageLoader.clear()
+        extend_bpy_types.camera.CalibrationUniforms.invalidate()
+        warnings.WarningWorker.stop()
+        warnings.BVHCache.invalidate()
 
         draw.remove_draw_handlers(self)
         self.remove_uv_layer(ob)
@@ -212,7 +274,7 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         self.set_properties_defaults()
 
     def modal(self, context, event):
-        preferences = context.preferences.addons[addon_pkg].preferences
+        dt = time.perf_counter()
         wm = context.window_manager
 
         if not poll.full_poll(context):
@@ -224,18 +286,8 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
             return {'PASS_THROUGH'}
 
         scene = context.scene
-        camera_ob = scene.camera
-        camera = camera_ob.data
-        image_paint = scene.tool_settings.image_paint
-        clone_image = image_paint.clone_image
-
-        engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
 
-        # update viewports on mouse movements
-        if event.type == 'MOUSEMOVE':
-            for area in context.screen.areas:
-                if area.type == 'VIEW_3D':
-                    area.tag_redraw()
+        engine.size_scanner.update(bpy.data.images)
 
         # deal with hotkey adjust brush radius/strength
         if event.type == 'F' and event.value == 'PRESS':
@@ -252,14 +304,38 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
         if not self.suspended_mouse:
             wm.cpp.mouse_pos = event.mouse_x, event.mouse_y
 
-        image = camera.cpp.image
-        if image and clone_image != image and image.cpp.valid:
-            image_paint.clone_image = image
-
-        if (scene.cpp.use_projection_preview or (scene.cpp.use_warnings and scene.cpp.use_warning_action_draw)):
+        # Update the hovered viewport on mouse movements and when the distance warning worker has a new result,
+        # all viewports while preview mesh chunks are streamed
+        if event.type == 'MOUSEMOVE' or warnings.WarningWorker.has_new_result:
+            warnings.WarningWorker.has_new_result = False
+            draw.redraw.RedrawRouter.tag_hovered()
+        preferences = context.preferences.addons[addon_pkg].preferences
+        mesh_pending = draw.mesh_preview.MeshBatchCache.is_pending()
+        if mesh_pending:
+            draw.redraw.RedrawRouter.tag_all()
+        elif preferences.use_preview_lod:
+            # Proxy is computed in background and uploaded here, not in draw callbacks
+            if draw.mesh_preview.MeshBatchCache.update_proxy(
+                    context, preferences.preview_lod_resolution, preferences.debug_info):
+                draw.redraw.RedrawRouter.tag_all()
+            mesh_pending = draw.mesh_preview.MeshBatchCache.is_proxy_pending()
+
+        # Images requested by draw callbacks are decoded in background, viewports show previews meanwhile
+        images_collected = image_loader.ImageLoader.collect(context)
+        if image_loader.ImageLoader.load_unsupported(context) or images_collected:
+            draw.redraw.RedrawRouter.tag_all()
+
+        # Distance warning is answered from BVH tree, which is built here rather than in draw callbacks
+        if scene.cpp.use_warnings and scene.cpp.use_warning_action_draw:
+            if warnings.BVHCache.update(context, context.active_object):
+                draw.redraw.RedrawRouter.tag_hovered()
+
+        # Brush curve can be changed only by user input
+        if event.type not in ('TIMER', 'TIMER_REPORT') and (
+                scene.cpp.use_projection_preview or (scene.cpp.use_warnings and scene.cpp.use_warning_action_draw)):
             draw.mesh_preview.update_brush_texture_bindcode(self, context)
 
-        if scene.cpp.auto_distance_warning and wm.cpp.is_image_paint:
+        if scene.cpp.auto_distance_warning and wm.cpp.is_image_paint and self.timer is not None:
             paint_steps = 5
             if self.paint_step < paint_steps:
                 self.paint_time += self.timer.time_delta
@@ -274,42 +350,52 @@ class CPP_OT_camera_projection_painter(bpy.types.Operator):
                     self.report(type={'WARNING'},
                                 message=f"Safe radius is set to {round(scene.cpp.distance_warning, 1)}")
 
-        check_tuple = (
-            camera_ob,
-            camera,
-            clone_image,  # Base properties
-
-            camera.lens,
-            camera.cpp.principal_point_x,
-            camera.cpp.principal_point_y,
-            camera.cpp.skew,
-            camera.cpp.aspect_ratio,
-            camera.cpp.principal_point_x,
-            camera.cpp.principal_point_y,
-            camera.cpp.camera_lens_model,
-            camera.cpp.k1,
-            camera.cpp.k2,
-            camera.cpp.k3,
-            camera.cpp.k4,
-            camera.cpp.t1,
-            camera.cpp.t2,
-        )
-
-        if self.check_data_updated(check_tuple):
-            self.full_draw = True
+        if PainterState.data_changed:
+            PainterState.data_changed = False
+            PainterState.updates += 1
 
-            w, h = clone_image.cpp.static_size
-            scene.render.resolution_x = w
-            scene.render.resolution_y = h
-            if (w > h):
-                camera.sensor_fit = 'HORIZONTAL'
-            else:
-                camera.sensor_fit = 'VERTICAL'
+            camera_ob = scene.camera
+            camera = camera_ob.data
+            image_paint = scene.tool_settings.image_paint
+
+            image = camera.cpp.image
+            if image and image_paint.clone_image != image and image.cpp.valid:
+                image_paint.clone_image = image
+            clone_image = image_paint.clone_image
 
-        if event.type not in ('TIMER', 'TIMER_REPORT'):
-            if self.data_updated(check_tuple):
-                self.environment.setProjector(camera_ob, preferences.debug_info)
+            self.full_draw = True
+            draw.redraw.RedrawRouter.tag_all()
 
-                self.full_draw = False
+            # Requested before drawing, so the timer is kept running until the image is ready
+            image_loader.ImageLoader.request(clone_image)
+            image_loader.ImageLoader.prefetch(context)
 
+            # Values are written only if changed, camera data updates invalidate state again
+            w, h = clone_image.cpp.static_size
+            if (scene.render.resolution_x, scene.render.resolution_y) != (w, h):
+                scene.render.resolution_x = w
+                scene.render.resolution_y = h
+            sensor_fit = 'HORIZONTAL' if w > h else 'VERTICAL'
+            if camera.sensor_fit != sensor_fit:
+                camera.sensor_fit = sensor_fit
+
+        if event.type not in ('TIMER', 'TIMER_REPORT') and PainterState.projector_changed:
+            PainterState.projector_changed = False
+            if not self.environment.setProjector(scene.camera, preferences.debug_info):
+                draw.mesh_preview.MeshBatchCache.tag_uv_update(context.image_paint_object)
+
+            self.full_draw = False
+            draw.redraw.RedrawRouter.tag_all()
+
+        draw.redraw.RedrawRouter.flush(context, wm.cpp.mouse_pos)
+
+        # Timer is required only while painting and while waiting for the background work
+        if wm.cpp.is_image_paint or self.suspended_brush:
+            self.update_timer(context, TIME_STEP)
+        elif mesh_pending or image_loader.ImageLoader.is_busy() or warnings.WarningWorker.is_busy():
+            self.update_timer(context, IDLE_TIME_STEP)
+        else:
+            self.update_timer(context, 0.0)
+
+        draw.timings.TimingHistogram.add("painter", time.perf_counter() - dt)
         return {'PASS_THROUGH'}
@@ -1,10 +1,14 @@
+from . import timings
 from . import cameras
 from . import mesh_preview
+from . import redraw
 
 if "bpy" in locals():
     import importlib
+    importlib.reload(timings)
     importlib.reload(cameras)
     importlib.reload(mesh_preview)
+    importlib.reload(redraw)
 
 import bpy
 
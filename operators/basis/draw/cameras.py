@@ -1,33 +1,82 @@
+from . import timings
 from .... import engine
+from .... import extend_bpy_types
 from .... import __package__ as addon_pkg
 
+import time
+
+import numpy as np
+
 import bpy
 import bgl
 from gpu_extras.batch import batch_for_shader
 
+CAMERA_WIRE_VERTICES = np.array((
+    (0.0, 0.0, 0.0),
+    (0.5, 0.5, -1.0),
+    (0.5, -0.5, -1.0),
+    (-0.5, -0.5, -1.0),
+    (-0.5, 0.5, -1.0)
+), dtype=np.float32)
 
-def get_camera_batches():
-    # Camera and binded image batches
-    vertices = (
-        (0.0, 0.0, 0.0),
-        (0.5, 0.5, -1.0),
-        (0.5, -0.5, -1.0),
-        (-0.5, -0.5, -1.0),
-        (-0.5, 0.5, -1.0)
-    )
+CAMERA_WIRE_INDICES = np.array((
+    (0, 1), (0, 2), (0, 3), (0, 4),
+    (1, 2), (2, 3), (3, 4), (1, 4)
+), dtype=np.int32)
 
-    wire_indices = (
-        (0, 1), (0, 2), (0, 3), (0, 4),
-        (1, 2), (2, 3), (3, 4), (1, 4)
-    )
+AXES_VERTICES = np.array((
+    (0.0, 0.0, 0.0),
+    (1.0, 0.0, 0.0),
+    (0.0, 1.0, 0.0),
+    (0.0, 0.0, 1.0)
+), dtype=np.float32)
+
+AXES_COLORS = np.array((
+    (0.5, 0.5, 0.5, 0.0),
+    (1.0, 0.0, 0.0, 0.6),
+    (0.0, 1.0, 0.0, 0.6),
+    (0.0, 0.0, 1.0, 0.6)
+), dtype=np.float32)
+
+AXES_INDICES = np.array(((0, 1), (0, 2), (0, 3)), dtype=np.int32)
+
+# Camera image preview rectangle is subdivided, so lens distortion is applied per grid vertex
+PREVIEW_GRID_SIZE = 8
+
+
+def _get_preview_grid():
+    line = np.linspace(-0.5, 0.5, PREVIEW_GRID_SIZE + 1, dtype=np.float32)
+    grid = np.stack(np.meshgrid(line, line), axis=-1).reshape(-1, 2)
+
+    row = PREVIEW_GRID_SIZE + 1
+    first = (np.arange(PREVIEW_GRID_SIZE)[:, None] * row + np.arange(PREVIEW_GRID_SIZE)[None, :]).reshape(-1)
+    indices = np.empty((len(first) * 2, 3), dtype=np.int32)
+    indices[0::2] = np.stack((first, first + 1, first + row + 1), axis=-1)
+    indices[1::2] = np.stack((first, first + row + 1, first + row), axis=-1)
+    return grid, indices
 
+
+PREVIEW_GRID, PREVIEW_GRID_INDICES = _get_preview_grid()
+
+MISSING_PREVIEWS_CHECK_INTERVAL = 1.0
+MISSING_PREVIEWS_CHECK_COUNT = 32
+
+
+def _get_instanced_indices(indices, vertices_count: int, count: int):
+    """Indices of primitive repeated count times"""
+    ret = indices[None, :, :] + (np.arange(count, dtype=np.int32) * vertices_count)[:, None, None]
+    return np.ascontiguousarray(ret.reshape(-1, indices.shape[1]), dtype=np.int32)
+
+
+def get_camera_batches():
+    # Camera and binded image batches
     shader_camera = engine.shaders.getShader("camera")
     shader_camera_image_preview = engine.shaders.getShader("camera_image_preview")
 
     camera_wire_batch = batch_for_shader(
         shader_camera, 'LINES',
-        {"pos": vertices},
-        indices=wire_indices,
+        {"pos": CAMERA_WIRE_VERTICES},
+        indices=CAMERA_WIRE_INDICES,
     )
 
     vertices = (
@@ -50,34 +99,378 @@ def get_camera_batches():
 
 
 def get_axes_batch():
-    vertices = (
-        (0.0, 0.0, 0.0),
-        (1.0, 0.0, 0.0),
-        (0.0, 1.0, 0.0),
-        (0.0, 0.0, 1.0)
-    )
-
-    vertex_colors = (
-        (0.5, 0.5, 0.5, 0.0),
-        (1.0, 0.0, 0.0, 0.6),
-        (0.0, 1.0, 0.0, 0.6),
-        (0.0, 0.0, 1.0, 0.6)
-    )
-
-    indices = ((0, 1), (0, 2), (0, 3))
-
     shader_axes = engine.shaders.getShader("axes")
 
     batch_axes = batch_for_shader(
         shader_axes, 'LINES',
-        {"pos": vertices, "color": vertex_colors},
-        indices=indices,
+        {"pos": AXES_VERTICES, "color": AXES_COLORS},
+        indices=AXES_INDICES,
     )
 
     return batch_axes
 
 
+def get_camera_draw_params(camera, image):
+    """
+    Camera display parameters
+    @return: tuple (sensor_size, aspect_scale, uv_aspect_scale), uv_aspect_scale is None if image is not valid
+    """
+    aspect_scale = 1.0, 1.0
+    uv_aspect_scale = None
+    horizontal_fit = True
+    sensor_size = camera.lens / camera.sensor_width
+
+    if camera.sensor_fit == 'VERTICAL':
+        horizontal_fit = False
+        sensor_size = camera.lens / camera.sensor_height
+
+    if image and image.cpp.valid:
+        width, height = image.cpp.static_size
+
+        if camera.sensor_fit == 'AUTO':
+            horizontal_fit = width > height
+
+        if horizontal_fit:
+            aspect_scale = 1.0, height / width
+        else:
+            aspect_scale = width / height, 1.0
+
+        if width > height:
+            uv_aspect_scale = 1.0, height / width
+        else:
+            uv_aspect_scale = width / height, 1.0
+
+    return sensor_size, aspect_scale, uv_aspect_scale
+
+
+def get_camera_calibration(camera, image):
+    """
+    Keyword arguments of engine.projection.undistorted_uv for the camera and image
+    @return: dict
+    """
+    cpp = camera.cpp
+    width, height = image.cpp.static_size
+    return dict(
+        width=width,
+        height=height,
+        lens=camera.lens,
+        principal_point_x=cpp.principal_point_x,
+        principal_point_y=cpp.principal_point_y,
+        skew=cpp.skew,
+        aspect_ratio=cpp.aspect_ratio,
+        lens_model=engine.projection.LENS_MODELS.index(cpp.camera_lens_model),
+        k1=cpp.k1, k2=cpp.k2, k3=cpp.k3, k4=cpp.k4,
+        t1=cpp.t1, t2=cpp.t2
+    )
+
+
+# Draw state of a single camera, see CameraDrawState
+DRAW_STATE_DTYPE = np.dtype([
+    ("matrix", np.float32, (4, 4)),
+    ("aspect_scale", np.float32, 2),
+    ("uv_aspect_scale", np.float32, 2),
+    ("sensor_size", np.float32),
+    ("has_image", np.bool_),
+])
+
+
+class CameraDrawState:
+    """
+    Draw state of all cameras stored as rows of a single structured array. Rows are recomputed only
+    after camera object, camera data or binded image was updated (see handlers.depsgraph_update_post_handler)
+    """
+    __slots__ = ()
+
+    records = np.zeros(0, dtype=DRAW_STATE_DTYPE)
+    rows = {}
+    images = []
+    preview_uv = []
+    dirty = set()
+    by_data = {}
+    by_image = {}
+    updates = 0
+
+    @classmethod
+    def clear(cls):
+        cls.records = np.zeros(0, dtype=DRAW_STATE_DTYPE)
+        cls.rows.clear()
+        cls.images.clear()
+        cls.preview_uv.clear()
+        cls.dirty.clear()
+        cls.by_data.clear()
+        cls.by_image.clear()
+
+    @classmethod
+    def invalidate(cls, id_data=None):
+        """
+        @param id_data: camera object, camera data or image which was updated, if not given all rows are invalidated
+        @return: bool, True if some of rows were invalidated
+        """
+        if id_data is None:
+            rows = cls.rows.values()
+        elif isinstance(id_data, bpy.types.Object):
+            row = cls.rows.get(id_data, None)
+            rows = () if row is None else (row,)
+        elif isinstance(id_data, bpy.types.Camera):
+            rows = cls.by_data.get(id_data, ())
+        elif isinstance(id_data, bpy.types.Image):
+            rows = cls.by_image.get(id_data, ())
+        else:
+            rows = ()
+        cls.dirty.update(rows)
+        return bool(rows)
+
+    @classmethod
+    def get_row(cls, camera_object, image):
+        """
+        Row of the camera object in records, recomputed if required
+        @return: int
+        """
+        row = cls.rows.get(camera_object, None)
+        if row is None:
+            row = len(cls.rows)
+            if row == len(cls.records):
+                records = np.zeros(max(64, row * 2), dtype=DRAW_STATE_DTYPE)
+                records[:row] = cls.records
+                cls.records = records
+            cls.rows[camera_object] = row
+            cls.images.append(None)
+            cls.preview_uv.append(None)
+        elif row not in cls.dirty and cls.images[row] == image:
+            return row
+
+        camera = camera_object.data
+        sensor_size, aspect_scale, uv_aspect_scale = get_camera_draw_params(camera, image)
+        record = cls.records[row]
+        record["matrix"] = camera_object.matrix_world
+        record["aspect_scale"] = aspect_scale
+        record["sensor_size"] = sensor_size
+        record["has_image"] = uv_aspect_scale is not None
+        if uv_aspect_scale is not None:
+            record["uv_aspect_scale"] = uv_aspect_scale
+            cls.by_image.setdefault(image, set()).add(row)
+        cls.by_data.setdefault(camera, set()).add(row)
+
+        cls.images[row] = image
+        cls.preview_uv[row] = None
+        cls.dirty.discard(row)
+        cls.updates += 1
+        return row
+
+    @classmethod
+    def get_preview_uv(cls, row: int, camera):
+        """
+        Undistorted texture coordinates of the preview grid (see PREVIEW_GRID)
+        @return: numpy.ndarray (N, 2) float32
+        """
+        uv = cls.preview_uv[row]
+        if uv is None:
+            uv = cls.preview_uv[row] = engine.projection.undistorted_uv(
+                PREVIEW_GRID * cls.records[row]["uv_aspect_scale"],
+                **get_camera_calibration(camera, cls.images[row])
+            )
+        return uv
+
+
+class CameraBatchCache:
+    """
+    Wireframes, axes and image previews of all visible cameras except the scene camera, pre-transformed
+    into world space and packed into batches. Previews are drawn with one call per page of the preview
+    texture array (see ImageCache.get_preview_layer). Batches are rebuilt only after invalidation
+    by depsgraph updates or when display settings change
+    """
+    __slots__ = ()
+
+    valid = False
+    signature = None
+    wire_batch = None
+    axes_batch = None
+    preview_batches = []
+    missing_previews = []
+    missing_check_time = 0.0
+    cameras_count = 0
+    rebuilds = 0
+
+    @classmethod
+    def invalidate(cls):
+        cls.valid = False
+
+    @classmethod
+    def clear(cls):
+        cls.valid = False
+        cls.signature = None
+        cls.wire_batch = None
+        cls.axes_batch = None
+        cls.preview_batches = []
+        cls.missing_previews = []
+        cls.cameras_count = 0
+
+    @classmethod
+    def get_signature(cls, context):
+        preferences = context.preferences.addons[addon_pkg].preferences
+        scene = context.scene
+        return (
+            scene.camera,
+            len(scene.objects),
+            scene.cpp.cameras_viewport_size,
+            scene.cpp.camera_axes_size,
+            tuple(preferences.camera_color),
+            tuple(preferences.camera_color_loaded_data),
+            extend_bpy_types.image.ImageCache.gl_generation,
+        )
+
+    @classmethod
+    def check_missing_previews(cls):
+        """
+        Previews are generated by Blender in background, so images without preview are checked
+        again with limited rate
+        @return: bool, True if some of previews became available
+        """
+        if time.monotonic() - cls.missing_check_time < MISSING_PREVIEWS_CHECK_INTERVAL:
+            return False
+        cls.missing_check_time = time.monotonic()
+
+        check = cls.missing_previews[:MISSING_PREVIEWS_CHECK_COUNT]
+        del cls.missing_previews[:MISSING_PREVIEWS_CHECK_COUNT]
+        ret = False
+        for image in check:
+            try:
+                getattr(image, "name")
+            except ReferenceError:
+                continue
+            if extend_bpy_types.image.ImageCache.get_preview_layer(image) is None:
+                cls.missing_previews.append(image)
+            else:
+                ret = True
+        return ret
+
+    @classmethod
+    def update(cls, context):
+        signature = cls.get_signature(context)
+        if cls.valid and signature == cls.signature:
+            if not (cls.missing_previews and cls.check_missing_previews()):
+                return
+        cls.signature = signature
+        cls.valid = True
+        cls.rebuilds += 1
+
+        preferences = context.preferences.addons[addon_pkg].preferences
+        scene = context.scene
+        cameras_viewport_size = scene.cpp.cameras_viewport_size
+
+        camera_objects = [ob for ob in scene.cpp.initial_visible_camera_objects if ob != scene.camera]
+        count = len(camera_objects)
+        cls.cameras_count = count
+
+        cls.wire_batch = None
+        cls.axes_batch = None
+        cls.preview_batches = []
+        cls.missing_previews = []
+        if not count:
+            return
+
+        rows = np.empty(count, dtype=np.int32)
+        loaded_data = np.empty(count, dtype=bool)
+
+        # Cameras with preview, grouped by preview texture array page
+        preview_pages = {}
+
+        for i, camera_object in enumerate(camera_objects):
+            camera = camera_object.data
+            image = camera.cpp.image
+            row = CameraDrawState.get_row(camera_object, image)
+            rows[i] = row
+
+            has_image = CameraDrawState.records[row]["has_image"]
+            loaded_data[i] = has_image and image.has_data
+            if not has_image:
+                continue
+            preview_layer = extend_bpy_types.image.ImageCache.get_preview_layer(image)
+            if preview_layer is None:
+                cls.missing_previews.append(image)
+                continue
+            bindcode, layer, prev_width, prev_height = preview_layer
+            tile_size = extend_bpy_types.image.ImageCache.preview_tile_size
+            uv_scale = prev_width / tile_size, prev_height / tile_size
+            preview_pages.setdefault(bindcode, []).append(
+                (i, CameraDrawState.get_preview_uv(row, camera), layer, uv_scale)
+            )
+
+        records = CameraDrawState.records[rows]
+        matrices = records["matrix"]
+        scales = np.empty((count, 3), dtype=np.float32)
+        scales[:, :2] = records["aspect_scale"]
+        scales[:, 2] = records["sensor_size"]
+
+        rotations = matrices[:, :3, :3]
+        translations = matrices[:, None, :3, 3]
+        scales *= cameras_viewport_size
+
+        # Camera wires
+        local = CAMERA_WIRE_VERTICES[None, :, :] * scales[:, None, :]
+        local[:, 0] = 0.0
+        wire_pos = np.einsum("nij,nkj->nki", rotations, local) + translations
+
+        wire_colors = np.where(
+            loaded_data[:, None],
+            np.array(preferences.camera_color_loaded_data, dtype=np.float32),
+            np.array(preferences.camera_color, dtype=np.float32)
+        )
+        wire_colors = np.repeat(wire_colors, len(CAMERA_WIRE_VERTICES), axis=0)
+
+        cls.wire_batch = batch_for_shader(
+            engine.shaders.getShader("camera_batch"), 'LINES',
+            {
+                "pos": np.ascontiguousarray(wire_pos.reshape(-1, 3), dtype=np.float32),
+                "color": np.ascontiguousarray(wire_colors)
+            },
+            indices=_get_instanced_indices(CAMERA_WIRE_INDICES, len(CAMERA_WIRE_VERTICES), count),
+        )
+
+        # Camera axes
+        if scene.cpp.camera_axes_size:
+            local = AXES_VERTICES * scene.cpp.camera_axes_size
+            axes_pos = np.einsum("nij,kj->nki", rotations, local) + translations
+
+            cls.axes_batch = batch_for_shader(
+                engine.shaders.getShader("camera_batch"), 'LINES',
+                {
+                    "pos": np.ascontiguousarray(axes_pos.reshape(-1, 3), dtype=np.float32),
+                    "color": np.tile(AXES_COLORS, (count, 1))
+                },
+                indices=_get_instanced_indices(AXES_INDICES, len(AXES_VERTICES), count),
+            )
+
+        # Camera image previews
+        shader_preview_batch = engine.shaders.getShader("camera_preview_batch")
+        vertices_count = len(PREVIEW_GRID)
+        for bindcode, items in preview_pages.items():
+            cameras = np.array([item[0] for item in items], dtype=np.int32)
+            local = np.empty((len(items), vertices_count, 3), dtype=np.float32)
+            local[:, :, :2] = PREVIEW_GRID[None, :, :] * scales[cameras, None, :2]
+            local[:, :, 2] = -scales[cameras, None, 2]
+            preview_pos = np.einsum("nij,nkj->nki", rotations[cameras], local) + translations[cameras]
+
+            uv = np.concatenate([item[1] for item in items])
+            layers = np.repeat(np.array([item[2] for item in items], dtype=np.float32), vertices_count)
+            uv_scales = np.repeat(np.array([item[3] for item in items], dtype=np.float32), vertices_count, axis=0)
+
+            batch = batch_for_shader(
+                shader_preview_batch, 'TRIS',
+                {
+                    "pos": np.ascontiguousarray(preview_pos.reshape(-1, 3), dtype=np.float32),
+                    "uv": np.ascontiguousarray(uv, dtype=np.float32),
+                    "uv_scale": uv_scales,
+                    "layer": layers
+                },
+                indices=_get_instanced_indices(PREVIEW_GRID_INDICES, vertices_count, len(items)),
+            )
+            cls.preview_batches.append((bindcode, batch))
+
+
 def draw_cameras(self, context):
+    dt = time.perf_counter()
+
     preferences = context.preferences.addons[addon_pkg].preferences
     scene = context.scene
     cameras_viewport_size = scene.cpp.cameras_viewport_size
@@ -89,12 +482,16 @@ def draw_cameras(self, context):
     shader_camera = engine.shaders.getShader("camera")
     shader_camera_image_preview = engine.shaders.getShader("camera_image_preview")
     shader_axes = engine.shaders.getShader("axes")
+    shader_camera_batch = engine.shaders.getShader("camera_batch")
+    shader_camera_preview_batch = engine.shaders.getShader("camera_preview_batch")
 
     # Batches
     axes_batch = self.axes_batch
     camera_wire_batch = self.camera_batch
     image_rect_batch = self.image_rect_batch
 
+    CameraBatchCache.update(context)
+
     # OpenGL setup
     bgl.glEnable(bgl.GL_DEPTH_TEST)
     bgl.glEnable(bgl.GL_BLEND)
@@ -103,48 +500,39 @@ def draw_cameras(self, context):
     bgl.glEnable(bgl.GL_LINE_SMOOTH)
     bgl.glDisable(bgl.GL_MULTISAMPLE)
 
-    for camera_object in scene.cpp.initial_visible_camera_objects:
+    # Image previews of all cameras except the scene camera
+    if CameraBatchCache.preview_batches:
+        shader_camera_preview_batch.bind()
+        shader_camera_preview_batch.uniform_float("image_space_color", preferences.image_space_color)
+        shader_camera_preview_batch.uniform_int("previews", 0)
+        bgl.glActiveTexture(bgl.GL_TEXTURE0)
+        for bindcode, batch in CameraBatchCache.preview_batches:
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D_ARRAY, bindcode)
+            batch.draw(shader_camera_preview_batch)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D_ARRAY, 0)
+
+    # Wireframes and axes of all cameras except the scene camera
+    shader_camera_batch.bind()
+    if CameraBatchCache.wire_batch:
+        bgl.glLineWidth(preferences.camera_line_width)
+        CameraBatchCache.wire_batch.draw(shader_camera_batch)
+    if CameraBatchCache.axes_batch:
+        bgl.glLineWidth(2.0)
+        CameraBatchCache.axes_batch.draw(shader_camera_batch)
+
+    # Scene camera
+    camera_object = scene.camera
+    if camera_object.initial_visible and context.region_data.view_perspective != 'CAMERA':
         camera = camera_object.data
-        model_matrix = camera_object.matrix_world
-        image = camera.cpp.image
-        image_has_data = False
-        line_width = preferences.camera_line_width
-
-        if camera_object == scene.camera:
-            if context.region_data.view_perspective == 'CAMERA':
-                continue
-            image = clone_image
-            line_width = preferences.active_camera_line_width
-
-        aspect_scale = 1.0, 1.0
-        sensor_size = camera.lens / camera.sensor_width
-
-        if camera.sensor_fit == 'HORIZONTAL':
-            horizontal_fit = True
-            sensor_size = camera.lens / camera.sensor_width
-        elif camera.sensor_fit == 'VERTICAL':
-            horizontal_fit = False
-            sensor_size = camera.lens / camera.sensor_height
-
-        if image and image.cpp.valid:
-            image_has_data = image.has_data
-
-            width, height = image.cpp.static_size
+        image = clone_image
 
-            if camera.sensor_fit == 'AUTO':
-                horizontal_fit = width > height
-                sensor_size = camera.lens / camera.sensor_width
-
-            if horizontal_fit:
-                aspect_scale = 1.0, height / width
-            else:
-                aspect_scale = width / height, 1.0
-
-            if width > height:
-                uv_aspect_scale = 1.0, height / width
-            else:
-                uv_aspect_scale = width / height, 1.0
+        record = CameraDrawState.records[CameraDrawState.get_row(camera_object, image)]
+        model_matrix = camera_object.matrix_world
+        aspect_scale = record["aspect_scale"].tolist()
+        sensor_size = float(record["sensor_size"])
 
+        if record["has_image"]:
+            uv_aspect_scale = record["uv_aspect_scale"].tolist()
             bindcode = image.cpp.preview_bindcode
             if bindcode:
                 bgl.glActiveTexture(bgl.GL_TEXTURE0)
@@ -167,22 +555,15 @@ def draw_cameras(self, context):
 
                 image_rect_batch.draw(shader_camera_image_preview)
 
-        bgl.glLineWidth(line_width)
+        bgl.glLineWidth(preferences.active_camera_line_width)
 
         shader_camera.bind()
-        if image_has_data:
-            wire_color = preferences.camera_color_loaded_data
-        else:
-            wire_color = preferences.camera_color
-        if camera_object == scene.camera:
-            wire_color = preferences.camera_color_highlight
-
         shader_camera.uniform_float("model_matrix", model_matrix)
         shader_camera.uniform_float("aspect_scale", aspect_scale)
         shader_camera.uniform_float("sensor_size", sensor_size)
         shader_camera.uniform_float("cameras_viewport_size", cameras_viewport_size)
 
-        shader_camera.uniform_float("wire_color", wire_color)
+        shader_camera.uniform_float("wire_color", preferences.camera_color_highlight)
 
         camera_wire_batch.draw(shader_camera)
 
@@ -202,3 +583,5 @@ def draw_cameras(self, context):
     bgl.glDisable(bgl.GL_LINE_SMOOTH)
     bgl.glDisable(bgl.GL_DEPTH_TEST)
     bgl.glLineWidth(1.0)
+
+    timings.DrawTimings.add("cameras", time.perf_counter() - dt)
@@ -1,12 +1,18 @@
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
 from .... import engine
 from .... import warnings
+from .... import image_loader
 from .... import __package__ as addon_pkg
 
 if "bpy" in locals():
     import importlib
     importlib.reload(warnings)
+    importlib.reload(image_loader)
 
 import bpy
 import bgl
@@ -14,15 +20,25 @@ import gpu
 from mathutils import Vector, Matrix
 
 
-def f_clamp(value: float, min_value: float, max_value: float):
-    return max(min(value, max_value), min_value)
-
-
-def f_lerp(value0: float, value1: float, factor: float):
-    return (value0 * (1.0 - factor)) + (value1 * factor)
-
-
-def get_hovered_region_3d(context, mouse_position):
+# Maximum number of loop triangles in a single mesh chunk
+CHUNK_TRIANGLES = 1 << 20
+# Time in seconds for updating mesh chunks per redraw, at least one chunk is updated
+UPDATE_TIME_BUDGET = 0.05
+# Number of samples of the brush falloff curve
+BRUSH_TEXTURE_WIDTH = 256
+# Proxy mesh is used if it has at least this number of triangles per pixel of the mesh bounds on screen
+LOD_TRIANGLES_PER_PIXEL = 1.0
+# Polygon offset units for drawing proxy mesh over the full resolution mesh
+LOD_DEPTH_OFFSET = 64.0
+# Selection of minimum (False) or maximum (True) bounds for each of the bounding box corners
+BOX_CORNERS = np.array([[(i >> axis) & 1 for axis in range(3)] for i in range(8)], dtype=bool)
+
+
+def get_hovered_area(context, mouse_position):
+    """
+    3D viewport area under the mouse cursor, excluding its header and side regions
+    @return: bpy.types.Area or None
+    """
     mouse_x, mouse_y = mouse_position
     for area in context.screen.areas:
         if area.type == 'VIEW_3D':
@@ -41,118 +57,619 @@ def get_hovered_region_3d(context, mouse_position):
                 min_y += header.height
 
             if min_x <= mouse_x < max_x and min_y <= mouse_y < max_y:
-                if len(area.spaces.active.region_quadviews) == 0:
-                    return area.spaces.active.region_3d
-                else:
-                    # Not sure quadview support required?
-                    pass
+                return area
 
 
-def iter_curve_values(curve_mapping, steps: int):
+def get_hovered_region_3d(context, mouse_position):
+    area = get_hovered_area(context, mouse_position)
+    if area is not None:
+        if len(area.spaces.active.region_quadviews) == 0:
+            return area.spaces.active.region_3d
+        else:
+            # Not sure quadview support required?
+            pass
+
+
+def sample_curve_values(curve_mapping, out):
+    """
+    Evaluate curve at uniform positions from clip minimum to clip maximum (not included) into given array
+    """
     curve_mapping.initialize()
-    curve = list(curve_mapping.curves)[0]
-
-    clip_min_x = curve_mapping.clip_min_x
-    clip_min_y = curve_mapping.clip_min_y
-    clip_max_x = curve_mapping.clip_max_x
-    clip_max_y = curve_mapping.clip_max_y
-
-    for i in range(steps):
-        fac = i / steps
-        pos = f_lerp(clip_min_x, clip_max_x, fac)
-
-        value = curve_mapping.evaluate(curve, pos)
-
-        yield f_clamp(value, clip_min_y, clip_max_y)
+    curve = curve_mapping.curves[0]
+
+    positions = np.linspace(curve_mapping.clip_min_x, curve_mapping.clip_max_x, len(out), endpoint=False)
+    evaluate = curve_mapping.evaluate
+    for i, pos in enumerate(positions.tolist()):
+        out[i] = evaluate(curve, pos)
+
+    np.clip(out, curve_mapping.clip_min_y, curve_mapping.clip_max_y, out=out)
+
+
+class BrushTextureCache:
+    """
+    Brush falloff texture. Texture is sampled by the distance to the brush center normalized by the brush radius,
+    so it has a fixed width. It is created once and updated in place when the brush curve is changed
+    """
+    __slots__ = ()
+
+    bindcode = 0
+    key = None
+    values = np.empty(BRUSH_TEXTURE_WIDTH, dtype=np.float32)
+    pixels = np.empty(BRUSH_TEXTURE_WIDTH, dtype=np.int32)
+    buffer = None
+
+    updates = 0
+
+    @classmethod
+    def clear(cls):
+        if cls.bindcode:
+            bgl.glDeleteTextures(1, bgl.Buffer(bgl.GL_INT, 1, [cls.bindcode]))
+        cls.bindcode = 0
+        cls.key = None
+        cls.buffer = None
+
+    @classmethod
+    def update(cls, curve_mapping, key):
+        """
+        Update texture if the key is changed
+        @return: int, texture bindcode
+        """
+        if cls.bindcode and key == cls.key:
+            return cls.bindcode
+
+        sample_curve_values(curve_mapping, cls.values)
+        np.multiply(cls.values, 255.0, out=cls.values)
+        # Single channel texture is uploaded as RGBA bytes, red byte comes first
+        cls.pixels[:] = cls.values
+
+        if cls.buffer is None:
+            cls.buffer = bgl.Buffer(bgl.GL_INT, BRUSH_TEXTURE_WIDTH)
+        cls.buffer[:] = cls.pixels.tolist()
+
+        if not cls.bindcode:
+            id_buff = bgl.Buffer(bgl.GL_INT, 1)
+            bgl.glGenTextures(1, id_buff)
+            cls.bindcode = id_buff.to_list()[0]
+
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, cls.bindcode)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_S, bgl.GL_CLAMP_TO_EDGE)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_EDGE)
+            bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_R8, BRUSH_TEXTURE_WIDTH, 1, 0,
+                             bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, cls.buffer)
+        else:
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, cls.bindcode)
+            bgl.glTexSubImage2D(bgl.GL_TEXTURE_2D, 0, 0, 0, BRUSH_TEXTURE_WIDTH, 1,
+                                bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, cls.buffer)
+
+        cls.key = key
+        cls.updates += 1
+        return cls.bindcode
+
+
+def get_curve_signature(curve_mapping):
+    """
+    Exact signature of the curve mapping. Points locations are read by 'foreach_get', handle types
+    can not be read this way (enum property), but curves have only a few points
+    @return: tuple
+    """
+    curve = curve_mapping.curves[0]
+    points = curve.points
+    locations = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("location", locations)
+    return (
+        hash(locations.tobytes()),
+        tuple(point.handle_type for point in points),
+        curve_mapping.clip_min_x,
+        curve_mapping.clip_min_y,
+        curve_mapping.clip_max_x,
+        curve_mapping.clip_max_y,
+    )
 
 
 def update_brush_texture_bindcode(self, context):
     scene = context.scene
-    image_paint = scene.tool_settings.image_paint
-    brush = image_paint.brush
-    pixel_width = scene.tool_settings.unified_paint_settings.size
-
-    # Check curve values for every 10% to check any updates. Its biased, but fast.
-    check_steps = 10
-    check_tuple = tuple((n for n in iter_curve_values(
-        brush.curve, check_steps))) + (pixel_width,)
-
-    if self.check_brush_curve_updated(check_tuple):
-        pixels = [int(n * 255)
-                  for n in iter_curve_values(brush.curve, pixel_width)]
-
-        id_buff = bgl.Buffer(bgl.GL_INT, 1)
-        bgl.glGenTextures(1, id_buff)
-
-        bindcode = id_buff.to_list()[0]
-
-        bgl.glBindTexture(bgl.GL_TEXTURE_2D, bindcode)
-        image_buffer = bgl.Buffer(bgl.GL_INT, len(pixels), pixels)
-        bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER
-                            | bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
-        bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, bgl.GL_RED,
-                         pixel_width, 1, 0, bgl.GL_RGBA, bgl.GL_UNSIGNED_BYTE, image_buffer)
-
-        self.brush_texture_bindcode = bindcode
-
-
-def get_object_batch(context, ob):
-    """Returns object batch from evaluated depsgraph"""
-
-    depsgraph = context.evaluated_depsgraph_get()
-
-    # Get the modified version of the mesh from the depsgraph
-    mesh = depsgraph.id_eval_get(ob).data
-    mesh.calc_loop_triangles()
-
-    vertices_count = len(mesh.vertices)
-    loop_tris_count = len(mesh.loop_triangles)
-
-    vertices_shape = (vertices_count, 3)
-    loop_tris_shape = (loop_tris_count, 3)
-
-    # Required attributes
-    vertices_positions = np.empty(vertices_shape, dtype=np.float32)
-    vertices_normals = np.empty(vertices_shape, dtype=np.float32)
-    indices = np.empty(loop_tris_shape, dtype=np.int32)
-
-    vertices_newshape = vertices_count * 3
-    loop_tris_newshape = loop_tris_count * 3
-
-    # 'foreach_get' is the fastest method
-    mesh.vertices.foreach_get(
-        "co", np.reshape(vertices_positions, vertices_newshape))
-    mesh.vertices.foreach_get(
-        "normal", np.reshape(vertices_normals, vertices_newshape))
-    mesh.loop_triangles.foreach_get(
-        "vertices", np.reshape(indices, loop_tris_newshape))
-
-    # Batch generation
-    buffer_type = 'TRIS'
-
-    format_attributes = (
-        ("pos", vertices_positions),
-        ("normal", vertices_normals)
+    brush = scene.tool_settings.image_paint.brush
+    curve_mapping = brush.curve
+
+    # Curve is evaluated only if signature is changed
+    BrushTextureCache.update(curve_mapping, (brush, get_curve_signature(curve_mapping)))
+
+
+def average_proxy(positions, normals, clusters, count: int):
+    """
+    Proxy vertices of the deformed mesh for already known clustering, same result layout as
+    engine.decimation.decimate() without triangles. Can be called from any thread
+    @return: tuple
+    """
+    return (
+        engine.decimation.average_clusters(positions, clusters, count),
+        engine.decimation.average_clusters(normals, clusters, count, normalize=True),
+        None,
+        clusters
     )
 
-    # Structure of a vertex buffer
-    vert_format = gpu.types.GPUVertFormat()
-    for format_attr in format_attributes:
-        vert_format.attr_add(
-            id=format_attr[0], comp_type='F32', len=3, fetch_mode='FLOAT')
 
-    # Index buffer
-    ibo = gpu.types.GPUIndexBuf(type=buffer_type, seq=indices)
-
-    # Vertex buffer
-    vbo = gpu.types.GPUVertBuf(len=vertices_count, format=vert_format)
-    for attr_id, attr in format_attributes:
-        vbo.attr_fill(id=attr_id, data=attr)
+class MeshChunk:
+    """
+    Range of the mesh loop triangles drawn by a separate batch. Vertices used by the chunk are stored
+    as indices of the mesh vertices, chunk index buffer refers to the order of them
+    """
+    __slots__ = ("start", "end", "vertices", "bounds", "ibo", "batch", "valid")
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.vertices = None
+        self.bounds = None
+        self.ibo = None
+        self.batch = None
+        self.valid = False
+
+
+class MeshBatchCache:
+    """
+    GPU batches of the evaluated mesh of the painted object. Mesh is split into chunks by loop triangles
+    ranges, every chunk has it's own batch. Chunks are kept until the object geometry is updated
+    (see handlers.depsgraph_update_post_handler). If the mesh topology is unchanged (deformation only),
+    chunk index buffers are reused and only positions and normals are uploaded again.
+
+    Writing of the projected UV layer by the painter is reported by depsgraph as a geometry update too,
+    such updates are recognized by the mesh signature and do not invalidate the cache.
+
+    Chunks are (re)built within a time budget on each update, so very large meshes are streamed over
+    several redraws. Chunk data is gathered into staging buffers of a fixed size, Blender frees vertex
+    and index buffer data after upload. Mesh arrays and staging buffers are released once all chunks
+    (and the proxy, if it is used) are up to date. What is kept is the mesh vertex index of every chunk
+    vertex (4 bytes per vertex, plus vertices shared by neighbour chunks), required for deformation updates,
+    and the proxy cluster of every vertex (4 bytes per vertex) if the proxy is used.
+
+    Proxy is computed in a background thread and uploaded by the painter modal, mesh arrays are never
+    modified after they were read, so they are shared with the thread rather than copied
+    """
+    __slots__ = ()
+
+    ob = None
+    valid = False
+    generation = 0
+    topology = None
+    signature = None
+    uv_update_ob = None
+    positions = None
+    normals = None
+    indices = None
+    bounds = None
+    chunks = []
+
+    staging_positions = None
+    staging_normals = None
+    staging_indices = None
+
+    proxy_resolution = 0
+    proxy_clusters = None
+    proxy_count = 0
+    proxy_triangles = 0
+    proxy_ibo = None
+    proxy_batch = None
+    proxy_valid = False
+    proxy_executor = None
+    proxy_future = None
+    proxy_job_key = None
+    proxy_job_time = 0.0
+
+    rebuilds = 0
+    deform_updates = 0
+    chunk_updates = 0
+    drawn_chunks = 0
+    proxy_rebuilds = 0
+    use_proxy = False
+
+    @classmethod
+    def tag_update(cls, ob):
+        if ob == cls.ob:
+            cls.valid = False
+
+    @classmethod
+    def tag_uv_update(cls, ob):
+        """
+        Projected UV of the object were written, next geometry update of the object is expected
+        to be caused by it
+        """
+        cls.uv_update_ob = ob
+
+    @classmethod
+    def is_uv_update(cls, ob, ob_eval):
+        """
+        @param ob_eval: evaluated object reported by depsgraph update
+        @return: bool, True if geometry update is caused only by writing projected UV
+        """
+        if ob != cls.uv_update_ob:
+            return False
+        cls.uv_update_ob = None
+        if ob != cls.ob or not cls.valid or cls.signature is None:
+            return False
+        mesh = ob_eval.data
+        positions = np.empty((len(mesh.vertices), 3), dtype=np.float32)
+        mesh.vertices.foreach_get("co", np.reshape(positions, positions.size))
+        return cls.get_signature(mesh, positions) == cls.signature
+
+    @classmethod
+    def clear(cls):
+        cls.ob = None
+        cls.valid = False
+        cls.topology = None
+        cls.signature = None
+        cls.uv_update_ob = None
+        cls.positions = None
+        cls.normals = None
+        cls.indices = None
+        cls.chunks = []
+        cls.staging_positions = None
+        cls.staging_normals = None
+        cls.staging_indices = None
+        cls.clear_proxy()
+
+    @classmethod
+    def clear_proxy(cls):
+        # Result of the running job is dropped
+        if cls.proxy_future is not None:
+            cls.proxy_future.cancel()
+        cls.proxy_future = None
+        cls.proxy_job_key = None
+        cls.proxy_resolution = 0
+        cls.proxy_clusters = None
+        cls.proxy_count = 0
+        cls.proxy_triangles = 0
+        cls.proxy_ibo = None
+        cls.proxy_batch = None
+        cls.proxy_valid = False
+
+    @classmethod
+    def is_pending(cls):
+        """
+        @return: bool, True if some chunks are not up to date yet
+        """
+        return (not cls.valid) or any((not chunk.valid) for chunk in cls.chunks)
+
+    @classmethod
+    def is_proxy_pending(cls):
+        """
+        @return: bool, True if proxy is computed in background
+        """
+        return cls.proxy_future is not None
+
+    @staticmethod
+    def get_topology(mesh):
+        """
+        Depsgraph updates do not tell whether topology has been changed, so the number of mesh elements
+        is compared instead. Modifiers which keep all the numbers (armature, shape keys, displace, etc.)
+        only move vertices
+        @return: tuple
+        """
+        return (len(mesh.vertices), len(mesh.edges), len(mesh.polygons), len(mesh.loops), len(mesh.loop_triangles))
+
+    @staticmethod
+    def get_mesh(context, ob):
+        """
+        Modified version of the mesh from the depsgraph with calculated loop triangles
+        @return: bpy.types.Mesh
+        """
+        depsgraph = context.evaluated_depsgraph_get()
+        mesh = depsgraph.id_eval_get(ob).data
+        mesh.calc_loop_triangles()
+        return mesh
+
+    @staticmethod
+    def get_signature(mesh, positions):
+        """
+        Numbers of mesh elements and checksum of vertex positions
+        @return: tuple
+        """
+        return (len(mesh.vertices), len(mesh.edges), len(mesh.polygons), len(mesh.loops), zlib.crc32(positions))
+
+    @staticmethod
+    def get_vert_format():
+        vert_format = gpu.types.GPUVertFormat()
+        vert_format.attr_add(id="pos", comp_type='F32', len=3, fetch_mode='FLOAT')
+        vert_format.attr_add(id="normal", comp_type='F32', len=3, fetch_mode='FLOAT')
+        return vert_format
+
+    @classmethod
+    def read_arrays(cls, mesh, with_indices: bool):
+        """
+        Arrays are allocated for every read, so they are never modified after they were read
+        """
+        vertices_count = len(mesh.vertices)
+        # 'foreach_get' is the fastest method
+        cls.positions = np.empty((vertices_count, 3), dtype=np.float32)
+        cls.normals = np.empty((vertices_count, 3), dtype=np.float32)
+        mesh.vertices.foreach_get("co", np.reshape(cls.positions, vertices_count * 3))
+        mesh.vertices.foreach_get("normal", np.reshape(cls.normals, vertices_count * 3))
+        if with_indices:
+            loop_tris_count = len(mesh.loop_triangles)
+            cls.indices = np.empty((loop_tris_count, 3), dtype=np.int32)
+            mesh.loop_triangles.foreach_get("vertices", np.reshape(cls.indices, loop_tris_count * 3))
+
+    @classmethod
+    def reload_arrays(cls, context):
+        """
+        Read released arrays again, mesh is unchanged since it was read
+        """
+        cls.read_arrays(cls.get_mesh(context, cls.ob), with_indices=True)
+
+    @classmethod
+    def release_arrays(cls, use_proxy: bool):
+        """
+        Mesh arrays and staging buffers are required only until chunks and the proxy are up to date
+        """
+        if cls.is_pending() or (use_proxy and not cls.proxy_valid):
+            return
+        cls.positions = None
+        cls.normals = None
+        cls.indices = None
+        cls.staging_positions = None
+        cls.staging_normals = None
+        cls.staging_indices = None
+
+    @classmethod
+    def read_mesh(cls, context, ob):
+        mesh = cls.get_mesh(context, ob)
+        topology = cls.get_topology(mesh)
+
+        # Chunks index buffers are kept if topology is unchanged, so loop triangles are not required
+        is_topology_changed = topology != cls.topology
+        cls.read_arrays(mesh, with_indices=is_topology_changed)
+        cls.generation += 1
+        cls.signature = cls.get_signature(mesh, cls.positions)
+        if topology[0]:
+            cls.bounds = np.array((cls.positions.min(axis=0), cls.positions.max(axis=0)), dtype=np.float32)
+        else:
+            cls.bounds = None
+        cls.proxy_valid = False
+
+        if is_topology_changed:
+            loop_tris_count = topology[-1]
+            cls.chunks = [MeshChunk(i, min(i + CHUNK_TRIANGLES, loop_tris_count))
+                          for i in range(0, loop_tris_count, CHUNK_TRIANGLES)]
+            cls.staging_positions = None
+            cls.staging_normals = None
+            cls.staging_indices = None
+
+            cls.clear_proxy()
+            cls.topology = topology
+            cls.rebuilds += 1
+        else:
+            for chunk in cls.chunks:
+                chunk.valid = False
+            cls.deform_updates += 1
+
+    @classmethod
+    def ensure_staging(cls):
+        if cls.staging_positions is not None:
+            return
+        vertices_count = cls.topology[0]
+        loop_tris_count = cls.topology[-1]
+        staging_vertices_count = min(CHUNK_TRIANGLES * 3, vertices_count)
+        cls.staging_positions = np.empty((staging_vertices_count, 3), dtype=np.float32)
+        cls.staging_normals = np.empty((staging_vertices_count, 3), dtype=np.float32)
+        cls.staging_indices = np.empty((min(CHUNK_TRIANGLES, loop_tris_count), 3), dtype=np.int32)
+
+    @classmethod
+    def update_chunk(cls, chunk: MeshChunk):
+        if chunk.ibo is None:
+            loop_tris = cls.indices[chunk.start:chunk.end]
+            vertices, local_indices = np.unique(loop_tris, return_inverse=True)
+            chunk.vertices = vertices.astype(np.int32, copy=False)
+
+            staging_indices = cls.staging_indices[:len(loop_tris)]
+            np.reshape(staging_indices, staging_indices.size)[:] = np.reshape(local_indices, local_indices.size)
+            chunk.ibo = gpu.types.GPUIndexBuf(type='TRIS', seq=staging_indices)
+
+        vertices_count = len(chunk.vertices)
+        positions = cls.staging_positions[:vertices_count]
+        normals = cls.staging_normals[:vertices_count]
+        np.take(cls.positions, chunk.vertices, axis=0, out=positions, mode='clip')
+        np.take(cls.normals, chunk.vertices, axis=0, out=normals, mode='clip')
+        chunk.bounds = np.array((positions.min(axis=0), positions.max(axis=0)), dtype=np.float32)
+
+        # Vertex buffer can not be refilled after it was uploaded, so only it is created again
+        vbo = gpu.types.GPUVertBuf(len=vertices_count, format=cls.get_vert_format())
+        vbo.attr_fill(id="pos", data=positions)
+        vbo.attr_fill(id="normal", data=normals)
+
+        chunk.batch = gpu.types.GPUBatch(type='TRIS', buf=vbo, elem=chunk.ibo)
+        chunk.valid = True
+        cls.chunk_updates += 1
+
+    @classmethod
+    def update(cls, context, ob, use_proxy: bool = False):
+        """
+        Read the mesh if it was updated and update chunks within the time budget
+        @param use_proxy: mesh arrays are kept for the proxy update
+        @return: list of MeshChunk
+        """
+        if cls.ob != ob:
+            cls.clear()
+            cls.ob = ob
+
+        if not cls.valid:
+            cls.read_mesh(context, ob)
+            cls.valid = True
+
+        if cls.is_pending():
+            cls.ensure_staging()
+            dt = time.perf_counter()
+            for chunk in cls.chunks:
+                if chunk.valid:
+                    continue
+                cls.update_chunk(chunk)
+                if time.perf_counter() - dt > UPDATE_TIME_BUDGET:
+                    break
+        cls.release_arrays(use_proxy)
+
+        return cls.chunks
+
+    @classmethod
+    def submit_proxy(cls, context, resolution: int):
+        """
+        Start computing proxy in background. Clustering is computed once for the mesh topology and resolution,
+        on deformation only clusters positions and normals are averaged again
+        """
+        if cls.positions is None or (cls.proxy_resolution != resolution and cls.indices is None):
+            cls.reload_arrays(context)
+        if cls.proxy_executor is None:
+            cls.proxy_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cpp_mesh_proxy")
+
+        if cls.proxy_clusters is None or cls.proxy_resolution != resolution:
+            cls.proxy_future = cls.proxy_executor.submit(
+                engine.decimation.decimate, cls.positions, cls.normals, cls.indices, resolution)
+        else:
+            cls.proxy_future = cls.proxy_executor.submit(
+                average_proxy, cls.positions, cls.normals, cls.proxy_clusters, cls.proxy_count)
+        cls.proxy_job_key = (cls.generation, resolution)
+        cls.proxy_job_time = time.perf_counter()
+
+    @classmethod
+    def upload_proxy(cls, result, resolution: int, debug_info: bool):
+        positions, normals, triangles, clusters = result
+        if triangles is not None:
+            cls.proxy_clusters = clusters
+            cls.proxy_resolution = resolution
+            cls.proxy_count = len(positions)
+            cls.proxy_triangles = len(triangles)
+            cls.proxy_ibo = None
+            if cls.proxy_triangles:
+                cls.proxy_ibo = gpu.types.GPUIndexBuf(type='TRIS', seq=triangles)
+            cls.proxy_rebuilds += 1
+            if debug_info:
+                print(f"Camera Projection Painter: Preview proxy mesh with {cls.proxy_triangles} triangles "
+                      f"created in {time.perf_counter() - cls.proxy_job_time:.6f} sec")
+
+        cls.proxy_batch = None
+        if cls.proxy_ibo is not None:
+            vbo = gpu.types.GPUVertBuf(len=cls.proxy_count, format=cls.get_vert_format())
+            vbo.attr_fill(id="pos", data=positions)
+            vbo.attr_fill(id="normal", data=normals)
+            cls.proxy_batch = gpu.types.GPUBatch(type='TRIS', buf=vbo, elem=cls.proxy_ibo)
+        cls.proxy_valid = True
+        cls.release_arrays(use_proxy=True)
+
+    @classmethod
+    def update_proxy(cls, context, resolution: int, debug_info: bool = False):
+        """
+        Decimated proxy of the mesh. Must be called outside of draw callbacks, mesh chunks are
+        drawn until proxy is up to date
+        @return: bool, True if proxy was uploaded
+        """
+        if cls.ob is None or cls.is_pending() or cls.bounds is None:
+            return False
+
+        key = (cls.generation, resolution)
+        future = cls.proxy_future
+        if future is not None:
+            if not future.done():
+                return False
+            cls.proxy_future = None
+            if cls.proxy_job_key == key:
+                cls.upload_proxy(future.result(), resolution, debug_info)
+                return True
+
+        if not (cls.proxy_valid and cls.proxy_resolution == resolution):
+            cls.submit_proxy(context, resolution)
+        return False
+
+
+def get_screen_area(context, ob, bounds):
+    """
+    Area of the mesh bounding box projected into the viewport region, clamped by the region rectangle
+    @return: float, area in pixels or None if the bounding box intersects view plane
+    """
+    corners = np.ones((8, 4), dtype=np.float32)
+    corners[:, :3] = np.where(BOX_CORNERS, bounds[1], bounds[0])
+    matrix = np.array(context.region_data.perspective_matrix, dtype=np.float32) @ np.array(
+        ob.matrix_world, dtype=np.float32)
+    clip = corners @ matrix.T
+
+    w = clip[:, 3]
+    if np.any(w <= 0.0):
+        return None
+    ndc = np.clip(clip[:, :2] / w[:, None], -1.0, 1.0)
+    width, height = (ndc.max(axis=0) - ndc.min(axis=0)) * 0.5
+    return float(width * context.region.width * height * context.region.height)
+
+
+def get_object_proxy(context, ob, resolution: int):
+    """
+    Decimated proxy batch if the full resolution mesh is too dense for the current view
+    @return: gpu.types.GPUBatch or None if full resolution mesh should be drawn
+    """
+    if MeshBatchCache.is_pending() or not MeshBatchCache.proxy_valid or MeshBatchCache.bounds is None:
+        return None
+    batch = MeshBatchCache.proxy_batch
+    if MeshBatchCache.proxy_resolution != resolution or batch is None or MeshBatchCache.proxy_triangles >= MeshBatchCache.topology[-1]:
+        return None
+    area = get_screen_area(context, ob, MeshBatchCache.bounds)
+    if area is None or MeshBatchCache.proxy_triangles < area * LOD_TRIANGLES_PER_PIXEL:
+        return None
+    return batch
 
-    # Batch
-    batch = gpu.types.GPUBatch(type=buffer_type, buf=vbo, elem=ibo)
 
-    return batch
+def get_chunks_visibility(bounds, matrix, extent=(1.0, 1.0), use_depth=True):
+    """
+    Conservative test of chunks bounding boxes against clip space frustum. Box is culled only if all
+    of it's corners are outside of the same frustum plane
+    @param bounds: numpy.ndarray (N, 2, 3) of minimum and maximum object space coordinates
+    @param matrix: numpy.ndarray 4x4, object to clip space
+    @param extent: frustum size along x and y axes, in units of w
+    @param use_depth: test near and far planes
+    @return: numpy.ndarray (N,) bool
+    """
+    corners = np.ones((len(bounds), 8, 4), dtype=np.float32)
+    corners[:, :, :3] = np.where(BOX_CORNERS, bounds[:, 1, None, :], bounds[:, 0, None, :])
+    clip = corners @ np.asarray(matrix, dtype=np.float32).T
+
+    w = clip[:, :, 3]
+    outside = np.zeros(len(bounds), dtype=bool)
+    for axis, axis_extent in enumerate(extent):
+        limit = w * axis_extent
+        outside |= np.all(clip[:, :, axis] < -limit, axis=1)
+        outside |= np.all(clip[:, :, axis] > limit, axis=1)
+    if use_depth:
+        outside |= np.all(clip[:, :, 2] < -w, axis=1)
+        outside |= np.all(clip[:, :, 2] > w, axis=1)
+    return ~outside
+
+
+def get_visible_chunks(context, ob, chunks, projector_MVP, outline_width: float):
+    """
+    Chunks which are inside of both the viewport and projector frustums. Outside of the projected image
+    only the outline is drawn, so the projector frustum is extended by the outline width
+    @return: list of MeshChunk
+    """
+    chunks = [chunk for chunk in chunks if chunk.batch is not None]
+    if not chunks:
+        return chunks
+
+    bounds = np.array([chunk.bounds for chunk in chunks], dtype=np.float32)
+    model_matrix = np.array(ob.matrix_world, dtype=np.float32)
+
+    view_matrix = np.array(context.region_data.perspective_matrix, dtype=np.float32) @ model_matrix
+    visible = get_chunks_visibility(bounds, view_matrix)
+
+    # Same aspect scale of the outline as in the mesh_preview shader
+    width, height = context.scene.tool_settings.image_paint.clone_image.cpp.static_size
+    wh_div = (max(height / width, 1.0), max(width / height, 1.0))
+    extent = tuple(0.5 + outline_width * n for n in wh_div)
+    projector_matrix = np.asarray(projector_MVP, dtype=np.float32) @ model_matrix
+    visible &= get_chunks_visibility(bounds, projector_matrix, extent, use_depth=False)
+
+    return [chunk for chunk, is_visible in zip(chunks, visible) if is_visible]
+
+
+def get_object_chunks(context, ob, use_proxy: bool = False):
+    """Returns object mesh chunks from evaluated depsgraph"""
+    return MeshBatchCache.update(context, ob, use_proxy)
 
 
 def draw_projection_preview(self, context):
@@ -175,15 +692,16 @@ def draw_projection_preview(self, context):
     camera = scene.camera.data
 
     image = image_paint.clone_image
-    if not(image and image.cpp.valid and (not image.cpp.gl_load(context))):
+    if not(image and image.cpp.valid):
         return
-
-    batch = self.mesh_batch
-    if batch is None:
+    image_bindcode = image_loader.ImageLoader.get_draw_bindcode(context, image)
+    if not image_bindcode:
         return
 
     preferences = context.preferences.addons[addon_pkg].preferences
 
+    chunks = get_object_chunks(context, ob, preferences.use_preview_lod)
+
     # openGL setup
     bgl.glEnable(bgl.GL_BLEND)
     bgl.glBlendFunc(bgl.GL_SRC_ALPHA, bgl.GL_ONE_MINUS_SRC_ALPHA)
@@ -194,7 +712,7 @@ def draw_projection_preview(self, context):
     bgl.glPolygonOffset(1.0, 0.0)
 
     bgl.glActiveTexture(bgl.GL_TEXTURE0)
-    bgl.glBindTexture(bgl.GL_TEXTURE_2D, image.bindcode)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, image_bindcode)
 
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_NEAREST)
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
@@ -202,7 +720,7 @@ def draw_projection_preview(self, context):
     bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_WRAP_T, bgl.GL_CLAMP_TO_BORDER)
 
     bgl.glActiveTexture(bgl.GL_TEXTURE1)
-    bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.brush_texture_bindcode)
+    bgl.glBindTexture(bgl.GL_TEXTURE_2D, BrushTextureCache.bindcode)
 
     # Uniforms
     shader = engine.shaders.getShader("mesh_preview")
@@ -216,13 +734,18 @@ def draw_projection_preview(self, context):
     shader.uniform_int("image_brush", 1)
 
     # Switches
-    is_warning = ((scene.cpp.use_warnings and scene.cpp.use_warning_action_draw)
-                  and warnings.get_warning_status(context, wm.cpp.mouse_pos))
-    shader.uniform_bool("is_warning", (is_warning,))
-
     is_active_view = context.area.spaces.active.region_3d == get_hovered_region_3d(context, wm.cpp.mouse_pos)
     shader.uniform_int("is_active_view", is_active_view)
 
+    is_warning = False
+    if scene.cpp.use_warnings and scene.cpp.use_warning_action_draw:
+        # Only the view under the mouse cursor requests evaluation, other views reuse its result
+        if is_active_view:
+            is_warning = warnings.get_warning_status(context, wm.cpp.mouse_pos)
+        else:
+            is_warning = warnings.get_last_warning_status()
+    shader.uniform_bool("is_warning", (is_warning,))
+
     shader.uniform_bool("is_full_draw", (self.full_draw,))
     shader.uniform_bool("is_brush", (scene.cpp.use_projection_preview,))
     shader.uniform_bool("is_normal_highlight", (scene.cpp.use_normal_highlight,))
@@ -234,6 +757,7 @@ def draw_projection_preview(self, context):
 
     # Outline and Highlight
     outline_type = {'NO_OUTLINE': 0, 'FILL': 1, 'CHECKER': 2, 'LINES': 3}[preferences.outline_type]
+    outline_width = 0.0
     if outline_type:
         outline_color = preferences.outline_color
         shader.uniform_float("outline_color", outline_color)
@@ -255,4 +779,21 @@ def draw_projection_preview(self, context):
     camera.cpp.set_shader_calibration(shader)
     # Draw
 
-    batch.draw(shader)
+    proxy_batch = None
+    if preferences.use_preview_lod:
+        proxy_batch = get_object_proxy(context, ob, preferences.preview_lod_resolution)
+    MeshBatchCache.use_proxy = proxy_batch is not None
+
+    if proxy_batch is not None:
+        # Proxy surface does not match the full resolution mesh depth exactly
+        bgl.glEnable(bgl.GL_POLYGON_OFFSET_FILL)
+        bgl.glPolygonOffset(-1.0, -LOD_DEPTH_OFFSET)
+        proxy_batch.draw(shader)
+        bgl.glPolygonOffset(1.0, 0.0)
+        bgl.glDisable(bgl.GL_POLYGON_OFFSET_FILL)
+        MeshBatchCache.drawn_chunks = 0
+    else:
+        chunks = get_visible_chunks(context, ob, chunks, self.environment.projector_MVP, outline_width)
+        for chunk in chunks:
+            chunk.batch.draw(shader)
+        MeshBatchCache.drawn_chunks = len(chunks)
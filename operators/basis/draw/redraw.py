@@ -0,0 +1,56 @@
+from . import mesh_preview
+
+
+class RedrawRouter:
+    """
+    Collects redraw requests of the painter and tags only 3D viewports which display changed state.
+    Brush preview and distance warning are drawn only in the viewport under the mouse cursor, so such
+    requests redraw only it and the viewport which was under the cursor before
+    """
+    __slots__ = ()
+
+    hovered_area = 0
+    redraw_hovered = False
+    redraw_all = False
+
+    issued = 0
+    suppressed = 0
+
+    @classmethod
+    def tag_hovered(cls):
+        cls.redraw_hovered = True
+
+    @classmethod
+    def tag_all(cls):
+        cls.redraw_all = True
+
+    @classmethod
+    def clear(cls):
+        cls.hovered_area = 0
+        cls.redraw_hovered = False
+        cls.redraw_all = False
+
+    @classmethod
+    def flush(cls, context, mouse_position):
+        """
+        Tag viewports for redraw according to requests collected since the last call
+        """
+        if not (cls.redraw_hovered or cls.redraw_all):
+            return
+
+        area = mesh_preview.get_hovered_area(context, mouse_position)
+        hovered_area = area.as_pointer() if area is not None else 0
+        areas = (hovered_area, cls.hovered_area)
+        cls.hovered_area = hovered_area
+
+        for area in context.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            if cls.redraw_all or area.as_pointer() in areas:
+                area.tag_redraw()
+                cls.issued += 1
+            else:
+                cls.suppressed += 1
+
+        cls.redraw_hovered = False
+        cls.redraw_all = False
@@ -0,0 +1,64 @@
+import bisect
+from collections import deque
+
+# Number of the latest frames the average draw time is computed from
+FRAMES_COUNT = 60
+# Upper bounds of the histogram bins in milliseconds, the last bin has no upper bound
+HISTOGRAM_BINS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class DrawTimings:
+    """
+    CPU time spent in viewport draw callbacks for the latest frames
+    """
+    __slots__ = ()
+
+    frames = {}
+
+    @classmethod
+    def add(cls, name: str, dt: float):
+        frames = cls.frames.get(name, None)
+        if frames is None:
+            frames = cls.frames[name] = deque(maxlen=FRAMES_COUNT)
+        frames.append(dt)
+
+    @classmethod
+    def get_average(cls, name: str):
+        """
+        @return: float, average draw time in seconds
+        """
+        frames = cls.frames.get(name, None)
+        if not frames:
+            return 0.0
+        return sum(frames) / len(frames)
+
+    @classmethod
+    def clear(cls):
+        cls.frames.clear()
+
+
+class TimingHistogram:
+    """
+    Distribution of CPU time spent in modal operator ticks
+    """
+    __slots__ = ()
+
+    counts = {}
+
+    @classmethod
+    def add(cls, name: str, dt: float):
+        counts = cls.counts.get(name, None)
+        if counts is None:
+            counts = cls.counts[name] = [0] * (len(HISTOGRAM_BINS) + 1)
+        counts[bisect.bisect_left(HISTOGRAM_BINS, dt * 1000.0)] += 1
+
+    @classmethod
+    def get_counts(cls, name: str):
+        """
+        @return: list of int, number of ticks in each of HISTOGRAM_BINS and in the last unbounded bin
+        """
+        return cls.counts.get(name, [0] * (len(HISTOGRAM_BINS) + 1))
+
+    @classmethod
+    def clear(cls):
+        cls.counts.clear()
@@ -88,7 +88,7 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
         scene = context.scene
         camera_seq = list([_ for _ in self.iter_processed_cameras(context)])
 
-        binded = engine.bindCameraImages(camera_seq, scene.cpp.source_dir, self.search_blend, self.rename)
+        binded = engine.binding.bind_camera_images(camera_seq, scene.cpp.source_dir, self.search_blend, self.rename)
 
         cam_txt = "cameras"
         mtp = 'INFO'
@@ -99,7 +99,7 @@ class CPP_OT_bind_camera_image(bpy.types.Operator):
 
         self.report(type={mtp}, message=f"Binded {binded} {cam_txt}")
 
-        engine.updateImageSeqStaticSize(bpy.data.images, skip_already_set=True)
+        engine.size_scanner.update(bpy.data.images)
         if self.refresh_image_previews:
             bpy.ops.cpp.refresh_image_preview('EXEC_DEFAULT', skip_already_set=True)
 
@@ -26,7 +26,7 @@ class CPP_OT_image_paint(bpy.types.Operator):
     def execute(self, context):
         wm = context.window_manager
 
-        if warnings.get_warning_status(context, wm.cpp.mouse_pos):
+        if warnings.get_warning_status(context, wm.cpp.mouse_pos, wait=True):
             self.report(type={'WARNING'}, message="Danger zone!")
             if context.scene.cpp.use_warning_action_popup:
                 wm.popup_menu(self.danger_zone_popup_menu, title="Danger zone", icon='INFO')
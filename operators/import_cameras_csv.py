@@ -1,14 +1,12 @@
 
 import os
 import time
-import csv
+
+import numpy as np
 
 import bpy
 
-# Full calibration parameters list is:
-#     ['#name', 'x', 'y', 'alt', 'heading', 'pitch', 'roll', 'f', 'px', 'py', 'k1', 'k2', 'k3', 'k4', 't1', 't2']
-# but we are interested only in next:
-CALIB_PARAMS = dict.fromkeys(["#name", "f", "px", "py", "k1", "k2", "k3", "k4", "t1", "t2"])
+from .. import engine
 
 
 def get_csv_file_filepath(filepath):
@@ -24,6 +22,19 @@ class CPP_OT_import_cameras_csv(bpy.types.Operator):
     bl_label = "Import CSV"
     bl_options = {'INTERNAL'}
 
+    import_poses: bpy.props.BoolProperty(
+        name="Import Poses",
+        default=False,
+        description="Set camera transforms from position (x, y, alt) and orientation (heading, pitch, roll)"
+    )
+
+    create_missing: bpy.props.BoolProperty(
+        name="Create Missing Cameras",
+        default=True,
+        description="Create camera objects for rows which do not match any camera in the scene. "
+        "Used only when poses are imported"
+    )
+
     @staticmethod
     def iter_name_variations(name: str):
         splext = os.path.splitext(name)
@@ -31,6 +42,86 @@ class CPP_OT_import_cameras_csv(bpy.types.Operator):
             yield splext[0] + splext[-1].lower()
         yield splext[0]
 
+    @classmethod
+    def get_camera_names_map(cls, camera_objects):
+        """
+        Map of every camera name variation to the camera objects which have it
+        @return: dict
+        """
+        names_map = {}
+        for ob in camera_objects:
+            for name in cls.iter_name_variations(ob.name):
+                obs = names_map.setdefault(name, [])
+                if ob not in obs:
+                    obs.append(ob)
+        return names_map
+
+    @staticmethod
+    def apply_calibration(camera_objects, table, rows):
+        """
+        Assign calibration values of the table rows to cameras in a single pass.
+        Values are converted once, only properties with changed values are written
+        @return: int, number of properties written
+        """
+        columns = {key: table[key].astype(np.float32).tolist() for key in engine.calibration.INTRINSICS_COLUMNS}
+        lens_models = engine.calibration.get_lens_models(table).tolist()
+        lens_model_names = engine.projection.LENS_MODELS
+        cpp_columns = [(key, columns[key]) for key in ("k1", "k2", "k3", "k4", "t1", "t2")]
+        principal_x = columns["px"]
+        principal_y = columns["py"]
+        focal_lengths = columns["f"]
+
+        written = 0
+        for ob, i in zip(camera_objects, rows):
+            camera = ob.data
+            cpp = camera.cpp
+
+            if camera.lens != focal_lengths[i]:
+                camera.lens = focal_lengths[i]
+                written += 1
+            if cpp.principal_point_x != principal_x[i]:
+                cpp.principal_point_x = principal_x[i]
+                written += 1
+            if cpp.principal_point_y != principal_y[i]:
+                cpp.principal_point_y = principal_y[i]
+                written += 1
+            for key, values in cpp_columns:
+                if getattr(cpp, key) != values[i]:
+                    setattr(cpp, key, values[i])
+                    written += 1
+
+            lens_model = lens_models[i]
+            if lens_model != -1 and cpp.camera_lens_model != lens_model_names[lens_model]:
+                cpp.camera_lens_model = lens_model_names[lens_model]
+                written += 1
+        return written
+
+    @staticmethod
+    def apply_poses(camera_objects, table, rows):
+        """
+        Assign camera objects world matrices from the table rows
+        """
+        matrices = engine.calibration.get_pose_matrices(table)[rows].tolist()
+        for ob, matrix in zip(camera_objects, matrices):
+            ob.matrix_world = matrix
+
+    @staticmethod
+    def create_cameras(context, names, collection_name):
+        """
+        Create camera objects in a new collection linked to the scene
+        @return: list of bpy.types.Object
+        """
+        collection = bpy.data.collections.new(collection_name)
+        context.scene.collection.children.link(collection)
+
+        ret = []
+        for name in names:
+            camera = bpy.data.cameras.new(name)
+            ob = bpy.data.objects.new(name, camera)
+            collection.objects.link(ob)
+            ret.append(ob)
+        return ret
+
     def execute(self, context):
         scene = context.scene
 
@@ -41,79 +132,52 @@ class CPP_OT_import_cameras_csv(bpy.types.Operator):
         filename = os.path.basename(fp)
 
         dt = time.time()
-        success_rows = 0
-        skipped_rows = 0
-
-        with open(fp, "r") as file:
-            reader = csv.reader(file)
-            first_row_length = 0
-            for i, row in enumerate(reader):
-                if i == 0:
-                    first_row_length = len(row)
-                    # In Reality Capture exported *.csv first line always starts with commented line camera #name
-                    is_supported_file = False
-
-                    if first_row_length and row[0] == "#name":
-                        params_found = 0
-                        for i, item in enumerate(row):
-                            if item in CALIB_PARAMS:
-                                CALIB_PARAMS[item] = i
-                                params_found += 1
-                        if params_found == len(CALIB_PARAMS):
-                            is_supported_file = True
-                            continue
-
-                    if is_supported_file is False:
-                        self.report(type={'WARNING'}, message=f"Unsupported calibration file: {filename}")
-                        return {'CANCELLED'}
-
-                if len(row) != first_row_length:
-                    skipped_rows += 1
-                    continue
-
-                item_name = str(row[CALIB_PARAMS["#name"]])
-                camera_object = None
-                for ob in scene.cpp.camera_objects:
-                    for name in self.iter_name_variations(ob.name):
-                        for iname in self.iter_name_variations(item_name):
-                            if name == iname:
-                                camera_object = ob
-
-                if camera_object is None:
-                    skipped_rows += 1
-                    continue
-                camera = camera_object.data
-
-                camera.lens = float(row[CALIB_PARAMS["f"]])
-                camera.cpp.principal_point_x = float(row[CALIB_PARAMS["px"]])
-                camera.cpp.principal_point_y = float(row[CALIB_PARAMS["py"]])
-
-                camera.cpp.k1 = float(row[CALIB_PARAMS["k1"]])
-
-                k2 = float(row[CALIB_PARAMS["k2"]])
-                camera.cpp.k2 = k2
-
-                k3 = float(row[CALIB_PARAMS["k3"]])
-                camera.cpp.k3 = k3
-
-                k4 = float(row[CALIB_PARAMS["k4"]])
-                camera.cpp.k4 = k4
-
-                t1 = float(row[CALIB_PARAMS["t1"]])
-                camera.cpp.t1 = t1
-
-                t2 = float(row[CALIB_PARAMS["t2"]])
-                camera.cpp.t2 = t2
-
-                if (k2 or k3):
-                    camera.cpp.camera_lens_model = 'brown3'
-                    if k4:
-                        camera.cpp.camera_lens_model = 'brown4'
-                    if (t1 or t2):
-                        camera.cpp.camera_lens_model = 'brown3t2'
-                        if k4:
-                            camera.cpp.camera_lens_model = 'brown4t2'
-                success_rows += 1
+        unmatched_names = []
+        ambiguous_names = []
+
+        columns = engine.calibration.INTRINSICS_COLUMNS
+        if self.import_poses:
+            columns += engine.calibration.POSE_COLUMNS
+        table = engine.calibration.read_calibration_csv(fp, columns)
+        if table is None:
+            self.report(type={'WARNING'}, message=f"Unsupported calibration file: {filename}")
+            return {'CANCELLED'}
+
+        names_map = self.get_camera_names_map(scene.cpp.camera_objects)
+
+        matched_cameras = []
+        matched_rows = []
+        for i, item_name in enumerate(table.names):
+            matched_objects = []
+            for iname in self.iter_name_variations(item_name):
+                for ob in names_map.get(iname, ()):
+                    if ob not in matched_objects:
+                        matched_objects.append(ob)
+
+            if not matched_objects:
+                unmatched_names.append(item_name)
+                continue
+            elif len(matched_objects) > 1:
+                ambiguous_names.append(item_name)
+                continue
+            matched_cameras.append(matched_objects[0])
+            matched_rows.append(i)
+
+        created_count = 0
+        if self.import_poses and self.create_missing and unmatched_names:
+            # If the same name appears in several rows, the last one is used
+            created_names = list(dict.fromkeys(unmatched_names))
+            name_rows = {name: i for i, name in enumerate(table.names)}
+            matched_cameras += self.create_cameras(context, created_names, os.path.splitext(filename)[0])
+            matched_rows += [name_rows[name] for name in created_names]
+            created_count = len(created_names)
+            unmatched_names.clear()
+
+        self.apply_calibration(matched_cameras, table, matched_rows)
+        if self.import_poses:
+            self.apply_poses(matched_cameras, table, matched_rows)
+        success_rows = len(matched_rows)
+        skipped_rows = table.skipped
 
         cam_txt = "cameras"
         if success_rows == 1:
@@ -124,7 +188,11 @@ class CPP_OT_import_cameras_csv(bpy.types.Operator):
         t = round(time.time() - dt, 3)
         self.report(
             type={mtp},
-            message=f"Imported calibration parameters for {success_rows} {cam_txt}, skipped {skipped_rows} in {t} sec"
+            message=f"Imported calibration parameters for {success_rows} {cam_txt}, "
+                    f"created {created_count}, unmatched {len(unmatched_names)}, ambiguous {len(ambiguous_names)}, "
+                    f"skipped {skipped_rows} in {t} sec"
         )
+        if ambiguous_names:
+            print(f"Camera Projection Painter: Ambiguous camera names in {filename}: {ambiguous_names}")
 
         return {'FINISHED'}
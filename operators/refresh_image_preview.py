@@ -1,4 +1,6 @@
 from .. import engine
+from .. import extend_bpy_types
+from . import basis
 import bpy
 
 
@@ -11,4 +13,7 @@ class CPP_OT_refresh_image_preview(bpy.types.Operator):
 
     def execute(self, context):
         engine.updateImageSeqPreviews(list(bpy.data.images), self.skip_already_set, False)
+        if not self.skip_already_set:
+            extend_bpy_types.image.ImageCache.clear_preview_pages()
+        basis.draw.cameras.CameraBatchCache.invalidate()
         return {'FINISHED'}
@@ -17,7 +17,7 @@ from bpy.props import (
 
 import sys
 
-SUPPORTED_PLATFORMS = ("win32",)
+SUPPORTED_PLATFORMS = ("win32", "linux", "darwin")
 SUPPORTED_BLENDER_VERSION = (2, 83)
 
 
@@ -176,6 +176,18 @@ class CppPreferences(bpy.types.AddonPreferences):
         subtype='PIXEL',
         description="Border Empty Space")
 
+    use_preview_lod: BoolProperty(
+        name="Preview LOD",
+        default=False,
+        description="Draw projection preview over decimated proxy mesh when the mesh is too dense for the view")
+
+    preview_lod_resolution: IntProperty(
+        name="LOD Resolution",
+        default=512,
+        min=16,
+        soft_max=2048,
+        description="Number of decimation grid cells along the largest dimension of the mesh")
+
     # Defaults
     new_texture_size: IntVectorProperty(
         name="New Texture Size",
@@ -207,10 +219,8 @@ class CppPreferences(bpy.types.AddonPreferences):
             env_platform = readable_platforms[sys.platform]
             layout.label(text=f"OS {env_platform} currently is unsupported", icon="ERROR")
 
-            str_supported_os = ""
-            for i in SUPPORTED_PLATFORMS:
-                str_supported_os += readable_platforms[i]
-            layout.label(text=f"Supported operating system is {str_supported_os}", icon='INFO')
+            str_supported_os = ", ".join(readable_platforms[i] for i in SUPPORTED_PLATFORMS)
+            layout.label(text=f"Supported operating systems are {str_supported_os}", icon='INFO')
 
         if not is_valid_env:
             return
@@ -242,6 +252,10 @@ class CppPreferences(bpy.types.AddonPreferences):
         col.use_property_split = True
         col.prop(self, "normal_highlight_color")
         col.prop(self, "warning_color")
+        col.prop(self, "use_preview_lod")
+        scol = col.column(align=True)
+        scol.enabled = self.use_preview_lod
+        scol.prop(self, "preview_lod_resolution")
         col.separator()
 
         # Camera Gizmo
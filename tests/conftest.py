@@ -0,0 +1,59 @@
+# Headless test setup. Blender modules are replaced with stubs, so only parts of the addon which
+# do not depend on Blender at runtime can be tested. The 'engine' package is loaded directly by path,
+# the addon root is not added to sys.path because the addon 'warnings' module shadows the standard one.
+# Run with 'python -m pytest <addon directory>/tests' from outside of the addon directory.
+import os
+import sys
+import types
+import importlib.util
+
+import pytest
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class _StubModule(types.ModuleType):
+    """Module which creates stub attributes on access, enough for module level annotations and imports"""
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = _StubModule(f"{self.__name__}.{name}")
+        setattr(self, name, value)
+        return value
+
+
+def _install_stubs():
+    for name in ("bpy", "bgl", "gpu", "mathutils", "bpy_extras"):
+        if name not in sys.modules:
+            sys.modules[name] = _StubModule(name)
+    sys.modules["bpy"].path.abspath = lambda path, library=None: path
+
+
+def _load_engine():
+    if "engine" in sys.modules:
+        return sys.modules["engine"]
+    spec = importlib.util.spec_from_file_location(
+        "engine",
+        os.path.join(ADDON_DIR, "engine", "__init__.py"),
+        submodule_search_locations=[os.path.join(ADDON_DIR, "engine")]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["engine"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_install_stubs()
+_load_engine()
+
+
+@pytest.fixture
+def bpy():
+    return sys.modules["bpy"]
+
+
+@pytest.fixture
+def fixtures_dir():
+    return FIXTURES_DIR
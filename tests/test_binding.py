@@ -0,0 +1,130 @@
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+from engine import binding
+from engine import source_index
+
+
+class FakeImages(list):
+    """Stands for bpy.data.images"""
+
+    def load(self, filepath, check_existing=False):
+        for image in self:
+            if check_existing and image.filepath == filepath:
+                return image
+        image = make_image(os.path.basename(filepath), filepath)
+        self.append(image)
+        return image
+
+
+def make_image(name, filepath="", size=(0, 0)):
+    return SimpleNamespace(
+        name=name, filepath=filepath, library=None, source='FILE', packed_file=None,
+        cpp=SimpleNamespace(static_size=size)
+    )
+
+
+def make_camera(name):
+    return SimpleNamespace(name=name, data=SimpleNamespace(cpp=SimpleNamespace(image=None)))
+
+
+@pytest.fixture
+def source_dir(tmp_path, fixtures_dir):
+    directory = tmp_path / "source"
+    directory.mkdir()
+    images_dir = os.path.join(fixtures_dir, "images")
+    shutil.copy(os.path.join(images_dir, "progressive_1920x1080.jpg"), directory / "IMG_0001.JPG")
+    shutil.copy(os.path.join(images_dir, "rgba_640x480.png"), directory / "IMG_0002.png")
+    shutil.copy(os.path.join(images_dir, "le_6000x4000.tif"), directory / "scan,1.tif")
+    (directory / "notes.txt").write_text("not an image")
+    return directory
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    ret = source_index.SourceIndex(str(tmp_path / "index.sqlite"))
+    monkeypatch.setattr(binding, "_source_index", ret)
+    yield ret
+    ret.close()
+
+
+@pytest.fixture
+def images(bpy, monkeypatch):
+    ret = FakeImages()
+    monkeypatch.setattr(bpy, "data", SimpleNamespace(images=ret), raising=False)
+    return ret
+
+
+@pytest.mark.parametrize("name, key", (
+    ("IMG_0001.JPG", "IMG_0001"),
+    ("IMG_0001.jpg", "IMG_0001"),
+    ("IMG_0001", "IMG_0001"),
+    ("IMG_0001.001", "IMG_0001.001"),
+    ("scan.v2.tiff", "scan.v2"),
+))
+def test_name_key(name, key):
+    assert source_index.name_key(name) == key
+
+
+def test_index_refresh(source_dir, index):
+    assert index.refresh(str(source_dir))
+    assert index.read == 3
+    entries = index.get_entries(str(source_dir))
+    assert sorted(entries.keys()) == ["IMG_0001", "IMG_0002", "scan,1"]
+    assert (entries["IMG_0001"].width, entries["IMG_0001"].height) == (1920, 1080)
+    assert (entries["scan,1"].width, entries["scan,1"].height) == (6000, 4000)
+
+    # Directory is not listed again while it is unchanged
+    assert not index.refresh(str(source_dir))
+
+
+def test_index_refresh_changes(source_dir, index, fixtures_dir):
+    index.refresh(str(source_dir))
+    os.remove(source_dir / "IMG_0002.png")
+    shutil.copy(os.path.join(fixtures_dir, "images", "be_4000x6000.tiff"), source_dir / "IMG_0003.tiff")
+    # Directory modification time resolution may be coarse
+    index.connection.execute("UPDATE directories SET mtime_ns = 0")
+
+    assert index.refresh(str(source_dir))
+    assert index.read == 1
+    assert sorted(index.get_entries(str(source_dir)).keys()) == ["IMG_0001", "IMG_0003", "scan,1"]
+
+
+def test_bind_camera_images(source_dir, index, images):
+    blend_image = make_image("IMG_0004.jpg", size=(100, 50))
+    path_image = make_image("Image.001", filepath=str(source_dir / "IMG_0002.png"), size=(640, 480))
+    images.extend((blend_image, path_image))
+
+    cameras = [make_camera(name) for name in ("IMG_0001.jpg", "IMG_0002", "IMG_0004", "scan,1", "IMG_9999")]
+    binded = binding.bind_camera_images(cameras, str(source_dir), search_blend=True, rename=False)
+
+    assert binded == 4
+    assert cameras[0].data.cpp.image.filepath == os.path.join(str(source_dir), "IMG_0001.JPG")
+    assert cameras[0].data.cpp.image.cpp.static_size == (1920, 1080)
+    assert cameras[1].data.cpp.image is path_image
+    assert cameras[2].data.cpp.image is blend_image
+    assert cameras[3].data.cpp.image.cpp.static_size == (6000, 4000)
+    assert cameras[4].data.cpp.image is None
+
+
+def test_bind_without_blend_images(source_dir, index, images):
+    images.append(make_image("IMG_0001.jpg", size=(100, 50)))
+    cameras = [make_camera("IMG_0001")]
+    binding.bind_camera_images(cameras, str(source_dir), search_blend=False, rename=False)
+    assert cameras[0].data.cpp.image.filepath == os.path.join(str(source_dir), "IMG_0001.JPG")
+
+
+def test_preview_hashes(source_dir, index):
+    index.refresh(str(source_dir))
+    first = os.path.join(str(source_dir), "IMG_0001.JPG")
+    second = os.path.join(str(source_dir), "IMG_0002.png")
+    index.set_preview_hashes(((first, "a"), (second, "b"), (str(source_dir / "missing.jpg"), "c")))
+    assert index.get_preview_hashes((first, second)) == {first: "a", second: "b"}
+
+    # Hash of a modified file is not valid anymore
+    with open(second, "ab") as file:
+        file.write(b"\x00")
+    assert index.get_preview_hashes((first, second)) == {first: "a"}
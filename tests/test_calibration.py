@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import pytest
+
+from engine import calibration
+from engine import projection
+
+HEADER = "#name,x,y,alt,heading,pitch,roll,f,px,py,k1,k2,k3,k4,t1,t2"
+
+
+def make_row(name, f=35.0, k2=0.0, k4=0.0, t1=0.0, heading=10.0, pitch=20.0, roll=30.0):
+    return f"{name},1.0,2.0,3.0,{heading},{pitch},{roll},{f},0.001,-0.002,0.01,{k2},0.0,{k4},{t1},0.0"
+
+
+def test_intrinsics():
+    table = calibration.read_calibration_lines([HEADER, make_row("IMG_0001.jpg", f=24.0), make_row("IMG_0002.jpg")])
+    assert table.names == ["IMG_0001.jpg", "IMG_0002.jpg"]
+    assert table.skipped == 0
+    np.testing.assert_array_equal(table["f"], [24.0, 35.0])
+    np.testing.assert_array_equal(table["py"], [-0.002, -0.002])
+
+
+def test_unsupported_header():
+    assert calibration.read_calibration_lines(["name,f", "a,1"]) is None
+    assert calibration.read_calibration_lines(["#name,f,px", "a,1,2"]) is None
+    assert calibration.read_calibration_lines([]) is None
+
+
+def test_invalid_rows_are_skipped():
+    lines = [HEADER, make_row("a"), "b,1,2", "", make_row("c").replace("35.0", "x"), make_row("d")]
+    table = calibration.read_calibration_lines(lines)
+    assert table.names == ["a", "d"]
+    assert table.skipped == 2
+
+
+def test_quoted_names():
+    lines = [HEADER, make_row("a", f=1.0), make_row('"IMG_1,2.jpg"', f=2.0), make_row('"b ""c"""', f=3.0),
+             make_row("d", f=4.0)]
+    table = calibration.read_calibration_lines(lines)
+    assert table.names == ["a", "IMG_1,2.jpg", 'b "c"', "d"]
+    np.testing.assert_array_equal(table["f"], [1.0, 2.0, 3.0, 4.0])
+
+
+def test_lens_models():
+    lines = [HEADER, make_row("a"), make_row("b", k2=0.1), make_row("c", k2=0.1, k4=0.1),
+             make_row("d", k2=0.1, t1=0.1), make_row("e", k2=0.1, k4=0.1, t1=0.1)]
+    models = calibration.get_lens_models(calibration.read_calibration_lines(lines))
+    assert [projection.LENS_MODELS[i] if i != -1 else None for i in models.tolist()] == [
+        None, 'brown3', 'brown4', 'brown3t2', 'brown4t2']
+
+
+def test_pose_matrices():
+    lines = [HEADER, make_row("a")]
+    table = calibration.read_calibration_lines(lines, calibration.INTRINSICS_COLUMNS + calibration.POSE_COLUMNS)
+    matrix = calibration.get_pose_matrices(table)[0]
+    rotation = matrix[:3, :3]
+    np.testing.assert_allclose(rotation @ rotation.T, np.identity(3), atol=1e-12)
+    np.testing.assert_allclose(matrix[:3, 3], [1.0, 2.0, 3.0])
+
+
+@pytest.mark.parametrize("heading, pitch, roll, forward, up", (
+    # Looking straight down, image top to the north
+    (0.0, 0.0, 0.0, (0, 0, -1), (0, 1, 0)),
+    # Heading is clockwise from north
+    (90.0, 0.0, 0.0, (0, 0, -1), (1, 0, 0)),
+    # Pitch tilts the camera towards the horizon, in the heading direction
+    (0.0, 90.0, 0.0, (0, 1, 0), (0, 0, 1)),
+    (90.0, 90.0, 0.0, (1, 0, 0), (0, 0, 1)),
+    # Roll rotates the camera around its view axis, image top turns counterclockwise as seen by the camera
+    (0.0, 0.0, 90.0, (0, 0, -1), (-1, 0, 0)),
+    (90.0, 90.0, 90.0, (1, 0, 0), (0, 1, 0)),
+))
+def test_pose_orientation(heading, pitch, roll, forward, up):
+    lines = [HEADER, make_row("a", heading=heading, pitch=pitch, roll=roll)]
+    table = calibration.read_calibration_lines(lines, calibration.INTRINSICS_COLUMNS + calibration.POSE_COLUMNS)
+    rotation = calibration.get_pose_matrices(table)[0][:3, :3]
+    # Camera looks along its local -Z axis, local +Y axis is the image top
+    np.testing.assert_allclose(rotation @ (0.0, 0.0, -1.0), forward, atol=1e-12)
+    np.testing.assert_allclose(rotation @ (0.0, 1.0, 0.0), up, atol=1e-12)
+
+
+def test_benchmark_50k_rows(tmp_path):
+    count = 50000
+    filepath = tmp_path / "calibration.csv"
+    with open(filepath, "w") as file:
+        file.write(HEADER + "\n")
+        for i in range(count):
+            file.write(make_row(f"IMG_{i:05d}.jpg", f=20.0 + i % 10) + "\n")
+
+    dt = time.perf_counter()
+    table = calibration.read_calibration_csv(str(filepath), calibration.INTRINSICS_COLUMNS + calibration.POSE_COLUMNS)
+    elapsed = time.perf_counter() - dt
+    print(f"Parsed {count} calibration rows in {elapsed:.6f} sec")
+
+    assert len(table) == count
+    assert table.names[-1] == f"IMG_{count - 1:05d}.jpg"
+    assert table["f"][-1] == 20.0 + (count - 1) % 10
+    # Generous limit for slow machines, typically it takes a fraction of a second
+    assert elapsed < 5.0
@@ -0,0 +1,70 @@
+import numpy as np
+
+from engine import decimation
+
+
+def make_grid(count: int, step: float):
+    """Planar grid of count x count vertices with two triangles per quad"""
+    coords = np.arange(count, dtype=np.float32) * step
+    x, y = np.meshgrid(coords, coords, indexing="ij")
+    positions = np.column_stack((x.ravel(), y.ravel(), np.zeros(count * count, dtype=np.float32)))
+    normals = np.tile(np.array([0.0, 0.0, 1.0], dtype=np.float32), (count * count, 1))
+    triangles = []
+    for i in range(count - 1):
+        for j in range(count - 1):
+            v = i * count + j
+            triangles.append((v, v + count, v + count + 1))
+            triangles.append((v, v + count + 1, v + 1))
+    return positions, normals, np.array(triangles, dtype=np.int32)
+
+
+def test_grid_cluster_count():
+    # 9 x 9 vertices with 0.5 spacing, 4 cells along each axis of 1.0 size. Vertices on the far boundary
+    # form their own row of cells
+    positions, normals, triangles = make_grid(9, 0.5)
+    clusters, count = decimation.cluster_vertices(positions, decimation.get_cell_size(positions, 4))
+    assert count == 5 * 5
+    assert clusters.dtype == np.int32
+    assert len(clusters) == len(positions)
+
+    new_positions, _, new_triangles, _ = decimation.decimate(positions, normals, triangles, 4)
+    assert len(new_positions) == count
+    # The first cell contains vertices (0, 0), (0.5, 0), (0, 0.5) and (0.5, 0.5)
+    np.testing.assert_allclose(new_positions[clusters[0]], [0.25, 0.25, 0.0])
+    assert new_triangles.max() < count
+
+
+def test_collapsed_triangles_are_removed():
+    positions = np.array([
+        (0.0, 0.0, 0.0), (0.1, 0.0, 0.0), (0.0, 0.1, 0.0),  # Inside of a single cell
+        (1.0, 0.0, 0.0), (0.0, 1.0, 0.0),
+    ], dtype=np.float32)
+    triangles = np.array([(0, 1, 2), (0, 3, 4), (0, 1, 3)], dtype=np.int32)
+    clusters, count = decimation.cluster_vertices(positions, 0.5)
+    assert count == 3
+
+    ret = decimation.cluster_triangles(triangles, clusters)
+    # Only the triangle with vertices in three different cells remains
+    np.testing.assert_array_equal(ret, [clusters[[0, 3, 4]]])
+    assert ret.dtype == np.int32
+
+
+def test_averaged_normals_have_unit_length():
+    rng = np.random.default_rng(0)
+    positions = rng.random((1000, 3), dtype=np.float32)
+    normals = rng.normal(size=(1000, 3)).astype(np.float32)
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    triangles = rng.integers(0, 1000, size=(500, 3), dtype=np.int32)
+
+    _, new_normals, _, _ = decimation.decimate(positions, normals, triangles, 4)
+    assert new_normals.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(new_normals, axis=1), 1.0, rtol=1e-5)
+
+
+def test_empty_input():
+    empty = np.empty((0, 3), dtype=np.float32)
+    positions, normals, triangles, clusters = decimation.decimate(empty, empty, np.empty((0, 3), dtype=np.int32), 4)
+    assert positions.shape == (0, 3)
+    assert normals.shape == (0, 3)
+    assert triangles.shape == (0, 3)
+    assert clusters.shape == (0,)
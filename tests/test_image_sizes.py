@@ -0,0 +1,97 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from engine import image_sizes
+
+
+class FakeImage:
+    """Hashable by identity, like bpy.types.Image"""
+
+    def __init__(self, name, filepath):
+        self.name = name
+        self.filepath = filepath
+        self.library = None
+        self.source = 'FILE'
+        self.packed_file = None
+        self.cpp = SimpleNamespace(static_size=(0, 0))
+
+
+@pytest.fixture
+def images_dir(fixtures_dir):
+    return os.path.join(fixtures_dir, "images")
+
+
+@pytest.fixture
+def scanner():
+    ret = image_sizes.ImageSizeScanner()
+    yield ret
+    ret.clear()
+
+
+def test_update_skips_unchanged(scanner, images_dir):
+    images = [FakeImage("a", os.path.join(images_dir, "rgba_640x480.png"))]
+    assert scanner.update(images) == 1
+    assert images[0].cpp.static_size == (640, 480)
+    assert scanner.update(images) == 0
+    assert scanner.skipped == 1
+
+
+class CountingImages(list):
+    """Stands for bpy.data.images, counts walks over image names"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.walks = 0
+
+    def keys(self):
+        self.walks += 1
+        return [image.name for image in self]
+
+
+def test_unchanged_count_does_not_walk_names(scanner, images_dir):
+    images = CountingImages([FakeImage("a", os.path.join(images_dir, "rgba_640x480.png"))])
+    scanner.update(images)
+    assert images.walks == 1
+    for _ in range(10):
+        scanner.update(images)
+    assert images.walks == 1
+
+    # Invalidation of a known image (e.g. painting) does not compare names either
+    scanner.invalidate(images[0])
+    assert scanner.update(images) == 0
+    assert images.walks == 1
+
+
+def test_remove_and_add_in_the_same_update(scanner, images_dir):
+    first = FakeImage("a", os.path.join(images_dir, "rgba_640x480.png"))
+    scanner.update([first])
+
+    second = FakeImage("b", os.path.join(images_dir, "le_6000x4000.tif"))
+    # Depsgraph handler reports the added image
+    scanner.invalidate(second)
+    assert scanner.update([second]) == 1
+    assert second.cpp.static_size == (6000, 4000)
+    assert first not in scanner.filepaths
+
+
+def test_removed_images_are_pruned(scanner, images_dir):
+    first = FakeImage("a", os.path.join(images_dir, "rgba_640x480.png"))
+    second = FakeImage("b", os.path.join(images_dir, "le_6000x4000.tif"))
+    scanner.update([first, second])
+    assert len(scanner.headers) == 2
+
+    scanner.update([second])
+    assert first not in scanner.filepaths
+    assert [key[0] for key in scanner.headers.keys()] == [second.filepath]
+
+
+def test_invalidated_image_is_rescanned(scanner, images_dir):
+    image = FakeImage("a", os.path.join(images_dir, "rgba_640x480.png"))
+    scanner.update([image])
+
+    image.filepath = os.path.join(images_dir, "be_4000x6000.tiff")
+    scanner.invalidate(image)
+    assert scanner.update([image]) == 1
+    assert image.cpp.static_size == (4000, 6000)
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from engine import imageheader
+
+FIXTURE_SIZES = {
+    "rgba_640x480.png": (640, 480),
+    "progressive_1920x1080.jpg": (1920, 1080),
+    "le_6000x4000.tif": (6000, 4000),
+    "be_4000x6000.tiff": (4000, 6000),
+    "truncated.png": (0, 0),
+}
+
+
+@pytest.mark.parametrize("filename, size", FIXTURE_SIZES.items())
+def test_read_file_size(fixtures_dir, filename, size):
+    assert imageheader.read_file_size(os.path.join(fixtures_dir, "images", filename)) == size
+
+
+@pytest.mark.parametrize("filename, size", FIXTURE_SIZES.items())
+def test_read_buffer_size(fixtures_dir, filename, size):
+    with open(os.path.join(fixtures_dir, "images", filename), "rb") as file:
+        data = file.read()
+    assert imageheader.read_buffer_size(data, os.path.splitext(filename)[-1]) == size
+
+
+def test_missing_file(tmp_path):
+    assert imageheader.read_file_size(str(tmp_path / "missing.jpg")) == (0, 0)
+
+
+def test_unsupported_data():
+    assert imageheader.read_buffer_size(b"not an image file", ".jpg") == (0, 0)
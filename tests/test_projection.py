@@ -0,0 +1,92 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from engine import projection
+
+f32 = np.float32
+
+
+def glsl_undistorted_uv(u, v, width, height, lens, principal_point_x, principal_point_y, skew, aspect_ratio,
+                        lens_model, k1, k2, k3, k4, t1, t2):
+    """
+    Line by line transcription of the 'undistorted_uv' shader library function, evaluated in single precision
+    """
+    _k1 = _k2 = _k3 = _k4 = _t1 = _t2 = f32(0.0)
+    if lens_model != 0:
+        _k1 = f32(k1)
+    if lens_model > 1:
+        _k2 = f32(k2)
+        _k3 = f32(k3)
+        if lens_model == 3 or lens_model == 5:
+            _k4 = f32(k4)
+        if lens_model == 4 or lens_model == 5:
+            _t1 = f32(t1)
+            _t2 = f32(t2)
+    width = f32(width)
+    height = f32(height)
+    scale_to_pixel = max(width, height)
+    focal_length = f32(lens) * scale_to_pixel / f32(36.0)
+    principal_point_u = f32(principal_point_x) * scale_to_pixel + width / f32(2)
+    principal_point_v = f32(principal_point_y) * scale_to_pixel + height / f32(2)
+    camera_skew = f32(skew) * scale_to_pixel
+    cx = f32(u) * width / focal_length
+    cy = -f32(v) * height / focal_length
+    if lens_model == 0:
+        dcx = cx
+        dcy = cy
+    elif lens_model == 1:
+        kr2 = f32(1.0) + _k1 * (cx * cx + cy * cy)
+        dcx = cx / kr2
+        dcy = cy / kr2
+    else:
+        x2 = cx * cx
+        y2 = cy * cy
+        xy2 = f32(2) * cx * cy
+        r2 = x2 + y2
+        lr = f32(1.0) + (((_k4 * r2 + _k3) * r2 + _k2) * r2 + _k1) * r2
+        tx = (_t1 * (r2 + f32(2.0) * x2) + _t2 * xy2)
+        ty = (_t2 * (r2 + f32(2.0) * y2) + _t1 * xy2)
+        dcx = (cx * lr + tx)
+        dcy = (cy * lr + ty)
+    u_ptr = (focal_length * dcx + camera_skew * dcy + principal_point_u) / width
+    v_ptr = f32(1.0) - ((focal_length * f32(aspect_ratio) * dcy + principal_point_v) / height)
+    return float(u_ptr), float(v_ptr)
+
+
+def load_fixtures(fixtures_dir):
+    with open(os.path.join(fixtures_dir, "undistortion.json"), "r") as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def undistortion_fixtures(fixtures_dir):
+    return load_fixtures(fixtures_dir)
+
+
+def test_matches_glsl_reference(undistortion_fixtures):
+    for case in undistortion_fixtures:
+        calibration = case["calibration"]
+        points = np.array(case["points"], dtype=np.float32)
+        result = projection.undistorted_uv(points, **calibration)
+        assert result.dtype == np.float32
+        reference = np.array([glsl_undistorted_uv(u, v, **calibration) for u, v in points.tolist()])
+        np.testing.assert_allclose(result, reference, rtol=1e-5, atol=1e-5)
+
+
+def test_principal_point_at_center():
+    uv = projection.undistorted_uv(np.zeros((1, 2), dtype=np.float32), 6000, 4000, 35.0)
+    np.testing.assert_allclose(uv, [[0.5, 0.5]])
+
+
+def test_projector_matrix_maps_image_corner():
+    width, height, lens = 6000, 4000, 35.0
+    matrix = projection.projector_matrix(lens, width, height)
+    focal_length = lens * max(width, height) / projection.SENSOR_WIDTH
+    # Point on the image corner ray at unit distance in front of the projector
+    point = np.array([[width / 2 / focal_length, height / 2 / focal_length, -1.0]], dtype=np.float32)
+    xy, w = projection.project_points(point, matrix)
+    np.testing.assert_allclose(xy, [[0.5, 0.5]], rtol=1e-6)
+    assert w[0] > 0.0
@@ -1,5 +1,10 @@
 from . import operators
 from . import poll
+from . import engine
+from . import warnings
+from . import extend_bpy_types
+from . import image_loader
+from . import __package__ as addon_pkg
 
 if "bpy" in locals():
     import importlib
@@ -350,6 +355,11 @@ class CPP_PT_dataset(bpy.types.Panel, CameraPainterPanelBase):
             text="",
             icon='IMPORT'
         )
+        row.operator(
+            operator=operators.CPP_OT_import_cameras_csv.bl_idname,
+            text="",
+            icon='OUTLINER_OB_CAMERA'
+        ).import_poses = True
 
 
 class CPP_PT_canvas_texture(bpy.types.Panel, CameraPainterPanelBase):
@@ -645,6 +655,83 @@ class CPP_PT_brush(bpy.types.Panel, CameraPainterPanelBase):
             scol.operator("brush.curve_preset", icon='NOCURVE', text="").shape = 'MAX'
 
 
+class CPP_PT_statistics(bpy.types.Panel, CameraPainterPanelBase):
+    bl_label = "Statistics"
+    bl_parent_id = "CPP_PT_camera_painter"
+
+    @classmethod
+    def poll(cls, context):
+        preferences = context.preferences.addons[addon_pkg].preferences
+        return super().poll(context) and preferences.debug_info
+
+    def draw(self, context):
+        col = self.get_col()
+
+        col.label(text="Image Size Scans", icon='IMAGE_DATA')
+        scanner = engine.size_scanner
+        col.label(text=f"Performed: {scanner.scanned}, skipped: {scanner.skipped}")
+        col.separator()
+
+        col.label(text="Context Checks", icon='VIEWZOOM')
+        listener_state = operators.basis.ListenerState
+        col.label(text=f"Performed: {listener_state.polls}, skipped: {listener_state.polls_skipped}")
+        col.separator()
+
+        col.label(text="GPU Image Cache", icon='TEXTURE')
+        image_cache = extend_bpy_types.image.ImageCache
+        col.label(text=f"Images: {len(image_cache.gl_loaded)}, "
+                       f"size: {image_cache.gl_loaded_size / (1024 * 1024):.1f} / {context.scene.cpp.gpu_cache_size} MB")
+        col.label(text=f"Hits: {image_cache.gl_hits}, misses: {image_cache.gl_misses}, "
+                       f"evictions: {image_cache.gl_evictions}")
+        col.separator()
+
+        col.label(text="Image Prefetch", icon='IMPORT')
+        loader = image_loader.ImageLoader
+        col.label(text=f"Submitted: {loader.submitted}, uploads: {loader.uploads}, failures: {loader.failures}")
+        col.label(text=f"Pending: {len(loader.pending)}, staged: {len(loader.staged)}, "
+                       f"textures: {len(loader.textures)}")
+        col.label(text=f"Size: {image_cache.gl_loader_size / (1024 * 1024):.1f} MB")
+        col.separator()
+
+        col.label(text="Camera Batches", icon='OUTLINER_OB_CAMERA')
+        camera_batch_cache = operators.basis.draw.cameras.CameraBatchCache
+        col.label(text=f"Cameras: {camera_batch_cache.cameras_count}, rebuilds: {camera_batch_cache.rebuilds}")
+        col.label(text=f"Preview pages: {len(camera_batch_cache.preview_batches)}, "
+                       f"missing previews: {len(camera_batch_cache.missing_previews)}")
+        col.label(text=f"Camera draw state updates: {operators.basis.draw.cameras.CameraDrawState.updates}")
+        draw_time = operators.basis.draw.timings.DrawTimings.get_average("cameras")
+        col.label(text=f"Draw time: {draw_time * 1000.0:.2f} ms")
+        col.separator()
+
+        col.label(text="Painter Ticks", icon='TIME')
+        col.label(text=f"State updates: {operators.basis.PainterState.updates}")
+        tick_counts = operators.basis.draw.timings.TimingHistogram.get_counts("painter")
+        bins = operators.basis.draw.timings.HISTOGRAM_BINS
+        for upper, count in zip(bins, tick_counts):
+            col.label(text=f"< {upper} ms: {count}")
+        col.label(text=f">= {bins[-1]} ms: {tick_counts[-1]}")
+        col.separator()
+
+        col.label(text="Viewport Redraws", icon='RESTRICT_VIEW_OFF')
+        redraw_router = operators.basis.draw.redraw.RedrawRouter
+        col.label(text=f"Issued: {redraw_router.issued}, suppressed: {redraw_router.suppressed}")
+        col.separator()
+
+        col.label(text="Mesh Batch", icon='MESH_DATA')
+        mesh_batch_cache = operators.basis.draw.mesh_preview.MeshBatchCache
+        col.label(text=f"Rebuilds: {mesh_batch_cache.rebuilds}, deform updates: {mesh_batch_cache.deform_updates}")
+        col.label(text=f"Chunks: {len(mesh_batch_cache.chunks)}, chunk updates: {mesh_batch_cache.chunk_updates}")
+        col.label(text=f"Drawn chunks: {mesh_batch_cache.drawn_chunks}")
+        col.label(text=f"Proxy triangles: {mesh_batch_cache.proxy_triangles}, "
+                       f"rebuilds: {mesh_batch_cache.proxy_rebuilds}, used: {mesh_batch_cache.use_proxy}")
+        col.separator()
+
+        col.label(text="Distance Warning", icon='ERROR')
+        warning_state = warnings.WarningState
+        col.label(text=f"Evaluations: {warning_state.evaluations}")
+        col.label(text=f"Rays: {warning_state.samples}, time: {warning_state.time * 1000.0:.2f} ms")
+
+
 _classes = [
     CPP_PT_camera_painter,
     DATA_UL_scene_camera_item,
@@ -661,7 +748,8 @@ _classes = [
     CPP_PT_texture_preview,
     CPP_PT_cameras_viewport,
     CPP_PT_brush_preview,
-    CPP_PT_warnings
+    CPP_PT_warnings,
+    CPP_PT_statistics
 ]
 
 register, unregister = bpy.utils.register_classes_factory(_classes)
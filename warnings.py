@@ -1,75 +1,437 @@
-from math import radians
+import time
+import threading
 
-from bpy_extras import view3d_utils
-from mathutils import Vector, Matrix
-
-
-def ray_cast(context, mpos):
-    ob = context.active_object
-    region = context.region
-    rv3d = context.region_data
+import numpy as np
 
-    # get the ray from the viewport and mouse
-    view_vector = view3d_utils.region_2d_to_vector_3d(region, rv3d, mpos)
-    ray_origin = view3d_utils.region_2d_to_origin_3d(region, rv3d, mpos)
+from bpy_extras import view3d_utils
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
 
-    ray_target = ray_origin + view_vector
 
-    # get the ray relative to the object
-    matrix_inv = ob.matrix_world.inverted()
-    ray_origin_obj = matrix_inv @ ray_origin
-    ray_target_obj = matrix_inv @ ray_target
-    ray_direction_obj = ray_target_obj - ray_origin_obj
+# Rays pattern is a polar grid of 16 rows (angles) by 8 columns (radii), first column is the brush center
+PATTERN_ROWS = 16
+PATTERN_COLS = 8
 
-    # cast the ray
-    success, location, normal, face_index = ob.ray_cast(
-        ray_origin_obj, ray_direction_obj)
+# Refinement levels, coarse to fine: rows step and columns of the level lattice.
+# The first level is always cast completely, it includes the outermost column to catch brush edges
+PATTERN_LEVELS_SPEC = (
+    (4, (4, 7)),
+    (2, (2, 4, 6, 7)),
+    (1, tuple(range(1, PATTERN_COLS))),
+)
 
-    if success:
-        location = ob.matrix_world @ location
-        distance = (ray_origin - location).length
-        return distance
-    return -1
+# Relative depth variation between neighbour samples which requires refinement
+DEPTH_TOLERANCE = 0.05
+# Relative change of the average distance between levels which is considered as settled
+ESTIMATE_TOLERANCE = 0.01
 
 
 def _get_check_pattern():
-    pattern = []
-    rays_rows = 16  # 128 rays
-    rays_cols = 8
-    for i in range(rays_rows):
-        angle = radians(360.0 / rays_rows * i)
-        for j in range(rays_cols):
-            mat_rotation = Matrix.Rotation(angle, 3, 'Z')
-            p1 = Vector((1.0, 0.0, 0.0))
-            p1.rotate(mat_rotation)
-            pattern.append(p1.to_2d() * (1.0 / rays_cols * j))
-    pattern.append(Vector((0.0, 0.0)))
+    """
+    @return: numpy.ndarray (PATTERN_ROWS, PATTERN_COLS, 2) ray offsets in brush radius units
+    """
+    angles = np.radians(360.0 / PATTERN_ROWS * np.arange(PATTERN_ROWS))
+    radii = np.arange(PATTERN_COLS) / PATTERN_COLS
+
+    pattern = np.empty((PATTERN_ROWS, PATTERN_COLS, 2), dtype=np.float64)
+    pattern[:, :, 0] = np.cos(angles)[:, None] * radii[None, :]
+    pattern[:, :, 1] = np.sin(angles)[:, None] * radii[None, :]
     return pattern
 
 
 CHECK_PATTERN = _get_check_pattern()  # do it at stage of import, it's constant
 
+_rows, _cols = np.indices((PATTERN_ROWS, PATTERN_COLS))
+# Lattice of each refinement level without points of the previous levels and neighbourhood size,
+# which is half of the previous level rows step. Center is cast once before the first level
+PATTERN_LEVELS = []
+_known = np.zeros((PATTERN_ROWS, PATTERN_COLS), dtype=bool)
+_window = 0
+for _step, _columns in PATTERN_LEVELS_SPEC:
+    _lattice = (_rows % _step == 0) & np.isin(_cols, _columns) & ~_known
+    PATTERN_LEVELS.append((_lattice, _window))
+    _known |= _lattice
+    _window = _step // 2
+del _rows, _cols, _known, _window, _step, _columns, _lattice
 
-def get_warning_status(context, mpos) -> bool:
-    mpos = Vector(mpos)
-    brush_radius = context.scene.tool_settings.unified_paint_settings.size
 
-    p0 = view3d_utils.region_2d_to_vector_3d(context.region, context.region_data, mpos)
-    p1 = view3d_utils.region_2d_to_vector_3d(context.region, context.region_data, (mpos.x + brush_radius, mpos.y))
-    scr_radius = (p0 - p1).length
-    lens = context.space_data.lens * 0.01
+def _get_neighbours_range(values, known, window: int):
+    """
+    Depth range over known samples within window along rows (wrapped) and columns of the pattern
+    @return: tuple (minimum, maximum, any hit, any miss), numpy.ndarray (PATTERN_ROWS, PATTERN_COLS) each
+    """
+    shape = values.shape
+    nmin = np.full(shape, np.inf)
+    nmax = np.full(shape, -np.inf)
+    any_hit = np.zeros(shape, dtype=bool)
+    any_miss = np.zeros(shape, dtype=bool)
+    offsets = range(-window, window + 1)
+    for d_row in offsets:
+        row_values = np.roll(values, d_row, axis=0)
+        row_known = np.roll(known, d_row, axis=0)
+        for d_col in offsets:
+            if not (d_row or d_col):
+                continue
+            shifted = np.full(shape, np.nan)
+            shifted_known = np.zeros(shape, dtype=bool)
+            if d_col >= 0:
+                shifted[:, d_col:] = row_values[:, :shape[1] - d_col]
+                shifted_known[:, d_col:] = row_known[:, :shape[1] - d_col]
+            else:
+                shifted[:, :d_col] = row_values[:, -d_col:]
+                shifted_known[:, :d_col] = row_known[:, -d_col:]
+            hit = shifted_known & ~np.isnan(shifted)
+            any_hit |= hit
+            any_miss |= shifted_known & np.isnan(shifted)
+            nmin = np.where(hit, np.minimum(nmin, shifted), nmin)
+            nmax = np.where(hit, np.maximum(nmax, shifted), nmax)
+    return nmin, nmax, any_hit, any_miss
 
-    distances = []
-    for p in CHECK_PATTERN:
-        ppos = mpos + (p * context.scene.tool_settings.unified_paint_settings.size)
-        dist = ray_cast(context, ppos)
-        if dist != -1:
-            distances.append(dist)
 
-    distance = 0.0
-    if distances:
-        distance = sum(distances) / len(distances)
+def _get_average(values, known):
+    """
+    Average of known hit samples. Center column stands for the center ray of each row, center is
+    additionally counted once more, as in the original 16 x 8 + 1 pattern
+    """
+    hit = known & ~np.isnan(values)
+    count = np.count_nonzero(hit)
+    if not count:
+        return None
+    center = values[0, 0]
+    total = np.sum(values[hit])
+    if hit[0, 0]:
+        total += center
+        count += 1
+    return total / count
 
-    if (distance != -1) and ((scr_radius / lens * distance) > context.scene.cpp.distance_warning):
+
+class BVHCache:
+    """
+    BVH tree of the evaluated mesh in object space. Tree is built by the painter modal (or by the operator
+    which waits for the warning status), never from draw callbacks, and kept until the object geometry
+    is updated (see handlers.depsgraph_update_post_handler)
+    """
+    __slots__ = ()
+
+    ob = None
+    bvh = None
+    generation = 0
+
+    @classmethod
+    def invalidate(cls):
+        cls.ob = None
+        cls.bvh = None
+
+    @classmethod
+    def get(cls, ob):
+        """
+        @return: mathutils.bvhtree.BVHTree or None if tree of the object is not built yet
+        """
+        if cls.ob == ob:
+            return cls.bvh
+        return None
+
+    @classmethod
+    def update(cls, context, ob):
+        """
+        Build tree of the object if it is missing
+        @return: bool, True if tree was built
+        """
+        if cls.bvh is not None and cls.ob == ob:
+            return False
+        cls.bvh = BVHTree.FromObject(ob, context.evaluated_depsgraph_get())
+        cls.ob = ob
+        cls.generation += 1
         return True
+
+
+class WarningSnapshot:
+    """
+    Copy of everything the warning evaluation needs, so it can be evaluated outside of the main thread.
+    BVH tree is never modified after creation, so it is shared rather than copied
+    """
+    __slots__ = (
+        "key",
+        "bvh",
+        "matrix_world",
+        "mpos",
+        "brush_radius",
+        "region_size",
+        "view_inv",
+        "pers_inv",
+        "is_perspective",
+        "radius_factor",
+        "distance_warning",
+    )
+
+    def __init__(self, context, bvh, mpos, key):
+        scene = context.scene
+        ob = context.active_object
+        region = context.region
+        rv3d = context.region_data
+
+        self.key = key
+        self.bvh = bvh
+        self.matrix_world = np.array(ob.matrix_world, dtype=np.float64)
+        self.mpos = np.array(mpos, dtype=np.float64)
+        self.brush_radius = scene.tool_settings.unified_paint_settings.size
+        self.region_size = region.width, region.height
+        self.view_inv = np.array(rv3d.view_matrix.inverted(), dtype=np.float64)
+        self.pers_inv = np.array(rv3d.perspective_matrix.inverted(), dtype=np.float64)
+        self.is_perspective = rv3d.is_perspective
+        self.distance_warning = scene.cpp.distance_warning
+
+        mpos = Vector(mpos)
+        p0 = view3d_utils.region_2d_to_vector_3d(region, rv3d, mpos)
+        p1 = view3d_utils.region_2d_to_vector_3d(region, rv3d, (mpos.x + self.brush_radius, mpos.y))
+        scr_radius = (p0 - p1).length
+        lens = context.space_data.lens * 0.01
+        self.radius_factor = scr_radius / lens
+
+
+def get_view_rays(snapshot, coords):
+    """
+    Vectorized view3d_utils.region_2d_to_origin_3d and view3d_utils.region_2d_to_vector_3d
+    @param coords: numpy.ndarray (N, 2) region coordinates
+    @return: tuple of ray origins and normalized directions, both numpy.ndarray (N, 3) in world space
+    """
+    view_inv = snapshot.view_inv
+    pers_inv = snapshot.pers_inv
+    width, height = snapshot.region_size
+
+    ndc = np.empty((len(coords), 3), dtype=np.float64)
+    ndc[:, 0] = (2.0 * coords[:, 0] / width) - 1.0
+    ndc[:, 1] = (2.0 * coords[:, 1] / height) - 1.0
+    ndc[:, 2] = -0.5
+
+    if snapshot.is_perspective:
+        w = ndc @ pers_inv[3, :3] + pers_inv[3, 3]
+        points = ndc @ pers_inv[:3, :3].T + pers_inv[:3, 3]
+        origins = np.broadcast_to(view_inv[:3, 3], ndc.shape)
+        directions = points / w[:, None] - origins
+    else:
+        origins = ndc[:, :2] @ pers_inv[:3, :2].T + pers_inv[:3, 3]
+        directions = np.broadcast_to(-view_inv[:3, 2], ndc.shape)
+
+    directions = directions / np.linalg.norm(directions, axis=1)[:, None]
+    return origins, directions
+
+
+def cast_rays(bvh, matrix, origins, directions):
+    """
+    Cast world space rays against object space BVH tree
+    @param matrix: numpy.ndarray 4x4 object world matrix
+    @return: numpy.ndarray (N,) distances from origins to hit locations in world space, NaN where nothing was hit
+    """
+    matrix_inv = np.linalg.inv(matrix)
+
+    origins_obj = origins @ matrix_inv[:3, :3].T + matrix_inv[:3, 3]
+    directions_obj = directions @ matrix_inv[:3, :3].T
+
+    locations = np.full((len(origins), 3), np.nan, dtype=np.float64)
+    ray_cast_bvh = bvh.ray_cast
+    for i, (origin, direction) in enumerate(zip(origins_obj.tolist(), directions_obj.tolist())):
+        location = ray_cast_bvh(origin, direction)[0]
+        if location is not None:
+            locations[i] = location
+
+    locations = locations @ matrix[:3, :3].T + matrix[:3, 3]
+    return np.linalg.norm(locations - origins, axis=1)
+
+
+def sample_distance(snapshot):
+    """
+    Average distance to the surface under the brush. Pattern is refined level by level only
+    where depth of the neighbour samples varies, evaluation stops once the average settles.
+    @return: tuple (average distance or None if nothing was hit, number of cast rays)
+    """
+    bvh = snapshot.bvh
+    matrix = snapshot.matrix_world
+    mpos = snapshot.mpos
+
+    values = np.full((PATTERN_ROWS, PATTERN_COLS), np.nan)
+    known = np.zeros((PATTERN_ROWS, PATTERN_COLS), dtype=bool)
+
+    # Center ray
+    origins, directions = get_view_rays(snapshot, mpos[None, :])
+    values[:, 0] = cast_rays(bvh, matrix, origins, directions)[0]
+    known[:, 0] = True
+    samples = 1
+
+    average = None
+    for level, (lattice, window) in enumerate(PATTERN_LEVELS):
+        if level == 0:
+            cast = lattice
+        else:
+            nmin, nmax, any_hit, any_miss = _get_neighbours_range(values, known, window)
+            varies = (any_hit & any_miss) | (any_hit & (nmax - nmin > DEPTH_TOLERANCE * nmax))
+            cast = lattice & (varies | ~(any_hit | any_miss))
+
+            # Smooth regions are filled with neighbours average
+            fill = lattice & ~cast
+            if np.any(fill):
+                with np.errstate(invalid='ignore'):
+                    values[fill] = np.where(any_hit, (nmin + nmax) * 0.5, np.nan)[fill]
+                known |= fill
+
+        if np.any(cast):
+            coords = CHECK_PATTERN[cast] * snapshot.brush_radius + mpos
+            origins, directions = get_view_rays(snapshot, coords)
+            values[cast] = cast_rays(bvh, matrix, origins, directions)
+            known |= cast
+            samples += int(np.count_nonzero(cast))
+
+        previous = average
+        average = _get_average(values, known)
+        if level and previous is not None and average is not None:
+            if not np.any(cast) or abs(average - previous) <= ESTIMATE_TOLERANCE * average:
+                break
+
+    return average, samples
+
+
+class WarningState:
+    """
+    Statistics of the last warning evaluation
+    """
+    __slots__ = ()
+
+    evaluations = 0
+    samples = 0
+    time = 0.0
+
+
+def evaluate(snapshot):
+    """
+    Can be called from any thread
+    @return: tuple (snapshot key, warning status)
+    """
+    dt = time.perf_counter()
+
+    distance, samples = sample_distance(snapshot)
+    if distance is None:
+        distance = 0.0
+    status = bool((snapshot.radius_factor * distance) > snapshot.distance_warning)
+
+    WarningState.evaluations += 1
+    WarningState.samples = samples
+    WarningState.time = time.perf_counter() - dt
+    return snapshot.key, status
+
+
+class WarningWorker:
+    """
+    Evaluates the latest submitted snapshot in a background thread. Result is published by assignment
+    of a single tuple, so readers never lock and get either the previous or the new result
+    """
+    __slots__ = ()
+
+    thread = None
+    event = threading.Event()
+    running = False
+    request = None
+    submitted_key = None
+    result = None
+    has_new_result = False
+
+    @classmethod
+    def submit(cls, snapshot):
+        cls.request = snapshot
+        cls.submitted_key = snapshot.key
+        if cls.thread is None:
+            cls.running = True
+            cls.thread = threading.Thread(target=cls._run, name="cpp_warning", daemon=True)
+            cls.thread.start()
+        cls.event.set()
+
+    @classmethod
+    def is_busy(cls):
+        """
+        @return: bool, True if the latest submitted snapshot is not evaluated yet
+        """
+        if cls.submitted_key is None:
+            return False
+        result = cls.result
+        return result is None or result[0] != cls.submitted_key
+
+    @classmethod
+    def _run(cls):
+        while True:
+            cls.event.wait()
+            cls.event.clear()
+            if not cls.running:
+                break
+            snapshot = cls.request
+            cls.request = None
+            if snapshot is None:
+                continue
+            cls.result = evaluate(snapshot)
+            cls.has_new_result = True
+
+    @classmethod
+    def stop(cls):
+        if cls.thread is not None:
+            cls.running = False
+            cls.event.set()
+            cls.thread.join()
+            cls.thread = None
+        cls.request = None
+        cls.submitted_key = None
+        cls.result = None
+        cls.has_new_result = False
+
+
+def get_last_warning_status() -> bool:
+    """
+    Last published warning status, for views which are not under the mouse cursor
+    """
+    result = WarningWorker.result
+    if result is not None:
+        return result[1]
+    return False
+
+
+def get_warning_status(context, mpos, wait: bool = False) -> bool:
+    """
+    Warning status for the current view and mouse position. Must be called only for the view under
+    the mouse cursor, otherwise requests of different views would replace each other
+    @param wait: evaluate immediately if there is no result for the current state, otherwise evaluation
+    is submitted to the worker and the previous result is returned. Without waiting, there is no warning
+    until BVH tree of the object is built by the painter modal
+    """
+    scene = context.scene
+    ob = context.active_object
+    region = context.region
+    rv3d = context.region_data
+
+    if wait:
+        BVHCache.update(context, ob)
+    bvh = BVHCache.get(ob)
+    if bvh is None:
+        return False
+
+    key = (
+        tuple(mpos),
+        region.width,
+        region.height,
+        tuple(map(tuple, rv3d.perspective_matrix)),
+        tuple(map(tuple, ob.matrix_world)),
+        scene.tool_settings.unified_paint_settings.size,
+        context.space_data.lens,
+        scene.cpp.distance_warning,
+        BVHCache.generation,
+    )
+
+    result = WarningWorker.result
+    if result is not None and result[0] == key:
+        return result[1]
+
+    if wait:
+        WarningWorker.result = evaluate(WarningSnapshot(context, bvh, mpos, key))
+        return WarningWorker.result[1]
+
+    if key != WarningWorker.submitted_key:
+        WarningWorker.submit(WarningSnapshot(context, bvh, mpos, key))
+    if result is not None:
+        return result[1]
     return False